@@ -35,6 +35,9 @@ datas.extend(handcalcs_data)
 pint_data = collect_data_files('pint')
 datas.extend(pint_data)
 
+# Add latex2mathml symbol table (offline math in HTML exports)
+datas.extend(collect_data_files('latex2mathml'))
+
 # Collect hidden imports (modules that PyInstaller might miss)
 hiddenimports = [
     'uvicorn.logging',
@@ -0,0 +1,18 @@
+"""Admission control API endpoints."""
+
+from fastapi import APIRouter
+
+from app.core.admission import admission
+from app.models.admission import AdmissionMetrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_model=AdmissionMetrics)
+async def admission_metrics() -> AdmissionMetrics:
+    """Get running and queued requests and refusals per endpoint class.
+
+    Returns:
+        Admission metrics
+    """
+    return admission.metrics()
@@ -4,6 +4,8 @@ import logging
 
 from fastapi import APIRouter, HTTPException
 
+from app.core.admission import admission
+from app.core.executor import run_io
 from app.models.calculation import CalculationRequest, CalculationResponse, CalculationResult
 from app.services.calculation_engine import calculation_engine
 
@@ -22,38 +24,33 @@ async def execute_calculations(request: CalculationRequest) -> CalculationRespon
     Returns:
         Calculation response with results
     """
-    try:
-        results = []
-        context = request.context.copy()
-
-        # Execute blocks sequentially, maintaining context
-        for block in request.blocks:
-            result = calculation_engine.execute_block(block, context)
-            results.append(result)
-
-            # Update context with successful results
-            if result.success and result.result:
-                # Filter out serialized Pint quantities for context
-                # Keep original Pint objects in context for subsequent calculations
-                for key, value in result.result.items():
-                    if isinstance(value, dict) and "magnitude" in value and "units" in value:
-                        # Reconstruct Pint quantity
-                        context[key] = (
-                            value["magnitude"] * calculation_engine.ureg(value["units"])
-                        )
-                    else:
-                        context[key] = value
-
-        # Serialize the final context for JSON response
-        serialized_context = {
-            k: calculation_engine._serialize_value(v) for k, v in context.items()
-        }
+    # Off the event loop, within the calc concurrency limit (a load limit only:
+    # the engine serializes block execution with export-side calcs itself)
+    async with admission.calc.admit():
+        try:
+            return await run_io(_execute_blocks, request)
+        except Exception as e:
+            logger.error(f"Calculation execution error: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Calculation execution failed: {str(e)}")
 
-        return CalculationResponse(results=results, final_context=serialized_context)
 
-    except Exception as e:
-        logger.error(f"Calculation execution error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Calculation execution failed: {str(e)}")
+def _execute_blocks(request: CalculationRequest) -> CalculationResponse:
+    """Run the request's blocks in order, maintaining the context."""
+    results = []
+    context = request.context.copy()
+
+    # Execute blocks sequentially, maintaining context
+    for block in request.blocks:
+        result = calculation_engine.execute_block(block, context)
+        results.append(result)
+
+        # Keep original Pint objects in context for subsequent calculations
+        calculation_engine.update_context(context, result)
+
+    # Serialize the final context for JSON response
+    serialized_context = {k: calculation_engine._serialize_value(v) for k, v in context.items()}
+
+    return CalculationResponse(results=results, final_context=serialized_context)
 
 
 @router.post("/validate")
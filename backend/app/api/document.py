@@ -2,10 +2,24 @@
 
 import logging
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 
-from app.models.document import Document, DocumentCreate, DocumentList, DocumentUpdate
-from app.services.document_service import document_service
+from app.core.http_cache import cached_json_response
+from app.models.document import (
+    Document,
+    DocumentCreate,
+    DocumentImportResult,
+    DocumentList,
+    DocumentPatch,
+    DocumentPatchResult,
+    DocumentUpdate,
+    FolderList,
+    RevisionDiff,
+    RevisionList,
+)
+from app.services.archive_service import ARCHIVE_FORMATS, archive_service
+from app.services.document_service import DocumentConflictError, document_service
 
 logger = logging.getLogger(__name__)
 
@@ -13,34 +27,217 @@ router = APIRouter()
 
 
 @router.get("/list", response_model=DocumentList)
-async def list_documents() -> DocumentList:
-    """List all documents.
+async def list_documents(
+    folder: str = Query("", description="Project folder, e.g. 'bridge-a/girders'"),
+    recursive: bool = Query(False, description="Include documents in nested folders"),
+) -> DocumentList:
+    """List documents in a project folder.
+
+    Args:
+        folder: Folder relative to the documents directory (root by default)
+        recursive: Include documents in nested folders
 
     Returns:
         List of documents with metadata
     """
     try:
-        documents = document_service.list_documents()
+        documents = await document_service.list_documents_async(folder, recursive)
         return DocumentList(documents=documents, count=len(documents))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing documents: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to list documents: {str(e)}")
 
 
-@router.get("/{filename}", response_model=Document)
-async def get_document(filename: str) -> Document:
+@router.get("/folders", response_model=FolderList)
+async def list_folders(
+    parent: str = Query("", description="Parent folder (root by default)"),
+) -> FolderList:
+    """List project folders directly inside a folder.
+
+    Args:
+        parent: Folder relative to the documents directory
+
+    Returns:
+        List of folder paths
+    """
+    try:
+        folders = await document_service.list_folders_async(parent)
+        return FolderList(folders=folders, count=len(folders))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing folders: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to list folders: {str(e)}")
+
+
+@router.get("/archive")
+async def export_archive(
+    folder: str = Query("", description="Project folder to archive (all documents by default)"),
+    format: str = Query("zip", description="Archive format: zip or tar.gz"),
+    include_exports: bool = Query(False, description="Bundle exported PDF/HTML files"),
+) -> StreamingResponse:
+    """Download a project folder as an archive.
+
+    The archive is streamed as it is built, one document at a time, so its
+    total size never has to fit in memory.
+
+    Args:
+        folder: Folder relative to the documents directory
+        format: Archive format
+        include_exports: Bundle export artifacts named after the documents
+
+    Returns:
+        Streaming archive response
+    """
+    try:
+        chunks = await archive_service.iter_archive_async(folder, format, include_exports)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Folder not found: {folder}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error archiving folder {folder}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to archive folder: {str(e)}")
+
+    archive_name = f"{folder.strip('/').replace('/', '-') or 'documents'}.{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=ARCHIVE_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{archive_name}"'},
+    )
+
+
+@router.post("/import", response_model=DocumentImportResult)
+async def import_archive(
+    file: UploadFile = File(..., description="zip or tar(.gz) archive of Markdown documents"),
+    folder: str = Query("", description="Project folder to import into"),
+    overwrite: bool = Query(False, description="Replace existing documents"),
+) -> DocumentImportResult:
+    """Import the documents in an uploaded archive.
+
+    Args:
+        file: Uploaded archive (spooled to disk by the server, not held in memory)
+        folder: Folder relative to the documents directory
+        overwrite: Replace existing documents instead of skipping them
+
+    Returns:
+        Lists of imported, skipped and rejected documents
+    """
+    try:
+        return await archive_service.import_archive_async(file.file, folder, overwrite)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing archive {file.filename}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to import archive: {str(e)}")
+    finally:
+        await file.close()
+
+
+# History routes end in a fixed segment and take versions as query parameters.
+# Document IDs always end in ".md", so these can't shadow a document (e.g.
+# one in a folder named "revisions") and must precede the plain GET below.
+
+
+@router.get("/{filename:path}/revisions", response_model=RevisionList)
+async def list_revisions(filename: str) -> RevisionList:
+    """List the saved revisions of a document.
+
+    Args:
+        filename: Name of the document file
+
+    Returns:
+        Revisions, oldest first
+    """
+    try:
+        revisions = await document_service.list_revisions_async(filename)
+        return RevisionList(filename=filename, revisions=revisions, count=len(revisions))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing revisions of {filename}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to list revisions: {str(e)}")
+
+
+@router.get("/{filename:path}/revision", response_model=Document)
+async def get_revision(
+    filename: str,
+    request: Request,
+    version: str = Query(..., description="Content hash of the revision"),
+) -> Response:
+    """Get a document as it was at a past revision.
+
+    Args:
+        filename: Name of the document file
+        request: Incoming request (for conditional headers)
+        version: Content hash of the revision
+
+    Returns:
+        Document object at that revision
+    """
+    try:
+        doc = await document_service.load_revision_async(filename, version)
+        return cached_json_response(request, doc, doc.version, doc.modified)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error loading revision {version} of {filename}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to load revision: {str(e)}")
+
+
+@router.get("/{filename:path}/diff", response_model=RevisionDiff)
+async def diff_revisions(
+    filename: str,
+    from_version: str = Query(..., description="Older revision"),
+    to_version: str = Query(..., description="Newer revision"),
+) -> RevisionDiff:
+    """Diff two revisions of a document.
+
+    Args:
+        filename: Name of the document file
+        from_version: Content hash of the older revision
+        to_version: Content hash of the newer revision
+
+    Returns:
+        Unified diff
+    """
+    try:
+        return await document_service.diff_revisions_async(filename, from_version, to_version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error diffing revisions of {filename}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to diff revisions: {str(e)}")
+
+
+@router.get("/{filename:path}", response_model=Document)
+async def get_document(filename: str, request: Request) -> Response:
     """Get a specific document.
 
+    Supports conditional GET: responses carry an ``ETag`` (content hash) and
+    ``Last-Modified``, and matching ``If-None-Match``/``If-Modified-Since``
+    headers get a 304 without a body.
+
     Args:
         filename: Name of the document file
+        request: Incoming request (for conditional headers)
 
     Returns:
         Document object
     """
     try:
-        return document_service.load_document(filename)
+        doc = await document_service.load_document_async(filename)
+        return cached_json_response(request, doc, doc.version, doc.modified)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Document not found: {filename}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error loading document {filename}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to load document: {str(e)}")
@@ -58,18 +255,20 @@ async def create_document(doc: DocumentCreate) -> Document:
     """
     try:
         # Check if document already exists
-        if document_service.document_exists(doc.filename):
+        if await document_service.document_exists_async(doc.filename):
             raise HTTPException(status_code=409, detail=f"Document already exists: {doc.filename}")
 
-        return document_service.save_document(doc.filename, doc.metadata, doc.content)
+        return await document_service.save_document_async(doc.filename, doc.metadata, doc.content)
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error creating document: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to create document: {str(e)}")
 
 
-@router.put("/{filename}", response_model=Document)
+@router.put("/{filename:path}", response_model=Document)
 async def update_document(filename: str, update: DocumentUpdate) -> Document:
     """Update an existing document.
 
@@ -82,7 +281,7 @@ async def update_document(filename: str, update: DocumentUpdate) -> Document:
     """
     try:
         # Load existing document
-        existing_doc = document_service.load_document(filename)
+        existing_doc = await document_service.load_document_async(filename)
 
         # Update metadata if provided
         metadata = update.metadata if update.metadata else existing_doc.metadata
@@ -90,15 +289,47 @@ async def update_document(filename: str, update: DocumentUpdate) -> Document:
         # Update content if provided
         content = update.content if update.content is not None else existing_doc.content
 
-        return document_service.save_document(filename, metadata, content)
+        return await document_service.save_document_async(filename, metadata, content)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Document not found: {filename}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error updating document {filename}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to update document: {str(e)}")
 
 
-@router.delete("/{filename}")
+@router.patch("/{filename:path}", response_model=DocumentPatchResult)
+async def patch_document(filename: str, patch: DocumentPatch) -> DocumentPatchResult:
+    """Apply incremental text edits to a document.
+
+    Args:
+        filename: Name of the document file
+        patch: Edits against a known document version
+
+    Returns:
+        New document version (the client already holds the content)
+    """
+    try:
+        doc = await document_service.patch_document_async(
+            filename, patch.base_version, patch.edits, patch.metadata
+        )
+        return DocumentPatchResult(filename=doc.filename, version=doc.version)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Document not found: {filename}")
+    except DocumentConflictError as e:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": str(e), "current_version": e.current_version},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid patch: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error patching document {filename}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to patch document: {str(e)}")
+
+
+@router.delete("/{filename:path}")
 async def delete_document(filename: str) -> dict:
     """Delete a document.
 
@@ -109,10 +340,12 @@ async def delete_document(filename: str) -> dict:
         Success message
     """
     try:
-        document_service.delete_document(filename)
+        await document_service.delete_document_async(filename)
         return {"message": f"Document deleted: {filename}"}
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Document not found: {filename}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error deleting document {filename}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to delete document: {str(e)}")
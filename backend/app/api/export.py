@@ -1,12 +1,36 @@
 """Export API endpoints."""
 
+import json
 import logging
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, Optional
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
 
+from app.core.admission import Priority, admission
+from app.core.executor import run_io
+from app.models.export import (
+    BatchExportResult,
+    ExportJob,
+    ExportJobStatus,
+    ExportQueueMetrics,
+    ExportStats,
+    ExportStatsSummary,
+    ExportStorageMetrics,
+)
+from app.services.batch_export import batch_export_service
+from app.services.document_service import document_service
+from app.services.export_jobs import ExportQueueFullError, download_name, export_job_manager
 from app.services.export_service import export_service
+from app.services.export_stats import ExportTimer, server_timing
+from app.services.table_export import (
+    TableCase,
+    TableSource,
+    columnar_available,
+    table_export_service,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +45,92 @@ class ExportRequest(BaseModel):
     metadata: dict | None = None
 
 
+class ExportJobRequest(ExportRequest):
+    """Request model for submitting a background export job."""
+
+    format: Literal["pdf", "html"] = "pdf"
+
+
+class BatchExportRequest(BaseModel):
+    """Request model for exporting many documents."""
+
+    filenames: List[str]  # Document IDs, in package order
+    package_filename: Optional[str] = None  # Also build one PDF with a table of contents
+    package_title: Optional[str] = None
+
+
+class TableCaseRequest(BaseModel):
+    """Inputs to run documents with for one row of a table export."""
+
+    name: str = ""
+    inputs: Dict[str, Any] = Field(default_factory=dict)  # Same shape as calculation results
+
+
+class TableExportRequest(BaseModel):
+    """Request model for exporting calc variables as a table."""
+
+    filenames: List[str]  # Document IDs
+    cases: List[TableCaseRequest] = Field(default_factory=list)  # Run each document per case
+    variables: Optional[List[str]] = None  # Columns (default: those of the first case)
+    format: Literal["csv", "parquet", "arrow"] = "csv"
+    output_filename: str = "results"
+
+
+MEDIA_TYPES = {"pdf": "application/pdf", "html": "text/html"}
+
+TABLE_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+class ExportFileResponse(FileResponse):
+    """File response for an export, pinned against retention until it is sent.
+
+    With stats, the stage timings go in a ``Server-Timing`` header (shown in
+    browser dev tools) and the cache status in ``X-Export-Cache``. The file
+    is downloaded as ``filename`` if given, else under its own name.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        media_type: str,
+        stats: Optional[ExportStats] = None,
+        filename: Optional[str] = None,
+    ):
+        headers = None
+        if stats is not None:
+            headers = {"Server-Timing": server_timing(stats), "X-Export-Cache": stats.cache}
+        export_service.retention.pin(path)
+        super().__init__(
+            path=path, media_type=media_type, filename=filename or path.name, headers=headers
+        )
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Also runs if the client disconnects mid-download
+            export_service.retention.release(Path(self.path))
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """Streaming response holding an admission slot until it has been sent."""
+
+    def __init__(self, content, release: Callable[[], None], **kwargs):
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Also runs if the client disconnects mid-stream
+            self.release()
+
+
 @router.post("/pdf")
 async def export_pdf(request: ExportRequest) -> FileResponse:
     """Export markdown content to PDF.
@@ -31,22 +141,23 @@ async def export_pdf(request: ExportRequest) -> FileResponse:
     Returns:
         PDF file response
     """
-    try:
-        pdf_path = export_service.export_to_pdf(
-            request.markdown_content, request.output_filename, request.metadata
-        )
+    async with admission.export.admit():
+        try:
+            # Runs through the job queue so direct exports share its concurrency bound
+            job = export_job_manager.submit(
+                "pdf", request.markdown_content, request.output_filename, request.metadata
+            )
+        except ExportQueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e))
 
-        return FileResponse(
-            path=pdf_path,
-            media_type="application/pdf",
-            filename=pdf_path.name,
-        )
+        job = await export_job_manager.wait(job.id)
+    if job.status == ExportJobStatus.FAILED:
+        raise HTTPException(status_code=503, detail=job.error)
+    if job.status != ExportJobStatus.SUCCEEDED:
+        raise HTTPException(status_code=500, detail=f"PDF export {job.status.value}")
 
-    except RuntimeError as e:
-        raise HTTPException(status_code=503, detail=str(e))
-    except Exception as e:
-        logger.error(f"PDF export error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"PDF export failed: {str(e)}")
+    pdf_path = export_job_manager.result(job.id)
+    return ExportFileResponse(pdf_path, MEDIA_TYPES["pdf"], job.stats, download_name(job))
 
 
 @router.post("/html")
@@ -59,18 +170,117 @@ async def export_html(request: ExportRequest) -> FileResponse:
     Returns:
         HTML file response
     """
-    try:
-        html_path = export_service.export_to_html(request.markdown_content, request.output_filename)
+    async with admission.export.admit():
+        try:
+            timer = ExportTimer("html")
+            html_path = await export_service.export_to_html_async(
+                request.markdown_content, request.output_filename, timer
+            )
+
+            return ExportFileResponse(html_path, MEDIA_TYPES["html"], timer.stats)
+
+        except Exception as e:
+            logger.error(f"HTML export error: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"HTML export failed: {str(e)}")
+
+
+@router.post("/batch")
+async def export_batch(request: BatchExportRequest) -> BatchExportResult:
+    """Export many documents to PDF concurrently.
+
+    Exported files can be fetched from ``/files/{filename}``.
+
+    Args:
+        request: Document IDs and optional package settings
+
+    Returns:
+        Per-document outcomes and timings
+    """
+    if not request.filenames:
+        raise HTTPException(status_code=400, detail="No documents to export")
+    if not export_service.pandoc_available:
+        raise HTTPException(status_code=503, detail="Pandoc is not available")
+
+    async with admission.export.admit(Priority.BATCH):
+        try:
+            return await batch_export_service.export_documents(
+                request.filenames, request.package_filename, request.package_title
+            )
+        except Exception as e:
+            logger.error(f"Batch export error: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Batch export failed: {str(e)}")
+
+
+@router.post("/table")
+async def export_table(request: TableExportRequest) -> StreamingResponse:
+    """Export documents' calc variables as CSV, Parquet or Arrow IPC.
+
+    Runs every document once per case and streams one row per run (list
+    variables expand into a row per element). Column headers carry units,
+    e.g. ``M_max [kN·m]``.
 
-        return FileResponse(
-            path=html_path,
-            media_type="text/html",
-            filename=html_path.name,
+    Args:
+        request: Documents, cases, columns and format
+
+    Returns:
+        Streaming file response
+    """
+    if not request.filenames:
+        raise HTTPException(status_code=400, detail="No documents to export")
+    if request.format != "csv" and not columnar_available():
+        raise HTTPException(
+            status_code=503, detail=f"{request.format} export requires pyarrow to be installed"
+        )
+
+    sources = []
+    for filename in request.filenames:
+        try:
+            doc = await document_service.load_document_async(filename)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        sources.append(TableSource(doc.filename, doc.content))
+
+    cases = [TableCase(case.name, case.inputs) for case in request.cases]
+    if request.format == "csv":
+        chunks = table_export_service.iter_csv(sources, cases, request.variables)
+    else:
+        chunks = table_export_service.iter_columnar(
+            request.format, sources, cases, request.variables
         )
 
-    except Exception as e:
-        logger.error(f"HTML export error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"HTML export failed: {str(e)}")
+    # A sync iterator: Starlette runs the calcs and encoding on a worker thread,
+    # holding the slot until the table has been streamed
+    release = await admission.export.acquire(Priority.BATCH)
+    filename = f"{Path(request.output_filename).stem}.{request.format}"
+    return AdmittedStreamingResponse(
+        chunks,
+        release,
+        media_type=TABLE_MEDIA_TYPES[request.format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/files/{filename}")
+async def download_export(filename: str) -> FileResponse:
+    """Download a previously exported file.
+
+    Args:
+        filename: Exported file name, e.g. ``beam.pdf``
+
+    Returns:
+        File response
+    """
+    suffix = filename.rsplit(".", 1)[-1]
+    unsafe = "/" in filename or "\\" in filename or filename.startswith(".")
+    if unsafe or suffix not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid export filename: {filename}")
+
+    path = export_service.exports_dir / filename
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail=f"Export not found: {filename}")
+    return ExportFileResponse(path, MEDIA_TYPES[suffix])
 
 
 @router.get("/check-pandoc")
@@ -86,3 +296,134 @@ async def check_pandoc() -> dict:
         if export_service.pandoc_available
         else "Pandoc is not installed. PDF export will not work.",
     }
+
+
+@router.post("/jobs", status_code=202)
+async def submit_export_job(request: ExportJobRequest) -> ExportJob:
+    """Queue an export to run in the background.
+
+    Args:
+        request: Export request with content, filename and format
+
+    Returns:
+        The queued job; poll it, subscribe to its events, or download its
+        artifact once it has succeeded
+    """
+    try:
+        return export_job_manager.submit(
+            request.format, request.markdown_content, request.output_filename, request.metadata
+        )
+    except ExportQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/jobs/{job_id}")
+async def get_export_job(job_id: str) -> ExportJob:
+    """Get the status of an export job.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        The job
+    """
+    job = export_job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Export job not found: {job_id}")
+    return job
+
+
+@router.get("/jobs/{job_id}/events")
+async def export_job_events(job_id: str) -> StreamingResponse:
+    """Subscribe to an export job's status changes as Server-Sent Events.
+
+    Each event carries the job as JSON; the stream ends when the job finishes.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        ``text/event-stream`` response
+    """
+    if export_job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Export job not found: {job_id}")
+
+    async def events() -> AsyncIterator[str]:
+        async for job in export_job_manager.watch(job_id):
+            yield f"event: {job.status.value}\ndata: {json.dumps(job.model_dump(mode='json'))}\n\n"
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_export_job(job_id: str) -> FileResponse:
+    """Download the artifact of a succeeded export job.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        PDF or HTML file response
+    """
+    job = export_job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Export job not found: {job_id}")
+    if job.status != ExportJobStatus.SUCCEEDED:
+        raise HTTPException(
+            status_code=409, detail=f"Export job is {job.status.value}, not succeeded"
+        )
+
+    path = export_job_manager.result(job_id)
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Export artifact no longer exists")
+    return ExportFileResponse(path, MEDIA_TYPES[job.format], job.stats, download_name(job))
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_export_job(job_id: str) -> ExportJob:
+    """Cancel a queued or running export job.
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        The job (its status changes to cancelled once the render has stopped)
+    """
+    job = export_job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Export job not found: {job_id}")
+    return job
+
+
+@router.get("/metrics")
+async def export_metrics() -> ExportQueueMetrics:
+    """Get export queue depth and timing metrics.
+
+    Returns:
+        Queue metrics
+    """
+    return export_job_manager.metrics()
+
+
+@router.get("/storage")
+async def export_storage() -> ExportStorageMetrics:
+    """Get disk usage of the exports directory.
+
+    Returns:
+        Storage metrics
+    """
+    return await run_io(export_service.retention.metrics)
+
+
+@router.get("/stats")
+async def export_stats() -> ExportStatsSummary:
+    """Get stage timings, sizes and cache hits of recent exports.
+
+    Returns:
+        Stats summary
+    """
+    return export_service.stats.summary()
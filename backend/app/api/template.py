@@ -2,9 +2,18 @@
 
 import logging
 
-from fastapi import APIRouter, HTTPException
-
-from app.models.template import Template, TemplateList, TemplateRenderRequest
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.core.admission import Priority, admission
+from app.core.http_cache import cached_json_response
+from app.models.template import (
+    Template,
+    TemplateBatchRequest,
+    TemplateBatchResult,
+    TemplateList,
+    TemplateRenderRequest,
+)
+from app.services.template_batch import parse_csv_rows, template_batch_service
 from app.services.template_service import template_service
 
 logger = logging.getLogger(__name__)
@@ -13,32 +22,47 @@ router = APIRouter()
 
 
 @router.get("/list", response_model=TemplateList)
-async def list_templates() -> TemplateList:
+async def list_templates(request: Request) -> Response:
     """List all available templates.
 
+    Supports conditional GET via ``ETag``/``Last-Modified`` validators.
+
+    Args:
+        request: Incoming request (for conditional headers)
+
     Returns:
         List of templates
     """
     try:
-        templates = template_service.list_templates()
-        return TemplateList(templates=templates, count=len(templates))
+        templates = await template_service.list_templates_async()
+        modified = max((t.modified for t in templates if t.modified is not None), default=None)
+        return cached_json_response(
+            request,
+            TemplateList(templates=templates, count=len(templates)),
+            template_service.catalog_version(templates),
+            modified,
+        )
     except Exception as e:
         logger.error(f"Error listing templates: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to list templates: {str(e)}")
 
 
 @router.get("/{filename}", response_model=Template)
-async def get_template(filename: str) -> Template:
+async def get_template(filename: str, request: Request) -> Response:
     """Get a specific template.
 
+    Supports conditional GET via ``ETag``/``Last-Modified`` validators.
+
     Args:
         filename: Name of the template file
+        request: Incoming request (for conditional headers)
 
     Returns:
         Template object
     """
     try:
-        return template_service.load_template(filename)
+        template = await template_service.load_template_async(filename)
+        return cached_json_response(request, template, template.version, template.modified)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Template not found: {filename}")
     except Exception as e:
@@ -56,15 +80,49 @@ async def render_template(request: TemplateRenderRequest) -> dict:
     Returns:
         Rendered template content
     """
-    try:
-        rendered_content = template_service.render_template(
-            request.template_filename, request.variables
-        )
-        return {"content": rendered_content}
-    except FileNotFoundError:
-        raise HTTPException(
-            status_code=404, detail=f"Template not found: {request.template_filename}"
-        )
-    except Exception as e:
-        logger.error(f"Error rendering template: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to render template: {str(e)}")
+    async with admission.template.admit():
+        try:
+            rendered_content = await template_service.render_template_async(
+                request.template_filename, request.variables
+            )
+            return {"content": rendered_content}
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=404, detail=f"Template not found: {request.template_filename}"
+            )
+        except Exception as e:
+            logger.error(f"Error rendering template: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to render template: {str(e)}")
+
+
+@router.post("/batch", response_model=TemplateBatchResult)
+async def instantiate_batch(request: TemplateBatchRequest) -> TemplateBatchResult:
+    """Create one document per row of variables (e.g. a member schedule).
+
+    Args:
+        request: Template, rows (JSON objects or CSV text) and options
+
+    Returns:
+        Per-row outcomes with counts of created, skipped and failed documents
+    """
+    async with admission.template.admit(Priority.BATCH):
+        try:
+            rows = parse_csv_rows(request.csv) if request.csv is not None else request.rows
+            return await template_batch_service.instantiate_async(
+                request.template_filename,
+                rows,
+                filename_pattern=request.filename_pattern,
+                folder=request.folder,
+                metadata=request.metadata,
+                execute=request.execute,
+                overwrite=request.overwrite,
+            )
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=404, detail=f"Template not found: {request.template_filename}"
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Error instantiating template: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Failed to instantiate template: {str(e)}")
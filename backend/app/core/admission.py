@@ -0,0 +1,244 @@
+"""Admission control for compute-heavy endpoints.
+
+Each endpoint class (calculations, exports, template rendering) has a
+limit on requests running at once and a bounded queue of requests waiting
+for a slot. Waiting interactive requests are admitted before batch ones,
+and when the queue is full an interactive request takes the place of the
+most recently queued batch request. Requests that can't be queued, or
+wait longer than ``max_wait``, are refused with 429 and a ``Retry-After``
+estimate, so a burst degrades into fast refusals rather than everything
+slowing down.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import math
+import time
+from collections import deque
+from enum import IntEnum
+from typing import AsyncIterator, Callable, Deque, List, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.models.admission import AdmissionClassMetrics, AdmissionMetrics
+
+logger = logging.getLogger(__name__)
+
+# Number of recent requests the timing metrics are computed over
+METRICS_WINDOW = 100
+
+# Bounds of the Retry-After estimate, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 60
+
+
+class Priority(IntEnum):
+    """Admission priority; lower values are admitted first."""
+
+    INTERACTIVE = 0  # A user is waiting on the response (editor preview, export button)
+    BATCH = 1  # Bulk work (batch exports, table exports, batch instantiation)
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request can't be admitted; served as 429 Too Many Requests."""
+
+    def __init__(self, name: str, reason: str, retry_after: int):
+        super().__init__(f"Too many {name} requests: {reason}")
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded, prioritized wait queue for one endpoint class.
+
+    Must be used from the event loop; a slot released while requests are
+    waiting is handed straight to the first of them.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_wait: float):
+        """Initialize the limiter.
+
+        Args:
+            name: Endpoint class, used in messages and metrics
+            max_concurrency: Requests allowed to run at the same time
+            max_queue: Requests allowed to wait for a free slot
+            max_wait: Seconds a request may wait before it is refused
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self.running = 0
+        # (priority, arrival order, future resolved when a slot is handed over)
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._wait_times: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._hold_times: Deque[float] = deque(maxlen=METRICS_WINDOW)
+
+    @contextlib.asynccontextmanager
+    async def admit(self, priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block.
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the wait times out
+        """
+        release = await self.acquire(priority)
+        try:
+            yield
+        finally:
+            release()
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> Callable[[], None]:
+        """Wait for a slot.
+
+        For work that outlives the handler (e.g. a streamed response), call
+        the returned function once it is done; otherwise use :meth:`admit`.
+
+        Args:
+            priority: Interactive requests are admitted before batch ones
+
+        Returns:
+            Function releasing the slot (safe to call more than once)
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the wait times out
+        """
+        start = time.perf_counter()
+        self._prune()
+
+        if self.running < self.max_concurrency and not self._waiters:
+            self.running += 1
+        else:
+            if len(self._waiters) >= self.max_queue and not (
+                priority == Priority.INTERACTIVE and self._evict_batch()
+            ):
+                raise self._reject("queue is full")
+
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._arrivals), future))
+            try:
+                done, _ = await asyncio.wait({future}, timeout=self.max_wait)
+            except asyncio.CancelledError:
+                # The client went away; give back a slot handed over meanwhile
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    self._release_slot()
+                future.cancel()
+                raise
+            if not done:
+                future.cancel()
+                self._timed_out += 1
+                raise self._reject(f"no slot within {self.max_wait:g}s")
+            future.result()  # Raises if evicted by an interactive request
+
+        self._admitted += 1
+        admitted_at = time.perf_counter()
+        self._wait_times.append(admitted_at - start)
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self._hold_times.append(time.perf_counter() - admitted_at)
+                self._release_slot()
+
+        return release
+
+    def metrics(self) -> AdmissionClassMetrics:
+        """Report running and queued requests, refusals and recent timings."""
+        self._prune()
+        waits = list(self._wait_times)
+        queued_batch = sum(1 for priority, _, _ in self._waiters if priority == Priority.BATCH)
+        return AdmissionClassMetrics(
+            name=self.name,
+            running=self.running,
+            max_concurrency=self.max_concurrency,
+            queued_interactive=len(self._waiters) - queued_batch,
+            queued_batch=queued_batch,
+            max_queue=self.max_queue,
+            admitted=self._admitted,
+            rejected=self._rejected,
+            timed_out=self._timed_out,
+            avg_wait_seconds=sum(waits) / len(waits) if waits else 0.0,
+            max_wait_seconds=max(waits, default=0.0),
+            avg_hold_seconds=self._average_hold(),
+        )
+
+    def _release_slot(self) -> None:
+        """Hand the slot to the first waiter, or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.running -= 1
+
+    def _evict_batch(self) -> bool:
+        """Refuse the most recently queued batch request to make room."""
+        batch = [waiter for waiter in self._waiters if waiter[0] == Priority.BATCH]
+        if not batch:
+            return False
+        _, _, future = max(batch, key=lambda waiter: waiter[1])
+        future.set_exception(self._reject("displaced by an interactive request"))
+        self._prune()
+        return True
+
+    def _prune(self) -> None:
+        """Drop waiters that were evicted, timed out or cancelled."""
+        if any(future.done() for _, _, future in self._waiters):
+            self._waiters = [waiter for waiter in self._waiters if not waiter[2].done()]
+            heapq.heapify(self._waiters)
+
+    def _reject(self, reason: str) -> AdmissionRejectedError:
+        self._rejected += 1
+        # Time for the requests ahead to drain through the available slots
+        ahead = self.running + len(self._waiters)
+        estimate = self._average_hold() * ahead / max(self.max_concurrency, 1)
+        retry_after = min(max(math.ceil(estimate), MIN_RETRY_AFTER), MAX_RETRY_AFTER)
+        logger.warning(f"Refused {self.name} request ({reason}); retry after {retry_after}s")
+        return AdmissionRejectedError(self.name, reason, retry_after)
+
+    def _average_hold(self) -> float:
+        holds = list(self._hold_times)
+        return sum(holds) / len(holds) if holds else 0.0
+
+
+class AdmissionControl:
+    """The limiters of every compute-heavy endpoint class."""
+
+    def __init__(self):
+        """Initialize limiters from settings."""
+        queue, wait = settings.ADMISSION_MAX_QUEUE, settings.ADMISSION_MAX_WAIT
+        self.calc = AdmissionLimiter("calc", settings.ADMISSION_CALC_CONCURRENCY, queue, wait)
+        self.export = AdmissionLimiter("export", settings.ADMISSION_EXPORT_CONCURRENCY, queue, wait)
+        self.template = AdmissionLimiter(
+            "template", settings.ADMISSION_TEMPLATE_CONCURRENCY, queue, wait
+        )
+
+    def metrics(self) -> AdmissionMetrics:
+        """Report every limiter's metrics."""
+        return AdmissionMetrics(
+            classes=[limiter.metrics() for limiter in (self.calc, self.export, self.template)]
+        )
+
+
+async def admission_rejected_handler(request: Request, exc: AdmissionRejectedError) -> JSONResponse:
+    """Serve a refused request as 429 with a ``Retry-After`` header."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+# Singleton instance
+admission = AdmissionControl()
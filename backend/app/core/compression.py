@@ -0,0 +1,178 @@
+"""Negotiated gzip/brotli compression of HTTP responses."""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip is used when brotli isn't installed
+    brotli = None
+
+# Media types that are already compressed, or must reach the client unbuffered
+UNCOMPRESSED_TYPES = (
+    "application/gzip",
+    "application/pdf",
+    "application/vnd.apache.parquet",
+    "application/x-gzip",
+    "application/zip",
+    "image/",
+    "text/event-stream",
+)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the response encoding from an ``Accept-Encoding`` header.
+
+    Brotli is preferred when installed (smaller at similar speed), then gzip;
+    codings the client gives ``q=0`` are never used.
+
+    Args:
+        accept_encoding: Header value, e.g. ``"gzip, deflate, br;q=0.9"``
+
+    Returns:
+        ``"br"``, ``"gzip"`` or None for no compression
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip().lower()] = quality
+
+    def accepted(coding: str) -> bool:
+        return weights.get(coding, weights.get("*", 0.0)) > 0
+
+    if brotli is not None and accepted("br"):
+        return "br"
+    if accepted("gzip"):
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental compressor for one response body."""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31: zlib stream with a gzip header and trailer
+            self._zlib = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self._brotli is not None:
+            output = self._brotli.process(data)
+            return output + self._brotli.finish() if final else output
+        output = self._zlib.compress(data)
+        return output + self._zlib.flush() if final else output
+
+
+class CompressionMiddleware:
+    """Compresses responses with the best coding the client accepts.
+
+    Bodies smaller than ``minimum_size``, responses already carrying a
+    ``Content-Encoding``, partial content and already-compressed media
+    types are passed through. Streamed responses are compressed chunk by
+    chunk, so they stay streamed.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = settings.COMPRESSION_MIN_SIZE):
+        """Initialize the middleware.
+
+        Args:
+            app: ASGI application to wrap
+            minimum_size: Smallest body (bytes) worth compressing
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressingResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _CompressingResponder:
+    """Compresses one response, deciding once its headers and first body arrive."""
+
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send
+        self.start: Optional[Message] = None  # Held until the first body message
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 206, 304)
+                or media_type.startswith(UNCOMPRESSED_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._flush_start()
+                await self.send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            body = self.compressor.compress(body, final=not more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self._flush_start()
+        else:
+            body = self.compressor.compress(body, final=not more_body)
+
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    async def _flush_start(self) -> None:
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self.send(start)
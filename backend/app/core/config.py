@@ -1,5 +1,6 @@
 """Application configuration."""
 
+import os
 from pathlib import Path
 from typing import List
 
@@ -20,6 +21,9 @@ class Settings(BaseSettings):
     PORT: int = 8000
     DEBUG: bool = True
     CORS_ORIGINS: List[str] = ["http://localhost:5173", "http://localhost:3000"]
+    COMPRESSION_MIN_SIZE: int = 500  # bytes; smaller responses are sent uncompressed
+    GZIP_LEVEL: int = 6  # zlib level for gzip responses
+    BROTLI_QUALITY: int = 4  # Brotli quality for br responses (needs the brotli package)
 
     # Directories
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent.parent
@@ -28,16 +32,60 @@ class Settings(BaseSettings):
     EXPORTS_DIR: Path = BASE_DIR / "exports"
     IMAGES_DIR: Path = BASE_DIR / "images"
 
+    # Admission Control Settings (compute-heavy endpoints; excess requests get 429)
+    ADMISSION_CALC_CONCURRENCY: int = 2  # Calc requests at once (blocks still run one at a time)
+    ADMISSION_EXPORT_CONCURRENCY: int = 4  # Direct, batch and table exports at once
+    ADMISSION_TEMPLATE_CONCURRENCY: int = 4  # Template renders and batch instantiations
+    ADMISSION_MAX_QUEUE: int = 32  # Requests per endpoint class waiting for a slot
+    ADMISSION_MAX_WAIT: float = 30.0  # seconds a request may wait before it is refused
+
+    # File I/O Settings
+    IO_THREADS: int = 8  # Worker threads for blocking file I/O off the event loop
+
+    # Document Storage Settings
+    DOCUMENT_FSYNC: bool = True  # fsync document writes for crash durability
+    DOCUMENT_COALESCE_WINDOW: float = 0.5  # seconds; batch rapid autosaves (0 = disabled)
+    DOCUMENT_SHARD_DEPTH: int = 0  # Hashed bucket levels per folder (0 = flat, 1 = 256 buckets)
+    ARCHIVE_MAX_MEMBER_SIZE: int = 10 * 1024 * 1024  # bytes; per-document limit on import
+
+    # Revision History Settings
+    REVISION_HISTORY: bool = True  # Keep every saved version of each document
+    REVISION_COMPRESS_LEVEL: int = 6  # zlib level for stored revisions (0 = uncompressed)
+    REVISION_MAX_DELTA_CHAIN: int = 16  # Deltas before a full snapshot is stored
+    REVISION_CACHE_SIZE: int = 128  # Rebuilt revision texts kept in memory
+    REVISION_LOG_CACHE_SIZE: int = 1024  # Documents whose revision logs are kept in memory
+
     # Calculation Engine Settings
     CALC_TIMEOUT: int = 30  # seconds
     MAX_CALC_MEMORY: int = 512  # MB (not enforced in MVP)
+    CALC_RESULT_CACHE_SIZE: int = 1024  # Executed calc blocks kept for reuse
+    CALC_CODE_CACHE_SIZE: int = 1024  # Compiled calc blocks kept for reuse
+    EXECUTED_DOCUMENT_CACHE_SIZE: int = 64  # Executed Markdown kept per document version
 
     # Export Settings
     PANDOC_PATH: str = "pandoc"  # Use system pandoc
     PDF_ENGINE: str = "pdflatex"  # or xelatex, lualatex
+    EXPORT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # LRU budget for cached exports (0 = off)
+    EXPORTS_MAX_BYTES: int = 1024 * 1024 * 1024  # LRU budget for exported files (0 = unbounded)
+    EXPORTS_MAX_AGE: int = 7 * 24 * 3600  # seconds to keep unused exported files (0 = forever)
+    EXPORT_TIMEOUT: int = 60  # seconds per pandoc run
+    LATEX_PRECOMPILE: bool = True  # Reuse dumped LaTeX preambles (pdflatex + mylatexformat)
+    LATEX_FORMAT_CACHE_SIZE: int = 8  # Precompiled formats to keep
+    LATEX_FRAGMENT_CACHE_SIZE: int = 4096  # Converted document sections kept in memory
+    EXPORT_MAX_CONCURRENCY: int = 2  # Simultaneous pandoc/LaTeX processes
+    EXPORT_MAX_QUEUE: int = 100  # Export jobs allowed to wait for a worker
+    EXPORT_JOB_TTL: int = 3600  # seconds to keep finished job records
+    EXPORT_BATCH_WORKERS: int = 0  # Renders at once in a batch export (0 = EXPORT_MAX_CONCURRENCY)
+    EXPORT_EXECUTE_CALCS: bool = True  # Replace %%calc blocks with their results in exports
+    MATH_CACHE_SIZE: int = 4096  # Math expressions kept pre-rendered for HTML exports
+    TABLE_EXPORT_BATCH_ROWS: int = 10000  # Rows per streamed CSV chunk / Arrow record batch
 
     # Template Settings
-    TEMPLATE_VARIABLES_PATTERN: str = r"\{\{(\w+)\}\}"
+    TEMPLATE_VARIABLES_PATTERN: str = r"\{\{(\w+)\}\}"  # Fallback for templates Jinja2 can't parse
+    TEMPLATE_CACHE_SIZE: int = 400  # Compiled templates kept in memory
+    TEMPLATE_BYTECODE_CACHE: bool = True  # Persist compiled templates under templates/.cache
+    TEMPLATE_BATCH_MAX_ROWS: int = 1000  # Documents one batch instantiation may create
+    TEMPLATE_BATCH_WORKERS: int = os.cpu_count() or 2  # Processes checking calc blocks in a batch
 
     # Future LLM Settings (not used in MVP)
     LLM_ENABLED: bool = False
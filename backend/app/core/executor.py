@@ -0,0 +1,62 @@
+"""Bounded thread pool for blocking file I/O.
+
+FastAPI routes are ``async def``, so any blocking ``open()``/``glob``/``stat``
+call made directly in a route stalls the event loop for every concurrent
+request. Services offload such work through :func:`run_io`, which runs it on a
+dedicated, size-limited pool instead of the loop's unbounded default executor.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Get the shared I/O thread pool, creating it on first use.
+
+    Returns:
+        ThreadPoolExecutor sized by ``settings.IO_THREADS``
+    """
+    global _io_executor
+
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(
+            max_workers=settings.IO_THREADS, thread_name_prefix="engicalc-io"
+        )
+        logger.debug(f"Started I/O thread pool with {settings.IO_THREADS} workers")
+
+    return _io_executor
+
+
+async def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking callable on the I/O thread pool.
+
+    Args:
+        func: Blocking function to call
+        *args: Positional arguments for ``func``
+        **kwargs: Keyword arguments for ``func``
+
+    Returns:
+        Whatever ``func`` returns (exceptions propagate to the caller)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_io_executor() -> None:
+    """Shut down the shared I/O thread pool, waiting for pending work."""
+    global _io_executor
+
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=True)
+        _io_executor = None
@@ -0,0 +1,71 @@
+"""HTTP validation caching (ETag / Last-Modified) for API responses."""
+
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.responses import FastJSONResponse
+
+
+def is_not_modified(request: Request, etag: str, modified: Optional[float]) -> bool:
+    """Evaluate conditional request headers against the current representation.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since`` (RFC 9110).
+
+    Args:
+        request: Incoming request
+        etag: Quoted entity tag of the current representation
+        modified: Last modification time (epoch seconds), if known
+
+    Returns:
+        True if the client's cached copy is still current
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: ignore any W/ prefix on the client's tags
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(modified) <= since
+
+    return False
+
+
+def cached_json_response(
+    request: Request, content: Any, version: str, modified: Optional[float] = None
+) -> Response:
+    """Build a JSON response with validators, or a 304 if the client is current.
+
+    Args:
+        request: Incoming request
+        content: Model or data to serialize
+        version: Strong content hash used as the entity tag
+        modified: Last modification time (epoch seconds), if known
+
+    Returns:
+        304 Not Modified or 200 JSON response, both carrying the validators
+    """
+    etag = f'"{version}"'
+    headers = {
+        "ETag": etag,
+        # Let clients keep a copy but revalidate before each use
+        "Cache-Control": "no-cache",
+    }
+    if modified is not None:
+        headers["Last-Modified"] = formatdate(modified, usegmt=True)
+
+    if is_not_modified(request, etag, modified):
+        return Response(status_code=304, headers=headers)
+
+    return FastJSONResponse(content=jsonable_encoder(content), headers=headers)
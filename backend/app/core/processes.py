@@ -0,0 +1,161 @@
+"""Running multi-step external process pipelines, sync or async.
+
+A PDF render may take several external commands (pandoc, one or more LaTeX
+runs) with Python logic in between that depends on their output. Pipelines
+are written once as generators that yield an :class:`ExternalCommand`, are
+sent back its :class:`subprocess.CompletedProcess`, and finally return their
+result. :func:`run_pipeline` drives one with ``subprocess.run``;
+:func:`run_pipeline_async` drives it with asyncio subprocesses, killing the
+running process if the awaiting task is cancelled.
+"""
+
+import asyncio
+import contextlib
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Generator, List, NamedTuple, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+from app.core.executor import run_io
+
+T = TypeVar("T")
+
+
+class ExternalCommand(NamedTuple):
+    """One external process for a pipeline to run."""
+
+    args: List[str]
+    cwd: Optional[Path] = None
+    env: Optional[Dict[str, str]] = None
+    input: Optional[bytes] = None  # Written to stdin
+
+
+# Yields commands, is sent each one's completed process, returns a result
+Pipeline = Generator[ExternalCommand, subprocess.CompletedProcess, T]
+
+# Called with each finished command and its run time in seconds
+CommandObserver = Callable[[ExternalCommand, float], None]
+
+
+def run_command(command: ExternalCommand, timeout: float) -> subprocess.CompletedProcess:
+    """Run one command to completion, capturing stdout and stderr as bytes.
+
+    Raises:
+        subprocess.TimeoutExpired: If the command exceeds ``timeout``
+    """
+    return subprocess.run(
+        command.args,
+        input=command.input,
+        cwd=command.cwd,
+        env=command.env,
+        capture_output=True,
+        timeout=timeout,
+    )
+
+
+async def run_command_async(
+    command: ExternalCommand, timeout: float
+) -> subprocess.CompletedProcess:
+    """Async variant of :func:`run_command`.
+
+    Falls back to running :func:`run_command` on the I/O thread pool on
+    event loops without subprocess support (e.g. the selector loop uvicorn
+    uses on Windows with --reload).
+    """
+    stdin = asyncio.subprocess.PIPE if command.input is not None else asyncio.subprocess.DEVNULL
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command.args,
+            stdin=stdin,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=command.cwd,
+            env=command.env,
+        )
+    except NotImplementedError:
+        return await run_io(run_command, command, timeout)
+
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(command.input), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise subprocess.TimeoutExpired(command.args, timeout)
+    except BaseException:
+        # Cancelled: don't leave the process running
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+
+    return subprocess.CompletedProcess(command.args, process.returncode, stdout, stderr)
+
+
+def run_pipeline(
+    pipeline: Pipeline[T],
+    timeout: Optional[float] = None,
+    observer: Optional[CommandObserver] = None,
+) -> T:
+    """Drive a pipeline, running each command with ``subprocess.run``.
+
+    Args:
+        pipeline: Pipeline generator
+        timeout: Seconds allowed per command (default ``settings.EXPORT_TIMEOUT``)
+        observer: Told about each command that completed
+
+    Returns:
+        The pipeline's result
+
+    Raises:
+        subprocess.TimeoutExpired: If a command exceeds the timeout
+    """
+    timeout = timeout or settings.EXPORT_TIMEOUT
+    with contextlib.closing(pipeline):
+        command, result = _advance(pipeline, None)
+        while command is not None:
+            start = time.perf_counter()
+            completed = run_command(command, timeout)
+            if observer is not None:
+                observer(command, time.perf_counter() - start)
+            command, result = _advance(pipeline, completed)
+        return result
+
+
+async def run_pipeline_async(
+    pipeline: Pipeline[T],
+    timeout: Optional[float] = None,
+    observer: Optional[CommandObserver] = None,
+) -> T:
+    """Async variant of :func:`run_pipeline`.
+
+    The pipeline's own steps (file I/O between commands) run on the I/O
+    thread pool.
+    """
+    timeout = timeout or settings.EXPORT_TIMEOUT
+    try:
+        command, result = await run_io(_advance, pipeline, None)
+        while command is not None:
+            start = time.perf_counter()
+            completed = await run_command_async(command, timeout)
+            if observer is not None:
+                observer(command, time.perf_counter() - start)
+            command, result = await run_io(_advance, pipeline, completed)
+        return result
+    finally:
+        # A step may still be executing on the pool if we were cancelled
+        # mid-step; its own cleanup then runs when the generator is collected
+        with contextlib.suppress(ValueError):
+            await run_io(pipeline.close)
+
+
+def _advance(pipeline: Pipeline[T], value: Any) -> Tuple[Optional[ExternalCommand], Optional[T]]:
+    """Resume a pipeline, returning (next command, None) or (None, result).
+
+    StopIteration is caught here because it cannot propagate through an
+    asyncio future.
+    """
+    try:
+        return pipeline.send(value), None
+    except StopIteration as stop:
+        return None, stop.value
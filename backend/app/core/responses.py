@@ -0,0 +1,34 @@
+"""JSON response encoding."""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library encoder is used without it
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as compact UTF-8 JSON.
+
+    Uses orjson when installed (several times faster on large payloads such
+    as calculation contexts), falling back to the standard library for
+    anything orjson rejects, e.g. integers wider than 64 bits.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    text = json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with :func:`dumps`; the app's default response class."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
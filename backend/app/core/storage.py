@@ -0,0 +1,208 @@
+"""Crash-safe file writing helpers."""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Suffix of in-progress atomic writes; never matches a real document glob
+TEMP_SUFFIX = ".tmp"
+
+
+def atomic_write_text(path: Path, text: str, fsync: bool = True) -> None:
+    """Atomically replace a file's contents with UTF-8 text.
+
+    Args:
+        path: File to write
+        text: New file contents
+        fsync: Flush file and directory to disk before returning
+    """
+    atomic_write_bytes(path, text.encode("utf-8"), fsync=fsync)
+
+
+def atomic_write_bytes(path: Path, data: bytes, fsync: bool = True) -> None:
+    """Atomically replace a file's contents.
+
+    The data is written to a temporary file in the same directory and then
+    renamed over the target, so readers (and a crash) only ever see the old
+    or the new contents, never a truncated file.
+
+    Args:
+        path: File to write
+        data: New file contents
+        fsync: Flush file and directory to disk before returning
+    """
+    # Exclusive create (rather than mkstemp) keeps the usual umask permissions
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}{TEMP_SUFFIX}")
+    try:
+        with open(temp_path, "xb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    if fsync and os.name != "nt":
+        # Persist the rename itself (not supported for directories on Windows)
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class PendingWrite(NamedTuple):
+    """Contents waiting in a :class:`WriteCoalescer`."""
+
+    text: str
+    written_at: float  # When they were handed to write(), as time.time()
+
+
+class WriteCoalescer:
+    """Write-behind buffer that collapses rapid rewrites of the same file.
+
+    Each :meth:`write` replaces the pending contents for a path; the file is
+    written once, ``window`` seconds after the first unflushed write. Callers
+    must consult :meth:`pending` before reading from disk so they always see
+    the latest contents.
+
+    A write may carry an ``on_written`` callback, run with the text once it
+    reaches disk; for a coalesced burst only the last write's callback runs.
+    """
+
+    def __init__(self, window: float, fsync: bool = True):
+        """Initialize the coalescer.
+
+        Args:
+            window: Seconds to hold writes before flushing (0 writes through)
+            fsync: Passed to :func:`atomic_write_text`
+        """
+        self.window = window
+        self.fsync = fsync
+        self._pending: Dict[Path, PendingWrite] = {}
+        self._callbacks: Dict[Path, Callable[[str], None]] = {}
+        self._timers: Dict[Path, threading.Timer] = {}
+        self._lock = threading.Lock()  # Guards _pending and _timers
+        self._write_lock = threading.Lock()  # Serializes disk writes
+
+    def write(
+        self, path: Path, text: str, on_written: Optional[Callable[[str], None]] = None
+    ) -> None:
+        """Schedule a write of ``text`` to ``path``.
+
+        Args:
+            path: File to write
+            text: New file contents
+            on_written: Called with ``text`` once it has been written
+        """
+        if self.window <= 0:
+            with self._write_lock:
+                atomic_write_text(path, text, fsync=self.fsync)
+                self._notify(on_written, path, text)
+            return
+
+        with self._lock:
+            self._pending[path] = PendingWrite(text, time.time())
+            if on_written is not None:
+                self._callbacks[path] = on_written
+            else:
+                self._callbacks.pop(path, None)
+            if path not in self._timers:
+                timer = threading.Timer(self.window, self.flush, args=(path,))
+                timer.daemon = True
+                self._timers[path] = timer
+                timer.start()
+
+    def pending(self, path: Path) -> Optional[str]:
+        """Get contents waiting to be written to ``path``.
+
+        Args:
+            path: File path
+
+        Returns:
+            Latest unflushed contents, or None if the disk is up to date
+        """
+        pending = self.pending_write(path)
+        return pending.text if pending is not None else None
+
+    def pending_write(self, path: Path) -> Optional[PendingWrite]:
+        """Get contents waiting to be written to ``path``, with when they arrived.
+
+        Args:
+            path: File path
+
+        Returns:
+            Latest unflushed write, or None if the disk is up to date
+        """
+        with self._lock:
+            return self._pending.get(path)
+
+    def flush(self, path: Path) -> None:
+        """Write any pending contents for ``path`` to disk now.
+
+        Args:
+            path: File path
+        """
+        with self._write_lock:
+            with self._lock:
+                pending = self._pending.get(path)
+                on_written = self._callbacks.get(path)
+                timer = self._timers.pop(path, None)
+            if timer is not None:
+                timer.cancel()
+            if pending is None:
+                return
+            text = pending.text
+
+            try:
+                atomic_write_text(path, text, fsync=self.fsync)
+            except Exception as e:
+                # Contents stay pending and are retried on the next write or flush
+                logger.error(f"Deferred write to {path} failed: {e}", exc_info=True)
+                raise
+
+            with self._lock:
+                # Keep newer contents that arrived while we were writing
+                if self._pending.get(path) is pending:
+                    del self._pending[path]
+                    self._callbacks.pop(path, None)
+
+            self._notify(on_written, path, text)
+
+    def flush_all(self) -> None:
+        """Write all pending contents to disk."""
+        with self._lock:
+            paths = list(self._pending)
+        for path in paths:
+            self.flush(path)
+
+    def discard(self, path: Path) -> None:
+        """Drop any pending write for ``path`` (e.g. before deleting it).
+
+        Args:
+            path: File path
+        """
+        with self._write_lock, self._lock:
+            self._pending.pop(path, None)
+            self._callbacks.pop(path, None)
+            timer = self._timers.pop(path, None)
+            if timer is not None:
+                timer.cancel()
+
+    @staticmethod
+    def _notify(on_written: Optional[Callable[[str], None]], path: Path, text: str) -> None:
+        """Run a write's callback; its failure doesn't undo the write."""
+        if on_written is None:
+            return
+        try:
+            on_written(text)
+        except Exception as e:
+            logger.error(f"Callback after writing {path} failed: {e}", exc_info=True)
@@ -8,8 +8,17 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from app.api import calculation, document, export, template
+from app.api import admission, calculation, document, export, template
+from app.core.admission import AdmissionRejectedError, admission_rejected_handler
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.executor import shutdown_io_executor
+from app.core.responses import FastJSONResponse
+from app.services.document_service import document_service
+from app.services.export_jobs import export_job_manager
+from app.services.export_service import export_service
+from app.services.template_batch import template_batch_service
+from app.services.template_service import template_service
 
 # Configure logging
 logging.basicConfig(
@@ -32,9 +41,23 @@ async def lifespan(app: FastAPI):
     settings.TEMPLATES_DIR.mkdir(parents=True, exist_ok=True)
     settings.EXPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
+    # Clean up after renders interrupted by the last shutdown, then trim old exports
+    export_service.retention.sweep_orphans()
+    export_service.retention.enforce()
+
+    # Check the pandoc and LaTeX versions now rather than during an export
+    export_service.warm_up()
+
+    # Build the template catalog so the first listing doesn't parse every file
+    logger.info(f"Templates available: {len(template_service.list_templates())}")
+
     yield
 
     logger.info("Shutting down EngiCalc backend...")
+    await export_job_manager.shutdown()
+    template_batch_service.shutdown()
+    document_service.flush()
+    shutdown_io_executor()
 
 
 # Create FastAPI app
@@ -43,8 +66,15 @@ app = FastAPI(
     description="Engineering calculation tool backend API",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+# Refuse excess compute-heavy requests with 429 + Retry-After
+app.add_exception_handler(AdmissionRejectedError, admission_rejected_handler)
+
+# Compress responses (gzip, or brotli when installed) for clients that accept it
+app.add_middleware(CompressionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -59,6 +89,7 @@ app.include_router(calculation.router, prefix="/api/calculation", tags=["calcula
 app.include_router(document.router, prefix="/api/document", tags=["document"])
 app.include_router(export.router, prefix="/api/export", tags=["export"])
 app.include_router(template.router, prefix="/api/template", tags=["template"])
+app.include_router(admission.router, prefix="/api/admission", tags=["admission"])
 
 
 @app.get("/")
@@ -0,0 +1,28 @@
+"""Admission control data models."""
+
+from typing import List
+
+from pydantic import BaseModel
+
+
+class AdmissionClassMetrics(BaseModel):
+    """Load and refusals of one endpoint class."""
+
+    name: str  # "calc", "export" or "template"
+    running: int
+    max_concurrency: int
+    queued_interactive: int
+    queued_batch: int
+    max_queue: int
+    admitted: int
+    rejected: int  # Refused with 429 (queue full, displaced or timed out)
+    timed_out: int
+    avg_wait_seconds: float  # Time from arrival to admission, recent requests
+    max_wait_seconds: float
+    avg_hold_seconds: float  # Time a slot is held, recent requests
+
+
+class AdmissionMetrics(BaseModel):
+    """Admission control state of every endpoint class."""
+
+    classes: List[AdmissionClassMetrics]
@@ -1,7 +1,7 @@
 """Document data models."""
 
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -26,6 +26,8 @@ class Document(BaseModel):
     metadata: DocumentMetadata
     content: str  # Markdown content without frontmatter
     raw_content: str  # Full content including frontmatter
+    version: str = ""  # Content hash of the stored file, for optimistic concurrency
+    modified: Optional[float] = None  # Last modification time (epoch seconds)
 
 
 class DocumentCreate(BaseModel):
@@ -43,8 +45,77 @@ class DocumentUpdate(BaseModel):
     content: Optional[str] = None
 
 
+class TextEdit(BaseModel):
+    """Replace ``content[start:end]`` with ``text``.
+
+    Offsets are character positions in the Markdown content (without
+    frontmatter) of the base version; insertions use ``start == end`` and
+    deletions use an empty ``text``.
+    """
+
+    start: int = Field(ge=0)
+    end: int = Field(ge=0)
+    text: str = ""
+
+
+class DocumentPatch(BaseModel):
+    """Request model for incrementally updating a document."""
+
+    base_version: str  # Version the edits were made against
+    edits: List[TextEdit] = Field(default_factory=list)
+    metadata: Optional[DocumentMetadata] = None
+
+
+class DocumentPatchResult(BaseModel):
+    """Result of a patch: only the new version, not the full document."""
+
+    filename: str
+    version: str
+
+
 class DocumentList(BaseModel):
     """List of documents."""
 
     documents: list[Dict[str, Any]]
     count: int
+
+
+class FolderList(BaseModel):
+    """List of project folders."""
+
+    folders: List[str]
+    count: int
+
+
+class DocumentImportResult(BaseModel):
+    """Outcome of a bulk document import."""
+
+    imported: List[str] = Field(default_factory=list)
+    skipped: List[str] = Field(default_factory=list)  # Already existed (overwrite off)
+    errors: Dict[str, str] = Field(default_factory=dict)  # Member name -> reason
+
+
+class Revision(BaseModel):
+    """One saved version of a document."""
+
+    number: int  # 1-based position in the document's history
+    version: str  # Content hash of the stored file
+    timestamp: float  # Save time (epoch seconds)
+    size: int  # Bytes
+
+
+class RevisionList(BaseModel):
+    """Revision history of a document."""
+
+    filename: str
+    revisions: List[Revision]
+    count: int
+
+
+class RevisionDiff(BaseModel):
+    """Unified diff between two revisions of a document."""
+
+    filename: str
+    from_version: str
+    to_version: str
+    diff: str
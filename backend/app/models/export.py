@@ -0,0 +1,115 @@
+"""Export data models."""
+
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class ExportJobStatus(str, Enum):
+    """Lifecycle of an export job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        return self in (self.SUCCEEDED, self.FAILED, self.CANCELLED)
+
+
+class ExportStats(BaseModel):
+    """Timing breakdown of one export."""
+
+    format: str  # "pdf" or "html"
+    cache: str = "miss"  # "hit", "miss" or "disabled"
+    prepare_seconds: float = 0.0  # Cache key, calc execution
+    pandoc_seconds: float = 0.0  # Markdown conversion (pandoc, or the HTML renderer)
+    engine_seconds: float = 0.0  # LaTeX runs driven directly (precompiled formats)
+    write_seconds: float = 0.0  # Scratch files, publishing, caching, retention
+    total_seconds: float = 0.0
+    size_bytes: int = 0
+    processes: int = 0  # External commands run
+
+
+class ExportJob(BaseModel):
+    """State of an asynchronous export job."""
+
+    id: str
+    format: str  # "pdf" or "html"
+    output_filename: str
+    status: ExportJobStatus = ExportJobStatus.QUEUED
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    stats: Optional[ExportStats] = None  # Set once the job has succeeded
+
+
+class ExportQueueMetrics(BaseModel):
+    """Export queue depth and timing statistics."""
+
+    queued: int
+    running: int
+    max_concurrency: int
+    succeeded: int
+    failed: int
+    cancelled: int
+    avg_wait_seconds: float  # Time from submission to start, recent jobs
+    avg_run_seconds: float  # Time from start to finish, recent jobs
+    max_run_seconds: float
+
+
+class ExportStatsSummary(BaseModel):
+    """Stage timings aggregated over recent exports."""
+
+    exports: int  # Exports summarized (the most recent ones)
+    cache_hits: int
+    avg_prepare_seconds: float
+    avg_pandoc_seconds: float
+    avg_engine_seconds: float
+    avg_write_seconds: float
+    avg_total_seconds: float
+    max_total_seconds: float
+    avg_size_bytes: float
+    recent: List[ExportStats]  # Newest first
+
+
+class ExportStorageMetrics(BaseModel):
+    """Disk usage of the exports directory."""
+
+    files: int  # Exported files currently kept
+    bytes: int
+    max_bytes: int  # 0 = unbounded
+    max_age_seconds: int  # 0 = kept forever
+    oldest_seconds: float  # Age of the least recently used export
+    cache_bytes: int  # Export cache (budgeted separately)
+    formats_bytes: int  # Precompiled LaTeX formats
+    pinned: int  # Exports being downloaded
+    evicted_files: int  # Removed by retention since startup
+    evicted_bytes: int
+    orphans_removed: int  # Leftover temp files swept since startup
+
+
+class BatchExportItem(BaseModel):
+    """Outcome of one document in a batch export."""
+
+    filename: str  # Document ID (or source name)
+    output_filename: Optional[str] = None  # Exported file, if it succeeded
+    seconds: float = 0.0  # Render time, excluding time waiting for a worker
+    error: Optional[str] = None
+
+
+class BatchExportResult(BaseModel):
+    """Result of a batch export."""
+
+    items: List[BatchExportItem]
+    succeeded: int
+    failed: int
+    workers: int
+    package_filename: Optional[str] = None  # Concatenated package, if requested
+    package_seconds: Optional[float] = None
+    package_error: Optional[str] = None
+    total_seconds: float
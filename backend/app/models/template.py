@@ -2,7 +2,9 @@
 
 from typing import Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.models.document import DocumentMetadata
 
 
 class TemplateMetadata(BaseModel):
@@ -20,6 +22,10 @@ class Template(BaseModel):
     filename: str
     metadata: TemplateMetadata
     content: str  # Template content
+    version: str = ""  # Content hash of the template file
+    modified: Optional[float] = None  # Last modification time (epoch seconds)
+    calc_blocks: int = 0  # Number of %%calc blocks
+    calc_errors: List[str] = []  # Problems found by compiling and checking the calc blocks
 
 
 class TemplateRenderRequest(BaseModel):
@@ -34,3 +40,38 @@ class TemplateList(BaseModel):
 
     templates: List[Template]
     count: int
+
+
+class TemplateBatchRequest(BaseModel):
+    """Request to create one document per row of variables from a template."""
+
+    template_filename: str
+    rows: List[Dict[str, str]] = Field(default_factory=list)  # Variable sets, one per document
+    csv: Optional[str] = None  # Alternatively, CSV text with a header row of variable names
+    # Jinja2 pattern for each document ID; sees the row's variables and ``row`` (1-based)
+    filename_pattern: Optional[str] = None
+    folder: str = ""  # Project folder to create the documents in
+    metadata: DocumentMetadata = Field(default_factory=DocumentMetadata)  # Frontmatter for all
+    execute: bool = False  # Run every document's calc blocks and reject those that fail
+    overwrite: bool = False  # Replace existing documents instead of skipping them
+
+
+class TemplateBatchItem(BaseModel):
+    """Outcome of one row of a batch instantiation."""
+
+    row: int  # 1-based row number
+    filename: Optional[str] = None  # Document ID, once the name pattern rendered
+    status: str = "created"  # "created", "skipped" (already exists) or "failed"
+    error: Optional[str] = None
+
+
+class TemplateBatchResult(BaseModel):
+    """Result of a batch instantiation."""
+
+    items: List[TemplateBatchItem]
+    created: int
+    skipped: int
+    failed: int
+    executed: int = 0  # Distinct documents whose calc blocks were run
+    workers: int = 0  # Processes used to run them (0 = in the server process)
+    total_seconds: float
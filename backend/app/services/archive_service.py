@@ -0,0 +1,262 @@
+"""Bulk import/export of project folders as zip or tar.gz archives."""
+
+import io
+import logging
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Tuple, Union
+
+from app.core.config import settings
+from app.core.executor import run_io
+from app.models.document import DocumentImportResult
+from app.services.document_service import DocumentService, document_service
+from app.services.export_service import ExportService, export_service
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMATS = {
+    "zip": "application/zip",
+    "tar.gz": "application/gzip",
+}
+
+# Export artifacts are stored under this prefix inside archives
+EXPORTS_ARCNAME = "exports"
+
+# Archive member source: a document ID or an export file path
+MemberSource = Union[str, Path]
+# Reads an archive member, returning at most ``limit + 1`` bytes
+MemberReader = Callable[[int], bytes]
+
+
+class _ChunkWriter:
+    """Write-only file object that hands written bytes back for streaming.
+
+    Archive writers treat it as an unseekable stream, so nothing is buffered
+    beyond the member currently being written.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        """Return and clear everything written since the last drain."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ArchiveService:
+    """Service for moving project folders between machines as archives."""
+
+    def __init__(
+        self,
+        documents: DocumentService = document_service,
+        exports: ExportService = export_service,
+    ):
+        """Initialize archive service.
+
+        Args:
+            documents: Document service to read from and import into
+            exports: Export service whose artifacts can be bundled
+        """
+        self.documents = documents
+        self.exports = exports
+
+    def iter_archive(
+        self, folder: str = "", fmt: str = "zip", include_exports: bool = False
+    ) -> Iterator[bytes]:
+        """Build an archive of a project folder as a stream of byte chunks.
+
+        The folder is validated and listed eagerly so errors surface before
+        streaming starts; members are then read and compressed one at a time.
+
+        Args:
+            folder: Folder ID to archive, recursively ("" = all documents)
+            fmt: ``"zip"`` or ``"tar.gz"``
+            include_exports: Also bundle exported PDF/HTML files named after
+                the folder's documents
+
+        Returns:
+            Iterator of archive bytes
+
+        Raises:
+            FileNotFoundError: If the folder doesn't exist
+            ValueError: If the folder ID or format is invalid
+        """
+        if fmt not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unsupported archive format: {fmt}")
+        if not self.documents.folder_exists(folder):
+            raise FileNotFoundError(f"Folder not found: {folder}")
+
+        folder = folder.strip("/")
+        prefix = f"{folder}/" if folder else ""
+        doc_ids = [d["filename"] for d in self.documents.list_documents(folder, recursive=True)]
+        members: List[Tuple[str, MemberSource]] = [(d[len(prefix) :], d) for d in doc_ids]
+
+        if include_exports:
+            stems = {Path(doc_id).stem for doc_id in doc_ids}
+            for path in sorted(self.exports.exports_dir.glob("*")):
+                if path.is_file() and path.stem in stems and path.suffix in (".pdf", ".html"):
+                    members.append((f"{EXPORTS_ARCNAME}/{path.name}", path))
+
+        logger.info(f"Archiving {len(members)} files from folder '{folder}' as {fmt}")
+        return self._stream(members, fmt)
+
+    def _stream(self, members: List[Tuple[str, MemberSource]], fmt: str) -> Iterator[bytes]:
+        """Write members into an archive, yielding output after each one.
+
+        Args:
+            members: (archive name, document ID or export file path) pairs
+            fmt: Archive format
+
+        Yields:
+            Chunks of the archive
+        """
+        buffer = _ChunkWriter()
+
+        if fmt == "zip":
+            with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for arcname, source in members:
+                    if isinstance(source, Path):
+                        archive.write(source, arcname)
+                    else:
+                        archive.writestr(arcname, self._read_document(source))
+                    yield buffer.drain()
+        else:
+            with tarfile.open(fileobj=buffer, mode="w|gz") as archive:
+                for arcname, source in members:
+                    if isinstance(source, Path):
+                        archive.add(source, arcname)
+                    else:
+                        data = self._read_document(source)
+                        info = tarfile.TarInfo(arcname)
+                        info.size = len(data)
+                        info.mode = 0o644
+                        archive.addfile(info, io.BytesIO(data))
+                    yield buffer.drain()
+
+        yield buffer.drain()
+
+    def _read_document(self, doc_id: str) -> bytes:
+        """Read a document's stored text as UTF-8 bytes."""
+        return self.documents.read_document_text(doc_id).encode("utf-8")
+
+    def import_archive(
+        self, fileobj: BinaryIO, folder: str = "", overwrite: bool = False
+    ) -> DocumentImportResult:
+        """Import the Markdown documents in a zip or tar archive.
+
+        Members are read one at a time from the (spooled) upload and handed to
+        :meth:`DocumentService.import_documents`, which commits them as one
+        batch. Non-Markdown members such as bundled exports are ignored.
+
+        Args:
+            fileobj: Seekable binary file containing the archive
+            folder: Folder ID to import into ("" = root)
+            overwrite: Replace existing documents instead of skipping them
+
+        Returns:
+            Import result
+
+        Raises:
+            ValueError: If the folder ID is invalid or the file is not a
+                supported archive
+        """
+        # Reject an invalid target folder up front rather than per member
+        self.documents.folder_exists(folder)
+
+        errors: Dict[str, str] = {}
+        prefix = f"{folder.strip('/')}/" if folder.strip("/") else ""
+
+        def members() -> Iterator[Tuple[str, str]]:
+            for name, read in self._iter_members(fileobj):
+                try:
+                    # "tar czf project.tgz ." produces "./"-prefixed names
+                    yield prefix + name.removeprefix("./"), self._read_member(name, read)
+                except ValueError as e:
+                    errors[name] = str(e)
+
+        result = self.documents.import_documents(members(), overwrite=overwrite)
+        result.errors.update(errors)
+        return result
+
+    def _iter_members(self, fileobj: BinaryIO) -> Iterator[Tuple[str, MemberReader]]:
+        """Iterate over the Markdown file members of an archive.
+
+        Args:
+            fileobj: Seekable binary file containing the archive
+
+        Yields:
+            (member name, reader) pairs
+        """
+        if zipfile.is_zipfile(fileobj):
+            fileobj.seek(0)
+            with zipfile.ZipFile(fileobj) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or not info.filename.endswith(".md"):
+                        continue
+                    yield info.filename, lambda limit, info=info: _read_limited(
+                        archive.open(info), limit
+                    )
+            return
+
+        fileobj.seek(0)
+        try:
+            archive = tarfile.open(fileobj=fileobj, mode="r:*")
+        except tarfile.TarError:
+            raise ValueError("Upload is not a zip or tar archive")
+
+        with archive:
+            for member in archive:
+                if not member.isfile() or not member.name.endswith(".md"):
+                    continue
+                yield member.name, lambda limit, member=member: _read_limited(
+                    archive.extractfile(member), limit
+                )
+
+    def _read_member(self, name: str, read: MemberReader) -> str:
+        """Read and decode one archive member, enforcing the size limit.
+
+        Raises:
+            ValueError: If the member is too large or not UTF-8 text
+        """
+        limit = settings.ARCHIVE_MAX_MEMBER_SIZE
+        data = read(limit)
+        if len(data) > limit:
+            raise ValueError(f"File exceeds {limit} bytes")
+        try:
+            return data.decode("utf-8")
+        except UnicodeDecodeError:
+            raise ValueError("File is not UTF-8 text")
+
+    # Async variants - run the blocking file I/O on the shared I/O thread pool
+
+    async def iter_archive_async(
+        self, folder: str = "", fmt: str = "zip", include_exports: bool = False
+    ) -> Iterator[bytes]:
+        """Async variant of :meth:`iter_archive` (the returned iterator is sync)."""
+        return await run_io(self.iter_archive, folder, fmt, include_exports)
+
+    async def import_archive_async(
+        self, fileobj: BinaryIO, folder: str = "", overwrite: bool = False
+    ) -> DocumentImportResult:
+        """Async variant of :meth:`import_archive`."""
+        return await run_io(self.import_archive, fileobj, folder, overwrite)
+
+
+def _read_limited(stream: BinaryIO, limit: int) -> bytes:
+    """Read at most ``limit + 1`` bytes so oversized members can be detected."""
+    with stream:
+        return stream.read(limit + 1)
+
+
+# Singleton instance
+archive_service = ArchiveService()
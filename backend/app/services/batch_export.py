@@ -0,0 +1,209 @@
+"""Concurrent PDF export of many documents, with optional packaging."""
+
+import asyncio
+import logging
+import re
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence
+
+from app.core.config import settings
+from app.models.export import BatchExportItem, BatchExportResult
+from app.services.document_service import DocumentService, document_service
+from app.services.export_jobs import ExportJobManager, export_job_manager
+from app.services.export_service import ExportService, export_service
+
+logger = logging.getLogger(__name__)
+
+# ATX heading at the start of a line, and code fence delimiters
+HEADING_PATTERN = re.compile(r"^(#{1,5})(?=\s)")
+FENCE_PATTERN = re.compile(r"^(```|~~~)")
+
+PAGE_BREAK = "\n\n\\newpage\n\n"
+
+
+class BatchSource(NamedTuple):
+    """One document to render in a batch."""
+
+    name: str  # Document ID or other label reported back
+    markdown: str
+    output_filename: str
+    metadata: Optional[dict] = None
+
+
+def demote_headings(markdown: str) -> str:
+    """Push every ATX heading down one level, leaving code blocks alone.
+
+    Used when a document becomes a chapter of a package, so its own ``#``
+    headings sit under the chapter heading in the table of contents.
+    """
+    lines = []
+    in_fence = False
+    for line in markdown.splitlines():
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            line = HEADING_PATTERN.sub(r"#\1", line)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def output_name(doc_id: str) -> str:
+    """Flatten a (possibly nested) document ID into an export filename stem."""
+    return doc_id.removesuffix(".md").replace("/", "_")
+
+
+class BatchExportService:
+    """Service for exporting many documents at once.
+
+    Each render is a separate pandoc/LaTeX process, so running them
+    concurrently spreads a calculation package across cores without a
+    Python process pool. Renders take the job manager's render slots, so a
+    batch shares the ``EXPORT_MAX_CONCURRENCY`` bound with queued export
+    jobs rather than adding processes on top of them.
+    """
+
+    def __init__(
+        self,
+        documents: DocumentService = document_service,
+        exports: ExportService = export_service,
+        max_workers: int = settings.EXPORT_BATCH_WORKERS,
+        jobs: ExportJobManager = export_job_manager,
+    ):
+        """Initialize batch export service.
+
+        Args:
+            documents: Document service to load documents from
+            exports: Export service that performs the renders
+            max_workers: Renders of one batch allowed to run at the same time
+                (0, or more than the job manager allows, means its bound)
+            jobs: Job manager whose render slots the renders take
+        """
+        self.documents = documents
+        self.exports = exports
+        self.jobs = jobs
+        self.max_workers = min(max_workers or jobs.max_concurrency, jobs.max_concurrency)
+
+    async def export_documents(
+        self,
+        filenames: Sequence[str],
+        package_filename: Optional[str] = None,
+        package_title: Optional[str] = None,
+    ) -> BatchExportResult:
+        """Export documents to PDF concurrently.
+
+        Args:
+            filenames: Document IDs, in package order
+            package_filename: Also concatenate the documents into one PDF
+                with a table of contents under this name
+            package_title: Title page heading for the package
+
+        Returns:
+            Per-document outcomes and timings (a failed document doesn't
+            stop the others)
+        """
+        start = time.perf_counter()
+        items: List[Optional[BatchExportItem]] = [None] * len(filenames)
+        sources: List[BatchSource] = []
+        positions: List[int] = []
+
+        for position, filename in enumerate(filenames):
+            try:
+                doc = await self.documents.load_document_async(filename)
+            except (FileNotFoundError, ValueError) as e:
+                items[position] = BatchExportItem(filename=filename, error=str(e))
+                continue
+
+            metadata = doc.metadata.model_dump(exclude={"extra"}, exclude_none=True)
+            sources.append(
+                BatchSource(doc.filename, doc.content, output_name(doc.filename), metadata)
+            )
+            positions.append(position)
+
+        for position, item in zip(positions, await self.render_many(sources)):
+            items[position] = item
+        result = self._summarize(items, start)
+
+        if package_filename and sources:
+            package_start = time.perf_counter()
+            try:
+                async with self.jobs.slot():
+                    path = await self.exports.export_to_pdf_async(
+                        self.build_package(sources),
+                        package_filename,
+                        {"title": package_title or Path(package_filename).stem, "toc": True},
+                    )
+                result.package_filename = path.name
+            except Exception as e:
+                logger.warning(f"Package export {package_filename} failed: {e}")
+                result.package_error = str(e)
+            result.package_seconds = time.perf_counter() - package_start
+
+        result.total_seconds = time.perf_counter() - start
+        logger.info(
+            f"Batch exported {result.succeeded}/{len(filenames)} documents "
+            f"in {result.total_seconds:.2f}s with {self.max_workers} workers"
+        )
+        return result
+
+    async def render_many(self, sources: Sequence[BatchSource]) -> List[BatchExportItem]:
+        """Render sources to PDF concurrently, at most ``max_workers`` at a time.
+
+        Each render also holds a job manager slot while it runs.
+
+        Args:
+            sources: Documents to render
+
+        Returns:
+            One item per source, in the same order
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def render(source: BatchSource) -> BatchExportItem:
+            async with semaphore, self.jobs.slot():
+                start = time.perf_counter()
+                try:
+                    path = await self.exports.export_to_pdf_async(
+                        source.markdown, source.output_filename, source.metadata
+                    )
+                    return BatchExportItem(
+                        filename=source.name,
+                        output_filename=path.name,
+                        seconds=time.perf_counter() - start,
+                    )
+                except Exception as e:
+                    return BatchExportItem(
+                        filename=source.name, seconds=time.perf_counter() - start, error=str(e)
+                    )
+
+        return list(await asyncio.gather(*(render(source) for source in sources)))
+
+    def build_package(self, sources: Sequence[BatchSource]) -> str:
+        """Concatenate documents into one Markdown package, one chapter each.
+
+        Args:
+            sources: Documents in package order
+
+        Returns:
+            Markdown with a top-level heading per document and page breaks
+            between them
+        """
+        chapters = []
+        for source in sources:
+            heading = (source.metadata or {}).get("title") or Path(source.name).stem
+            chapters.append(f"# {heading}\n\n{demote_headings(source.markdown)}")
+        return PAGE_BREAK.join(chapters)
+
+    def _summarize(self, items: List[BatchExportItem], start: float) -> BatchExportResult:
+        failed = sum(1 for item in items if item.error)
+        return BatchExportResult(
+            items=items,
+            succeeded=len(items) - failed,
+            failed=failed,
+            workers=self.max_workers,
+            total_seconds=time.perf_counter() - start,
+        )
+
+
+# Singleton instance
+batch_export_service = BatchExportService()
@@ -1,15 +1,23 @@
 """Calculation engine service using Pint and Handcalcs."""
 
+import ast
+import builtins
 import io
 import logging
+import re
 import sys
+import threading
 import time
+from collections import OrderedDict
 from contextlib import redirect_stdout
-from typing import Any, Dict
+from types import CodeType
+from typing import Any, Dict, List, NamedTuple, Set
 
 import pint
 from handcalcs import handcalc
+from handcalcs.handcalcs import LatexRenderer
 
+from app.core.config import settings
 from app.models.calculation import CalculationBlock, CalculationResult
 
 logger = logging.getLogger(__name__)
@@ -18,13 +26,105 @@ logger = logging.getLogger(__name__)
 ureg = pint.UnitRegistry()
 ureg.default_format = "~P"  # Pretty format
 
+# handcalcs render options (the equivalent of %%render with no arguments)
+HANDCALCS_LINE_ARGS = {"override": "", "precision": "", "sci_not": ""}
+# What handcalcs produces for a block with nothing to render (e.g. only prints)
+EMPTY_LATEX = re.compile(r"(\\begin\{aligned\}\s*\\end\{aligned\})?")
+
+
+class CompiledBlock(NamedTuple):
+    """A calc block compiled once and reused for every execution of its code."""
+
+    code: CodeType
+    render_source: str  # Source handcalcs renders (top-level prints dropped)
+
 
 class CalculationEngine:
     """Engine for executing Python calculations with units."""
 
-    def __init__(self):
-        """Initialize the calculation engine."""
+    def __init__(self, code_cache_size: int = settings.CALC_CODE_CACHE_SIZE):
+        """Initialize the calculation engine.
+
+        Args:
+            code_cache_size: Compiled blocks to keep, keyed by their source
+        """
         self.ureg = ureg
+        self.code_cache_size = code_cache_size
+        self._compiled: "OrderedDict[str, CompiledBlock]" = OrderedDict()
+        self._compiled_lock = threading.Lock()
+        # Blocks capture prints with redirect_stdout, which swaps sys.stdout
+        # for the whole process, so blocks run one at a time whoever calls
+        self._exec_lock = threading.Lock()
+
+    def compile_block(self, code: str) -> CompiledBlock:
+        """Compile a block's code, reusing an earlier compilation of the same code.
+
+        Args:
+            code: Block source
+
+        Returns:
+            Compiled block
+
+        Raises:
+            SyntaxError: If the code doesn't compile
+        """
+        with self._compiled_lock:
+            compiled = self._compiled.get(code)
+            if compiled is not None:
+                self._compiled.move_to_end(code)
+                return compiled
+
+        compiled = CompiledBlock(compile(code, "<string>", "exec"), self._strip_prints(code))
+        with self._compiled_lock:
+            self._compiled[code] = compiled
+            while len(self._compiled) > self.code_cache_size:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    def check_block(self, code: str, known: Set[str], seed: bool = True) -> List[str]:
+        """Statically check a block without running it.
+
+        Args:
+            code: Block source
+            known: Variables defined by the blocks before it; the names this
+                block assigns are added
+            seed: Keep the compiled block for its first execution
+
+        Returns:
+            Problems found: a syntax error, or names the block reads that
+            nothing defines
+        """
+        try:
+            tree = ast.parse(code)
+            if seed:
+                self.compile_block(code)
+        except SyntaxError as e:
+            return [f"SyntaxError: {e.msg} (line {e.lineno})"]
+
+        loaded: Dict[str, int] = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name):
+                if isinstance(node.ctx, ast.Load):
+                    loaded.setdefault(node.id, node.lineno)
+                else:
+                    known.add(node.id)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                known.add(node.name)
+            elif isinstance(node, ast.arg):
+                known.add(node.arg)
+            elif isinstance(node, ast.alias):
+                known.add((node.asname or node.name).split(".")[0])
+
+        available = known | self._namespace_names() | set(dir(builtins))
+        return [
+            f"NameError: name '{name}' is not defined (line {line})"
+            for name, line in sorted(loaded.items(), key=lambda item: item[1])
+            if name not in available
+        ]
+
+    def _namespace_names(self) -> Set[str]:
+        """Names every block can use without defining them."""
+        return set(self.create_execution_namespace({}))
 
     def create_execution_namespace(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Create a namespace for code execution with Pint and common imports.
@@ -106,8 +206,9 @@ class CalculationEngine:
 
         try:
             # Execute the code
-            with redirect_stdout(stdout_capture):
-                exec(block.code, namespace)
+            compiled = self.compile_block(block.code)
+            with self._exec_lock, redirect_stdout(stdout_capture):
+                exec(compiled.code, namespace)
 
             # Extract results (exclude builtins and imports)
             result_vars = {
@@ -180,26 +281,55 @@ class CalculationEngine:
             LaTeX string or None if generation fails
         """
         try:
-            # Create a wrapper function for handcalcs
-            func_code = f"""
-@handcalc(jupyter_display=False)
-def _calc():
-{chr(10).join('    ' + line for line in code.splitlines())}
-    return locals()
-"""
-            exec(func_code, namespace)
-            latex_result = namespace["_calc"]()
-
-            # handcalcs returns tuple (latex, locals)
-            if isinstance(latex_result, tuple) and len(latex_result) >= 1:
-                return latex_result[0]
-
-            return None
+            # Render from the source and the executed namespace, rather than
+            # re-running the code through @handcalc (which needs the source of
+            # a function defined by exec() and so always failed)
+            source = self.compile_block(code).render_source
+            renderer = LatexRenderer(source, namespace, HANDCALCS_LINE_ARGS)
+            latex = renderer.render().strip()
+
+            # Callers add their own math delimiters
+            latex = latex.removeprefix("$$").removesuffix("$$").strip()
+            if EMPTY_LATEX.fullmatch(latex):
+                return None
+            return latex
 
         except Exception as e:
             logger.debug(f"LaTeX generation failed: {e}")
             return None
 
+    def _strip_prints(self, code: str) -> str:
+        """Drop top-level ``print(...)`` statements, which handcalcs can't render."""
+        drop = set()
+        for node in ast.parse(code).body:
+            if (
+                isinstance(node, ast.Expr)
+                and isinstance(node.value, ast.Call)
+                and isinstance(node.value.func, ast.Name)
+                and node.value.func.id == "print"
+            ):
+                drop.update(range(node.lineno, node.end_lineno + 1))
+
+        lines = code.splitlines()
+        return "\n".join(line for n, line in enumerate(lines, start=1) if n not in drop)
+
+    def update_context(self, context: Dict[str, Any], result: CalculationResult) -> None:
+        """Carry a block's variables into the context for the blocks after it.
+
+        Args:
+            context: Variable context, updated in place
+            result: Result of the block just executed
+        """
+        if not result.success or not result.result:
+            return
+
+        for key, value in result.result.items():
+            if isinstance(value, dict) and "magnitude" in value and "units" in value:
+                # Reconstruct Pint quantity
+                context[key] = value["magnitude"] * self.ureg(value["units"])
+            else:
+                context[key] = value
+
     def _serialize_value(self, value: Any) -> Any:
         """Serialize a value for JSON response.
 
@@ -0,0 +1,203 @@
+"""Executing a document's calculation blocks ahead of export."""
+
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pint
+from handcalcs import __version__ as handcalcs_version
+
+from app.core.config import settings
+from app.models.calculation import CalculationBlock, CalculationResult
+from app.services.calculation_engine import CalculationEngine, calculation_engine
+
+logger = logging.getLogger(__name__)
+
+# A fenced python block whose first line is the %%calc marker
+CALC_BLOCK_PATTERN = re.compile(
+    r"^(?P<fence>```|~~~)python[^\n]*\n[ \t]*%%calc[^\n]*\n(?P<code>.*?)^(?P=fence)[ \t]*$",
+    re.MULTILINE | re.DOTALL,
+)
+
+# What an executed block's rendering depends on besides its code (part of
+# export cache keys); bump the number when render_block's output changes
+CALC_RENDERER_VERSION = f"1 (handcalcs {handcalcs_version}, pint {pint.__version__})"
+
+
+def has_calc_blocks(markdown: str) -> bool:
+    """Check whether Markdown contains any ``%%calc`` blocks."""
+    return "%%calc" in markdown and CALC_BLOCK_PATTERN.search(markdown) is not None
+
+
+def render_block(code: str, result: CalculationResult) -> str:
+    """Render an executed calc block as Markdown.
+
+    Args:
+        code: Block source (without the ``%%calc`` marker)
+        result: Execution result
+
+    Returns:
+        The handcalcs LaTeX as display math followed by any printed output;
+        the source with the error message if the block failed; or the source
+        alone if the block produced neither
+    """
+    source = f"```python\n{code.rstrip()}\n```\n"
+    if not result.success:
+        return f"{source}\n> **Calculation error:** {result.error}\n"
+
+    parts = []
+    if result.latex:
+        parts.append(f"$$\n{result.latex}\n$$\n")
+    if result.output and result.output.strip():
+        parts.append(f"```text\n{result.output.rstrip()}\n```\n")
+    return "\n".join(parts) if parts else source
+
+
+class DocumentExecutor:
+    """Runs the ``%%calc`` blocks of a document and inlines their results.
+
+    Blocks run in order with a shared variable context, as in the editor.
+    Two caches avoid recomputation:
+
+    - executed Markdown, keyed by the content hash of the document, so
+      exporting the same version again costs nothing;
+    - individual block results with the context they leave behind, keyed
+      by a hash of that block's code and every block before it, so editing
+      prose or a later block doesn't re-run the blocks above it.
+    """
+
+    def __init__(
+        self,
+        engine: CalculationEngine = calculation_engine,
+        block_cache_size: int = settings.CALC_RESULT_CACHE_SIZE,
+        document_cache_size: int = settings.EXECUTED_DOCUMENT_CACHE_SIZE,
+    ):
+        """Initialize the document executor.
+
+        Args:
+            engine: Calculation engine that runs the blocks
+            block_cache_size: Block results to keep
+            document_cache_size: Executed documents to keep
+        """
+        self.engine = engine
+        self.block_cache_size = block_cache_size
+        self.document_cache_size = document_cache_size
+        self._blocks: "OrderedDict[str, Tuple[CalculationResult, Dict[str, Any]]]" = OrderedDict()
+        self._documents: "OrderedDict[str, str]" = OrderedDict()
+        # Guards the caches; a document's blocks run as one unit, so results
+        # for a chain of blocks are computed once (the engine itself
+        # serializes block execution across all of its callers)
+        self._lock = threading.Lock()
+
+    def execute_markdown(self, markdown: str) -> str:
+        """Replace every ``%%calc`` block in Markdown with its results.
+
+        Args:
+            markdown: Document Markdown (without frontmatter)
+
+        Returns:
+            Executed Markdown (unchanged if there are no calc blocks)
+        """
+        if not has_calc_blocks(markdown):
+            return markdown
+
+        key = hashlib.sha256(markdown.encode("utf-8")).hexdigest()
+        with self._lock:
+            executed = self._documents.get(key)
+            if executed is not None:
+                self._documents.move_to_end(key)
+                return executed
+
+            executed = self._execute(markdown)
+            self._documents[key] = executed
+            while len(self._documents) > self.document_cache_size:
+                self._documents.popitem(last=False)
+
+        return executed
+
+    def execute_context(
+        self, markdown: str, context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Run a document's ``%%calc`` blocks and return the variables they define.
+
+        Args:
+            markdown: Document Markdown (without frontmatter)
+            context: Variables to start from (e.g. the inputs of a case)
+
+        Returns:
+            Variable context after the last block (Pint quantities and plain
+            values, as blocks see them)
+        """
+        context = dict(context or {})
+        with self._lock:
+            for _, _, context in self._run_blocks(markdown, context):
+                pass
+        return context
+
+    def execute_results(self, markdown: str) -> List[CalculationResult]:
+        """Run a document's ``%%calc`` blocks and return each block's result.
+
+        Args:
+            markdown: Document Markdown (without frontmatter)
+
+        Returns:
+            One result per block, in document order
+        """
+        with self._lock:
+            return [result for _, result, _ in self._run_blocks(markdown, {})]
+
+    def _execute(self, markdown: str) -> str:
+        """Run the blocks in order, splicing in their rendered results."""
+        parts = []
+        position = 0
+        for match, result, _ in self._run_blocks(markdown, {}):
+            parts.append(markdown[position : match.start()])
+            parts.append(render_block(match.group("code"), result))
+            position = match.end() + 1  # Past the closing fence's newline
+
+        parts.append(markdown[position:])
+        return "".join(parts)
+
+    def _run_blocks(
+        self, markdown: str, context: Dict[str, Any]
+    ) -> Iterator[Tuple["re.Match[str]", CalculationResult, Dict[str, Any]]]:
+        """Run the blocks in order, reusing cached results.
+
+        Yields:
+            (block match, result, context after the block) per block
+        """
+        chain = hashlib.sha256()
+        if context:
+            # Blocks run against different starting variables don't share results
+            chain.update(repr(sorted(context.items())).encode("utf-8") + b"\0")
+        executed = reused = 0
+
+        for match in CALC_BLOCK_PATTERN.finditer(markdown):
+            code = match.group("code")
+            chain.update(code.encode("utf-8") + b"\0")
+            block_key = chain.hexdigest()
+
+            cached = self._blocks.get(block_key)
+            if cached is not None:
+                self._blocks.move_to_end(block_key)
+                result, snapshot = cached
+                context = dict(snapshot)
+                reused += 1
+            else:
+                result = self.engine.execute_block(CalculationBlock(code=code), context)
+                self.engine.update_context(context, result)
+                self._blocks[block_key] = (result, dict(context))
+                while len(self._blocks) > self.block_cache_size:
+                    self._blocks.popitem(last=False)
+                executed += 1
+
+            yield match, result, context
+
+        logger.info(f"Executed {executed} calc blocks ({reused} reused from cache)")
+
+
+# Singleton instance
+document_executor = DocumentExecutor()
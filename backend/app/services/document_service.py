@@ -1,53 +1,339 @@
 """Document management service."""
 
+import functools
+import hashlib
 import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+import weakref
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import frontmatter
 
 from app.core.config import settings
-from app.models.document import Document, DocumentMetadata
+from app.core.executor import run_io
+from app.core.storage import WriteCoalescer, atomic_write_text
+from app.models.document import (
+    Document,
+    DocumentImportResult,
+    DocumentMetadata,
+    Revision,
+    RevisionDiff,
+    TextEdit,
+)
+from app.services.revision_store import RevisionStore
 
 logger = logging.getLogger(__name__)
 
+# Hashed shard buckets are hidden directories such as ".3f"; document IDs may
+# not contain hidden segments, so they can never collide with project folders.
+SHARD_DIR_PATTERN = re.compile(r"^\.[0-9a-f]{2}$")
+
+
+def format_document(metadata: DocumentMetadata, content: str) -> str:
+    """Build a document's file text: YAML frontmatter followed by the Markdown.
+
+    Args:
+        metadata: Document metadata (``None`` fields are left out)
+        content: Markdown content
+
+    Returns:
+        Full file text
+    """
+    # Create frontmatter post
+    post = frontmatter.Post(content)
+    # Only include non-None metadata fields
+    post.metadata = {
+        k: v for k, v in metadata.model_dump().items() if v is not None and k != "extra"
+    }
+    # Add extra fields
+    if metadata.extra:
+        post.metadata.update(metadata.extra)
+
+    return frontmatter.dumps(post)
+
+
+class DocumentConflictError(Exception):
+    """Raised when a patch targets a version that is no longer current."""
+
+    def __init__(self, filename: str, current_version: str):
+        super().__init__(f"Document {filename} has changed (current version {current_version})")
+        self.filename = filename
+        self.current_version = current_version
+
 
 class DocumentService:
     """Service for managing documents."""
 
-    def __init__(self, documents_dir: Path = settings.DOCUMENTS_DIR):
+    def __init__(
+        self,
+        documents_dir: Path = settings.DOCUMENTS_DIR,
+        coalesce_window: float = settings.DOCUMENT_COALESCE_WINDOW,
+        fsync: bool = settings.DOCUMENT_FSYNC,
+        shard_depth: int = settings.DOCUMENT_SHARD_DEPTH,
+        history: bool = settings.REVISION_HISTORY,
+    ):
         """Initialize document service.
 
+        Documents are identified by their path relative to ``documents_dir``
+        (e.g. ``"bridge-a/girders/beam-1.md"``), so project folders can be
+        nested arbitrarily.
+
         Args:
             documents_dir: Directory containing documents
+            coalesce_window: Seconds to batch rapid saves of an existing
+                document into one disk write (0 writes every save through)
+            fsync: Flush writes to disk before considering them done
+            shard_depth: Levels of hashed bucket directories inside each
+                folder (0 stores files directly in their folder)
+            history: Record saved versions in the revision store (a burst
+                of coalesced autosaves is recorded once, when it is written)
         """
         self.documents_dir = documents_dir
         self.documents_dir.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self.shard_depth = shard_depth
+        self._writer = WriteCoalescer(coalesce_window, fsync=fsync)
+        # Hidden, so never mistaken for a project folder
+        self.revisions = (
+            RevisionStore(documents_dir / ".history", fsync=fsync) if history else None
+        )
+        # Held only while in use, so documents touched once don't keep a lock
+        self._locks: "weakref.WeakValueDictionary[str, threading.RLock]" = (
+            weakref.WeakValueDictionary()
+        )
+        self._locks_guard = threading.Lock()
+        # folder -> file name -> cached listing entry, revalidated by mtime/size
+        self._index: Dict[str, Dict[str, dict]] = {}
+        self._index_lock = threading.Lock()
+
+    def _document_lock(self, filename: str) -> threading.RLock:
+        """Get the lock serializing read-modify-write cycles on a document.
+
+        Args:
+            filename: Name of the document file
+
+        Returns:
+            Re-entrant lock for the document (keep a reference while using
+            it; unreferenced locks are dropped)
+        """
+        with self._locks_guard:
+            return self._locks.setdefault(filename, threading.RLock())
+
+    def normalize_id(self, filename: str) -> str:
+        """Validate a document ID and normalize it as every document operation does.
+
+        Args:
+            filename: Relative path such as ``"project/calc.md"``
+
+        Returns:
+            Normalized ID using ``/`` separators
+
+        Raises:
+            ValueError: If the ID is empty or could escape the documents directory
+        """
+        return self._normalize_id(filename)
+
+    def _normalize_id(self, filename: str, allow_empty: bool = False) -> str:
+        """Validate a document or folder ID and normalize its separators.
+
+        Args:
+            filename: Relative path such as ``"project/calc.md"``
+            allow_empty: Accept ``""`` (the root folder)
+
+        Returns:
+            Normalized ID using ``/`` separators
+
+        Raises:
+            ValueError: If the ID could escape the documents directory
+        """
+        doc_id = filename.replace("\\", "/")
+        if doc_id.startswith("/"):
+            raise ValueError(f"Document path must be relative: {filename}")
+
+        doc_id = doc_id.rstrip("/")
+        if not doc_id:
+            if allow_empty:
+                return ""
+            raise ValueError("Document name must not be empty")
+
+        for part in doc_id.split("/"):
+            if not part or part.startswith(".") or ":" in part:
+                raise ValueError(f"Invalid document path: {filename}")
+
+        return doc_id
+
+    def _shard_parts(self, name: str) -> List[str]:
+        """Get the hashed bucket directories for a file name.
 
-    def list_documents(self) -> List[dict]:
-        """List all documents in the documents directory.
+        Args:
+            name: File name within its folder
+
+        Returns:
+            Bucket directory names, outermost first
+        """
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()
+        return [f".{digest[2 * i : 2 * i + 2]}" for i in range(self.shard_depth)]
+
+    def _file_path(self, doc_id: str) -> Path:
+        """Map a document ID to its storage path.
+
+        Args:
+            doc_id: Normalized document ID
+
+        Returns:
+            Path of the document file (which may not exist yet)
+        """
+        folder, _, name = doc_id.rpartition("/")
+        folder_path = self.documents_dir / folder if folder else self.documents_dir
+
+        if self.shard_depth:
+            sharded = folder_path.joinpath(*self._shard_parts(name), name)
+            # Files written before sharding was enabled stay where they are
+            if not sharded.exists() and (folder_path / name).exists():
+                return folder_path / name
+            return sharded
+
+        return folder_path / name
+
+    def _collect_files(self, directory: Path, found: Dict[str, os.DirEntry]) -> None:
+        """Collect the Markdown files of one folder, descending into shard buckets.
+
+        Args:
+            directory: Folder (or bucket) directory to scan
+            found: Mapping of file name -> directory entry to fill in
+        """
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir() and SHARD_DIR_PATTERN.match(entry.name):
+                    self._collect_files(Path(entry.path), found)
+                elif (
+                    entry.name.endswith(".md")
+                    and not entry.name.startswith(".")
+                    and entry.is_file()
+                ):
+                    found[entry.name] = entry
+
+    def _scan_folder(self, folder: str) -> List[dict]:
+        """List one folder's documents, re-parsing only files that changed.
+
+        Cost is proportional to the size of the folder, not the store.
+
+        Args:
+            folder: Normalized folder ID
 
         Returns:
             List of document metadata dictionaries
         """
-        documents = []
+        folder_path = self.documents_dir / folder if folder else self.documents_dir
+        if not folder_path.is_dir():
+            return []
+
+        found: Dict[str, os.DirEntry] = {}
+        self._collect_files(folder_path, found)
+
+        with self._index_lock:
+            cached = self._index.get(folder, {})
 
-        for file_path in self.documents_dir.glob("*.md"):
+        entries: Dict[str, dict] = {}
+        for name, dir_entry in found.items():
+            doc_id = f"{folder}/{name}" if folder else name
             try:
-                doc = self.load_document(file_path.name)
-                documents.append(
-                    {
-                        "filename": doc.filename,
-                        "metadata": doc.metadata.model_dump(),
-                        "modified": file_path.stat().st_mtime,
-                        "size": file_path.stat().st_size,
-                    }
-                )
+                stat = dir_entry.stat()
+                entry = cached.get(name)
+                pending = self._writer.pending(Path(dir_entry.path))
+                if (
+                    entry is None
+                    or pending is not None
+                    or entry["mtime_ns"] != stat.st_mtime_ns
+                    or entry["size"] != stat.st_size
+                ):
+                    doc = self.load_document(doc_id)
+                    entry = self._index_entry(doc, folder, stat, doc.modified)
+                entries[name] = entry
             except Exception as e:
-                logger.error(f"Error loading document {file_path}: {e}")
+                logger.error(f"Error loading document {doc_id}: {e}")
+
+        with self._index_lock:
+            self._index[folder] = entries
+
+        return [entry["summary"] for entry in entries.values()]
+
+    def _index_entry(
+        self, doc: Document, folder: str, stat: os.stat_result, modified: float
+    ) -> dict:
+        """Build a listing index entry for a document.
+
+        Args:
+            doc: Parsed document
+            folder: Folder ID containing the document
+            stat: Stat result of the stored file (for revalidation)
+            modified: Modification time to report
+
+        Returns:
+            Index entry with validators and the listing summary
+        """
+        return {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "summary": {
+                "filename": doc.filename,
+                "folder": folder,
+                "metadata": doc.metadata.model_dump(),
+                "modified": modified,
+                "size": stat.st_size,
+            },
+        }
+
+    def list_documents(self, folder: str = "", recursive: bool = False) -> List[dict]:
+        """List documents in a project folder.
+
+        Args:
+            folder: Folder ID relative to the documents directory ("" = root)
+            recursive: Include documents in nested folders
+
+        Returns:
+            List of document metadata dictionaries, newest first
+
+        Raises:
+            ValueError: If the folder ID is invalid
+        """
+        folder = self._normalize_id(folder, allow_empty=True)
+        documents = self._scan_folder(folder)
+
+        if recursive:
+            for subfolder in self.list_folders(folder):
+                documents.extend(self.list_documents(subfolder, recursive=True))
 
         return sorted(documents, key=lambda x: x["modified"], reverse=True)
 
+    def list_folders(self, parent: str = "") -> List[str]:
+        """List the project folders directly inside a folder.
+
+        Args:
+            parent: Folder ID relative to the documents directory ("" = root)
+
+        Returns:
+            Sorted list of folder IDs
+
+        Raises:
+            ValueError: If the folder ID is invalid
+        """
+        parent = self._normalize_id(parent, allow_empty=True)
+        parent_path = self.documents_dir / parent if parent else self.documents_dir
+        if not parent_path.is_dir():
+            return []
+
+        with os.scandir(parent_path) as entries:
+            names = [e.name for e in entries if e.is_dir() and not e.name.startswith(".")]
+
+        return sorted(f"{parent}/{name}" if parent else name for name in names)
+
     def load_document(self, filename: str) -> Document:
         """Load a document from disk.
 
@@ -59,15 +345,81 @@ class DocumentService:
 
         Raises:
             FileNotFoundError: If document doesn't exist
+            ValueError: If the document ID is invalid
         """
-        file_path = self.documents_dir / filename
+        filename = self._normalize_id(filename)
+        file_path = self._file_path(filename)
 
         if not file_path.exists():
             raise FileNotFoundError(f"Document not found: {filename}")
 
+        # Prefer a save that is still waiting in the write-behind buffer
+        pending = self._writer.pending_write(file_path)
+        if pending is None:
+            with open(file_path, "r", encoding="utf-8") as f:
+                modified = os.fstat(f.fileno()).st_mtime
+                text = f.read()
+        else:
+            # The file's mtime predates the buffered contents, so report
+            # when they were saved (stable across reads, unlike the clock)
+            text, modified = pending
+
+        return self._parse_document(filename, text, modified)
+
+    def read_document_text(self, filename: str) -> str:
+        """Read a document's stored text, including frontmatter, verbatim.
+
+        Args:
+            filename: Name of the document file
+
+        Returns:
+            Full file text
+
+        Raises:
+            FileNotFoundError: If document doesn't exist
+            ValueError: If the document ID is invalid
+        """
+        filename = self._normalize_id(filename)
+        file_path = self._file_path(filename)
+
+        text = self._writer.pending(file_path)
+        if text is not None:
+            return text
+
+        try:
+            with open(file_path, "r", encoding="utf-8", newline="") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Document not found: {filename}")
+
+    def folder_exists(self, folder: str) -> bool:
+        """Check if a project folder exists.
+
+        Args:
+            folder: Folder ID relative to the documents directory ("" = root)
+
+        Returns:
+            True if the folder exists
+
+        Raises:
+            ValueError: If the folder ID is invalid
+        """
+        folder = self._normalize_id(folder, allow_empty=True)
+        return (self.documents_dir / folder).is_dir()
+
+    def _parse_document(self, filename: str, text: str, modified: float) -> Document:
+        """Parse raw file text into a Document.
+
+        Args:
+            filename: Name of the document file
+            text: Full file text including frontmatter
+            modified: Modification time of the contents (epoch seconds)
+
+        Returns:
+            Document object
+        """
         # Parse frontmatter and content
-        with open(file_path, "r", encoding="utf-8") as f:
-            post = frontmatter.load(f)
+        post = frontmatter.loads(text)
 
         # Extract metadata
         metadata = DocumentMetadata(**post.metadata) if post.metadata else DocumentMetadata()
@@ -77,6 +429,8 @@ class DocumentService:
             metadata=metadata,
             content=post.content,
             raw_content=frontmatter.dumps(post),
+            version=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            modified=modified,
         )
 
     def save_document(
@@ -91,30 +445,289 @@ class DocumentService:
 
         Returns:
             Saved document object
+
+        Raises:
+            ValueError: If the document ID is invalid
         """
         # Ensure filename ends with .md
         if not filename.endswith(".md"):
             filename += ".md"
 
-        file_path = self.documents_dir / filename
+        filename = self._normalize_id(filename)
+        file_path = self._file_path(filename)
 
-        # Create frontmatter post
-        post = frontmatter.Post(content)
-        # Only include non-None metadata fields
-        post.metadata = {
-            k: v for k, v in metadata.model_dump().items() if v is not None and k != "extra"
-        }
-        # Add extra fields
-        if metadata.extra:
-            post.metadata.update(metadata.extra)
+        text = format_document(metadata, content)
 
-        # Write to file
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(frontmatter.dumps(post))
+        record = functools.partial(self._record_revision, filename)
+
+        with self._document_lock(filename):
+            if file_path.exists():
+                # Autosave path: collapse bursts of edits into one atomic write,
+                # recorded as one revision when it reaches disk
+                self._writer.write(file_path, text, on_written=record)
+            else:
+                # New documents go straight to disk so they show up in listings
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                atomic_write_text(file_path, text, fsync=self.fsync)
+                record(text)
+
+            # Same time a later load reports while the save is still buffered
+            pending = self._writer.pending_write(file_path)
+            saved_at = pending.written_at if pending is not None else time.time()
 
         logger.info(f"Saved document: {filename}")
 
-        return self.load_document(filename)
+        return self._parse_document(filename, text, saved_at)
+
+    def patch_document(
+        self,
+        filename: str,
+        base_version: str,
+        edits: List[TextEdit],
+        metadata: Optional[DocumentMetadata] = None,
+    ) -> Document:
+        """Apply text edits to a document, guarded by its version.
+
+        Args:
+            filename: Name of the document file
+            base_version: Version the edits were computed against
+            edits: Non-overlapping edits with offsets into the base content
+            metadata: Replacement metadata (keeps existing if None)
+
+        Returns:
+            Saved document object
+
+        Raises:
+            FileNotFoundError: If document doesn't exist
+            DocumentConflictError: If the document is no longer at base_version
+            ValueError: If edits are out of range or overlap, or the ID is invalid
+        """
+        filename = self._normalize_id(filename)
+
+        with self._document_lock(filename):
+            existing = self.load_document(filename)
+            if existing.version != base_version:
+                raise DocumentConflictError(filename, existing.version)
+
+            content = self._apply_edits(existing.content, edits)
+
+            return self.save_document(filename, metadata or existing.metadata, content)
+
+    def _apply_edits(self, content: str, edits: List[TextEdit]) -> str:
+        """Apply edits whose offsets all refer to the original content.
+
+        Args:
+            content: Original content
+            edits: Edits to apply
+
+        Returns:
+            Edited content
+
+        Raises:
+            ValueError: If edits are out of range or overlap
+        """
+        parts = []
+        position = 0
+
+        for edit in sorted(edits, key=lambda e: (e.start, e.end)):
+            if edit.start > edit.end or edit.end > len(content):
+                raise ValueError(f"Edit range {edit.start}:{edit.end} is out of bounds")
+            if edit.start < position:
+                raise ValueError(f"Edit at {edit.start} overlaps a previous edit")
+
+            parts.append(content[position : edit.start])
+            parts.append(edit.text)
+            position = edit.end
+
+        parts.append(content[position:])
+        return "".join(parts)
+
+    def import_documents(
+        self, members: Iterable[Tuple[str, str]], overwrite: bool = False
+    ) -> DocumentImportResult:
+        """Bulk-import documents as a single all-or-nothing batch.
+
+        Members are validated and staged one at a time in a hidden staging
+        directory, so the batch is never held in memory. Once all are staged
+        they are moved into place together and the listing index is updated
+        in one step; if any move fails, the ones already made are rolled back.
+
+        Args:
+            members: Iterable of (document ID, full file text) pairs
+            overwrite: Replace existing documents instead of skipping them
+
+        Returns:
+            Import result listing imported, skipped and rejected members
+        """
+        result = DocumentImportResult()
+        staging = self.documents_dir / f".import-{uuid.uuid4().hex}"
+        staging.mkdir()
+
+        try:
+            staged: Dict[str, Tuple[Path, Path, Document]] = {}
+            for number, (filename, text) in enumerate(members):
+                try:
+                    doc_id = self._normalize_id(filename)
+                    if not doc_id.endswith(".md"):
+                        raise ValueError("Not a Markdown document")
+                    target = self._file_path(doc_id)
+                    if target.exists() and not overwrite:
+                        result.skipped.append(doc_id)
+                        continue
+                    # Validates frontmatter and metadata before anything is written
+                    doc = self._parse_document(doc_id, text, 0.0)
+                except Exception as e:
+                    result.errors[filename] = str(e)
+                    continue
+
+                staged_path = staging / f"{number}.md"
+                with open(staged_path, "w", encoding="utf-8", newline="") as f:
+                    f.write(text)
+                    if self.fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                staged[doc_id] = (staged_path, target, doc)
+
+            self._commit_import(staged, staging)
+            result.imported.extend(staged)
+
+            if self.revisions is not None:
+                for doc_id in staged:
+                    self.revisions.record(doc_id, self.read_document_text(doc_id))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        logger.info(
+            f"Imported {len(result.imported)} documents "
+            f"({len(result.skipped)} skipped, {len(result.errors)} rejected)"
+        )
+        return result
+
+    def _commit_import(
+        self, staged: Dict[str, Tuple[Path, Path, Document]], staging: Path
+    ) -> None:
+        """Move staged documents into place and index them, or roll back.
+
+        Args:
+            staged: Document ID -> (staged path, target path, parsed document)
+            staging: Staging directory (holds backups of replaced files)
+        """
+        moved: List[Tuple[Path, Optional[Path]]] = []
+        try:
+            for doc_id, (staged_path, target, _) in staged.items():
+                with self._document_lock(doc_id):
+                    self._writer.discard(target)
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    backup = None
+                    if target.exists():
+                        backup = staging / f"{len(moved)}.bak"
+                        shutil.copy2(target, backup)
+                    os.replace(staged_path, target)
+                    moved.append((target, backup))
+        except Exception:
+            for target, backup in reversed(moved):
+                if backup is not None:
+                    os.replace(backup, target)
+                else:
+                    target.unlink(missing_ok=True)
+            raise
+
+        entries = []
+        for doc_id, (_, target, doc) in staged.items():
+            stat = target.stat()
+            folder, _, name = doc_id.rpartition("/")
+            entries.append((folder, name, self._index_entry(doc, folder, stat, stat.st_mtime)))
+
+        with self._index_lock:
+            for folder, name, entry in entries:
+                self._index.setdefault(folder, {})[name] = entry
+
+    def _record_revision(self, doc_id: str, text: str) -> None:
+        """Record text that has reached disk in the revision history."""
+        if self.revisions is not None:
+            self.revisions.record(doc_id, text)
+
+    def list_revisions(self, filename: str) -> List[Revision]:
+        """List the saved revisions of a document, oldest first.
+
+        Args:
+            filename: Name of the document file
+
+        Returns:
+            List of revisions (empty if history is disabled)
+
+        Raises:
+            ValueError: If the document ID is invalid
+        """
+        filename = self._normalize_id(filename)
+        if self.revisions is None:
+            return []
+        # A save still in the write-behind buffer becomes a revision once flushed
+        self._writer.flush(self._file_path(filename))
+        return self.revisions.list_revisions(filename)
+
+    def load_revision(self, filename: str, version: str) -> Document:
+        """Load a past revision of a document.
+
+        Args:
+            filename: Name of the document file
+            version: Content hash of the revision
+
+        Returns:
+            Document object as it was at that revision
+
+        Raises:
+            FileNotFoundError: If the document has no such revision
+            ValueError: If the document ID is invalid
+        """
+        revision = self._find_revision(filename, version)
+        text = self.revisions.get_text(revision.version)
+        return self._parse_document(self._normalize_id(filename), text, revision.timestamp)
+
+    def diff_revisions(self, filename: str, from_version: str, to_version: str) -> RevisionDiff:
+        """Diff two revisions of a document.
+
+        Args:
+            filename: Name of the document file
+            from_version: Content hash of the older revision
+            to_version: Content hash of the newer revision
+
+        Returns:
+            Unified diff of the stored files
+
+        Raises:
+            FileNotFoundError: If the document lacks either revision
+            ValueError: If the document ID is invalid
+        """
+        filename = self._normalize_id(filename)
+        self._find_revision(filename, from_version)
+        self._find_revision(filename, to_version)
+
+        return RevisionDiff(
+            filename=filename,
+            from_version=from_version,
+            to_version=to_version,
+            diff=self.revisions.diff(from_version, to_version, filename),
+        )
+
+    def _find_revision(self, filename: str, version: str) -> Revision:
+        """Look up a revision in a document's history.
+
+        Raises:
+            FileNotFoundError: If the document has no such revision
+        """
+        revision = None
+        if self.revisions is not None:
+            filename = self._normalize_id(filename)
+            self._writer.flush(self._file_path(filename))
+            revision = self.revisions.find_revision(filename, version)
+        if revision is not None:
+            return revision
+        raise FileNotFoundError(f"Revision {version} not found for {filename}")
+
+    def flush(self) -> None:
+        """Write any saves still held in the write-behind buffer to disk."""
+        self._writer.flush_all()
 
     def delete_document(self, filename: str) -> bool:
         """Delete a document.
@@ -127,13 +740,18 @@ class DocumentService:
 
         Raises:
             FileNotFoundError: If document doesn't exist
+            ValueError: If the document ID is invalid
         """
-        file_path = self.documents_dir / filename
+        filename = self._normalize_id(filename)
+        file_path = self._file_path(filename)
 
-        if not file_path.exists():
-            raise FileNotFoundError(f"Document not found: {filename}")
+        with self._document_lock(filename):
+            if not file_path.exists():
+                raise FileNotFoundError(f"Document not found: {filename}")
 
-        file_path.unlink()
+            # A pending autosave must not recreate the file after it's gone
+            self._writer.discard(file_path)
+            file_path.unlink()
         logger.info(f"Deleted document: {filename}")
 
         return True
@@ -146,8 +764,69 @@ class DocumentService:
 
         Returns:
             True if document exists
+
+        Raises:
+            ValueError: If the document ID is invalid
         """
-        return (self.documents_dir / filename).exists()
+        return self._file_path(self._normalize_id(filename)).exists()
+
+    # Async variants - run the blocking file I/O on the shared I/O thread pool
+
+    async def list_documents_async(self, folder: str = "", recursive: bool = False) -> List[dict]:
+        """Async variant of :meth:`list_documents`."""
+        return await run_io(self.list_documents, folder, recursive)
+
+    async def list_folders_async(self, parent: str = "") -> List[str]:
+        """Async variant of :meth:`list_folders`."""
+        return await run_io(self.list_folders, parent)
+
+    async def load_document_async(self, filename: str) -> Document:
+        """Async variant of :meth:`load_document`."""
+        return await run_io(self.load_document, filename)
+
+    async def save_document_async(
+        self, filename: str, metadata: DocumentMetadata, content: str
+    ) -> Document:
+        """Async variant of :meth:`save_document`."""
+        return await run_io(self.save_document, filename, metadata, content)
+
+    async def patch_document_async(
+        self,
+        filename: str,
+        base_version: str,
+        edits: List[TextEdit],
+        metadata: Optional[DocumentMetadata] = None,
+    ) -> Document:
+        """Async variant of :meth:`patch_document`."""
+        return await run_io(self.patch_document, filename, base_version, edits, metadata)
+
+    async def import_documents_async(
+        self, members: Iterable[Tuple[str, str]], overwrite: bool = False
+    ) -> DocumentImportResult:
+        """Async variant of :meth:`import_documents`."""
+        return await run_io(self.import_documents, members, overwrite)
+
+    async def list_revisions_async(self, filename: str) -> List[Revision]:
+        """Async variant of :meth:`list_revisions`."""
+        return await run_io(self.list_revisions, filename)
+
+    async def load_revision_async(self, filename: str, version: str) -> Document:
+        """Async variant of :meth:`load_revision`."""
+        return await run_io(self.load_revision, filename, version)
+
+    async def diff_revisions_async(
+        self, filename: str, from_version: str, to_version: str
+    ) -> RevisionDiff:
+        """Async variant of :meth:`diff_revisions`."""
+        return await run_io(self.diff_revisions, filename, from_version, to_version)
+
+    async def delete_document_async(self, filename: str) -> bool:
+        """Async variant of :meth:`delete_document`."""
+        return await run_io(self.delete_document, filename)
+
+    async def document_exists_async(self, filename: str) -> bool:
+        """Async variant of :meth:`document_exists`."""
+        return await run_io(self.document_exists, filename)
 
 
 # Singleton instance
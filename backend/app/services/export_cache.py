@@ -0,0 +1,125 @@
+"""Content-addressed cache of export artifacts."""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.storage import TEMP_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+
+class ExportCache:
+    """Size-bounded LRU cache of rendered exports, keyed by content hash.
+
+    An entry's key hashes everything that affects the output (Markdown,
+    metadata, engine, tool versions, options), so a hit can be served
+    without re-running pandoc. Hits refresh the entry's mtime, and the least
+    recently used entries are evicted once the cache exceeds ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = settings.EXPORT_CACHE_MAX_BYTES):
+        """Initialize the export cache.
+
+        Args:
+            cache_dir: Directory holding cached artifacts
+            max_bytes: Total size to keep (0 disables caching)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """Hash the inputs that determine an export's output.
+
+        Args:
+            **parts: JSON-serializable inputs (content, options, versions...)
+
+        Returns:
+            Hex digest identifying the artifact
+        """
+        canonical = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, suffix: str) -> Optional[Path]:
+        """Look up a cached artifact, marking it as recently used.
+
+        Args:
+            key: Cache key from :meth:`make_key`
+            suffix: Artifact extension, e.g. ``".pdf"``
+
+        Returns:
+            Path of the cached artifact, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        path = self.cache_dir / f"{key}{suffix}"
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, suffix: str, source: Path) -> Path:
+        """Store a copy of a freshly rendered artifact.
+
+        Args:
+            key: Cache key from :meth:`make_key`
+            suffix: Artifact extension
+            source: Rendered file to cache (left in place)
+
+        Returns:
+            Path of the cached artifact
+        """
+        path = self.cache_dir / f"{key}{suffix}"
+        if not self.enabled:
+            return path
+
+        # Copy rather than hard-link: writers may later truncate ``source`` in place
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}{TEMP_SUFFIX}")
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, path)
+
+        self.evict()
+        return path
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits its budget.
+
+        Returns:
+            Number of entries deleted
+        """
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+        if removed:
+            logger.info(f"Evicted {removed} cached exports ({total} bytes remain)")
+        return removed
+
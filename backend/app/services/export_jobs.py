@@ -0,0 +1,307 @@
+"""Asynchronous export job queue with bounded concurrency."""
+
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from app.core.config import settings
+from app.models.export import ExportJob, ExportJobStatus, ExportQueueMetrics
+from app.services.export_service import ExportService, export_service
+from app.services.export_stats import ExportTimer
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("pdf", "html")
+
+# Number of recent jobs the timing metrics are computed over
+METRICS_WINDOW = 100
+
+
+class ExportQueueFullError(Exception):
+    """Raised when an export job is submitted while the wait queue is full."""
+
+    def __init__(self, max_queue: int):
+        super().__init__(f"Export queue is full ({max_queue} jobs waiting)")
+        self.max_queue = max_queue
+
+
+class ExportJobManager:
+    """Runs exports as background jobs, at most ``max_concurrency`` at a time.
+
+    PDF exports spawn pandoc and a LaTeX engine, which are CPU and memory
+    heavy; running them through a semaphore keeps a burst of requests from
+    starting dozens of processes at once. Submitting returns immediately
+    with a job ID that clients can poll, subscribe to, cancel, and download
+    the finished artifact from.
+    """
+
+    def __init__(
+        self,
+        service: ExportService = export_service,
+        max_concurrency: int = settings.EXPORT_MAX_CONCURRENCY,
+        max_queue: int = settings.EXPORT_MAX_QUEUE,
+        job_ttl: float = settings.EXPORT_JOB_TTL,
+    ):
+        """Initialize the job manager.
+
+        Args:
+            service: Export service that performs the renders
+            max_concurrency: Jobs allowed to run at the same time
+            max_queue: Jobs allowed to wait for a free slot
+            job_ttl: Seconds a finished job stays available for download
+        """
+        self.service = service
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.job_ttl = job_ttl
+
+        self.jobs: Dict[str, ExportJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._results: Dict[str, Path] = {}
+        self._changed: Dict[str, asyncio.Event] = {}
+        # Created on first use so it binds to the running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self._totals = {status: 0 for status in ExportJobStatus if status.finished}
+        self._wait_times: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._run_times: Deque[float] = deque(maxlen=METRICS_WINDOW)
+
+    def submit(
+        self,
+        fmt: str,
+        markdown_content: str,
+        output_filename: str,
+        metadata: Optional[dict] = None,
+    ) -> ExportJob:
+        """Queue an export job.
+
+        Must be called from a running event loop.
+
+        Args:
+            fmt: ``"pdf"`` or ``"html"``
+            markdown_content: The markdown content to export
+            output_filename: Desired output filename (without extension)
+            metadata: Optional metadata for the PDF
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If the format is not supported
+            ExportQueueFullError: If ``max_queue`` jobs are already waiting
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+        self._prune()
+        queued = sum(1 for job in self.jobs.values() if job.status == ExportJobStatus.QUEUED)
+        if queued >= self.max_queue:
+            raise ExportQueueFullError(self.max_queue)
+
+        job = ExportJob(
+            id=uuid.uuid4().hex,
+            format=fmt,
+            output_filename=output_filename,
+            created_at=time.time(),
+        )
+        self.jobs[job.id] = job
+        self._changed[job.id] = asyncio.Event()
+        task = asyncio.create_task(self._run(job, markdown_content, metadata))
+        task.add_done_callback(lambda _: self._finish(job))
+        self._tasks[job.id] = task
+
+        logger.info(f"Queued {fmt} export job {job.id} ({queued + 1} waiting)")
+        return job
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the ``max_concurrency`` render slots for the block.
+
+        For renders that don't run as jobs (e.g. batch exports), so every
+        pandoc/LaTeX run in the process counts against the same bound.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            yield
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """Get a job by ID, or None if it is unknown or has expired."""
+        return self.jobs.get(job_id)
+
+    def result(self, job_id: str) -> Optional[Path]:
+        """Get the artifact of a succeeded job, or None if there is none."""
+        return self._results.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[ExportJob]:
+        """Cancel a queued or running job.
+
+        A running pandoc process is killed. Finished jobs are left unchanged.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            The job, or None if it is unknown
+        """
+        job = self.jobs.get(job_id)
+        task = self._tasks.get(job_id)
+        if job is not None and task is not None and not job.status.finished:
+            task.cancel()
+        return job
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[ExportJob]:
+        """Wait for a job to finish.
+
+        Args:
+            job_id: Job ID
+            timeout: Seconds to wait (None waits indefinitely)
+
+        Returns:
+            The job, which may still be unfinished if the timeout expired,
+            or None if it is unknown
+        """
+        task = self._tasks.get(job_id)
+        if task is not None:
+            # asyncio.wait doesn't cancel the job if the waiter goes away
+            await asyncio.wait({task}, timeout=timeout)
+        return self.jobs.get(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[ExportJob]:
+        """Yield snapshots of a job each time its status changes.
+
+        The first snapshot is the current state; iteration ends once the job
+        has finished.
+
+        Args:
+            job_id: Job ID
+
+        Yields:
+            Copies of the job
+        """
+        while True:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            changed = self._changed.get(job_id)
+            yield job.model_copy()
+            if job.status.finished or changed is None:
+                return
+            await changed.wait()
+
+    def metrics(self) -> ExportQueueMetrics:
+        """Report queue depth, outcome counts and recent timings."""
+        statuses = [job.status for job in self.jobs.values()]
+        return ExportQueueMetrics(
+            queued=statuses.count(ExportJobStatus.QUEUED),
+            running=statuses.count(ExportJobStatus.RUNNING),
+            max_concurrency=self.max_concurrency,
+            succeeded=self._totals[ExportJobStatus.SUCCEEDED],
+            failed=self._totals[ExportJobStatus.FAILED],
+            cancelled=self._totals[ExportJobStatus.CANCELLED],
+            avg_wait_seconds=_mean(self._wait_times),
+            avg_run_seconds=_mean(self._run_times),
+            max_run_seconds=max(self._run_times, default=0.0),
+        )
+
+    async def shutdown(self) -> None:
+        """Cancel every unfinished job and wait for them to stop."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: ExportJob, markdown_content: str, metadata: Optional[dict]) -> None:
+        """Run one job once a concurrency slot is free, setting its final status."""
+        try:
+            async with self.slot():
+                job.status = ExportJobStatus.RUNNING
+                job.started_at = time.time()
+                self._wait_times.append(job.started_at - job.created_at)
+                self._notify(job)
+
+                timer = ExportTimer(job.format)
+                # Jobs for the same file name run side by side, so each
+                # writes its own artifact rather than overwriting the other's
+                stem = job.output_filename.removesuffix(f".{job.format}")
+                artifact = f"{stem}-{job.id}"
+                if job.format == "pdf":
+                    path = await self.service.export_to_pdf_async(
+                        markdown_content, artifact, metadata, timer
+                    )
+                else:
+                    path = await self.service.export_to_html_async(
+                        markdown_content, artifact, timer
+                    )
+
+            self._results[job.id] = path
+            job.stats = timer.stats
+            job.status = ExportJobStatus.SUCCEEDED
+
+        except asyncio.CancelledError:
+            job.status = ExportJobStatus.CANCELLED
+            logger.info(f"Export job {job.id} cancelled")
+
+        except Exception as e:
+            job.status = ExportJobStatus.FAILED
+            job.error = str(e)
+            logger.warning(f"Export job {job.id} failed: {e}")
+
+    def _finish(self, job: ExportJob) -> None:
+        """Record a job's outcome once its task is done."""
+        if not job.status.finished:
+            # Cancelled before the task got to run at all
+            job.status = ExportJobStatus.CANCELLED
+
+        job.finished_at = time.time()
+        if job.started_at is not None:
+            self._run_times.append(job.finished_at - job.started_at)
+        self._totals[job.status] += 1
+        self._tasks.pop(job.id, None)
+        self._notify(job)
+
+    def _notify(self, job: ExportJob) -> None:
+        """Wake watchers of a job and arm a fresh event for its next change."""
+        changed = self._changed.get(job.id)
+        if changed is not None:
+            changed.set()
+        if not job.status.finished:
+            self._changed[job.id] = asyncio.Event()
+        else:
+            self._changed.pop(job.id, None)
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than ``job_ttl``.
+
+        Artifacts stay in the exports directory; only the job records go.
+        """
+        cutoff = time.time() - self.job_ttl
+        expired = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.status.finished and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+            self._results.pop(job_id, None)
+
+
+def download_name(job: ExportJob) -> str:
+    """File name a job's artifact is downloaded as (the one it was requested with)."""
+    suffix = f".{job.format}"
+    name = job.output_filename
+    return name if name.endswith(suffix) else name + suffix
+
+
+def _mean(values: Deque[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+# Singleton instance
+export_job_manager = ExportJobManager()
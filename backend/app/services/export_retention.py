@@ -0,0 +1,213 @@
+"""Retention of exported files: size and age limits, orphan cleanup."""
+
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.storage import TEMP_SUFFIX
+from app.models.export import ExportStorageMetrics
+
+logger = logging.getLogger(__name__)
+
+# Per-render scratch directories are created in the exports dir with this prefix
+SCRATCH_PREFIX = ".render-"
+
+# Intermediate Markdown written next to the output by earlier versions:
+# temp_<timestamp>.md (e.g. temp_1697700000.123456.md) or temp_<uuid hex>.md
+LEGACY_TEMP_PATTERN = re.compile(r"^temp_(\d+(\.\d+)?|[0-9a-f]{32})\.md$")
+
+
+class ExportRetention:
+    """Keeps the exports directory within a size and age budget.
+
+    Exported files (the top level of the exports dir; the export cache and
+    LaTeX formats have budgets of their own) older than ``max_age`` are
+    deleted, then the least recently used ones until the total fits
+    ``max_bytes``. Files being downloaded are pinned and never deleted.
+    """
+
+    def __init__(
+        self,
+        exports_dir: Path,
+        max_bytes: int = settings.EXPORTS_MAX_BYTES,
+        max_age: int = settings.EXPORTS_MAX_AGE,
+    ):
+        """Initialize export retention.
+
+        Args:
+            exports_dir: Directory of exported files
+            max_bytes: Total size of exported files to keep (0 = unbounded)
+            max_age: Seconds to keep an exported file since it was last
+                written or downloaded (0 = forever)
+        """
+        self.exports_dir = exports_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._pins: Counter = Counter()
+        self._lock = threading.Lock()
+        self._evicted_files = 0
+        self._evicted_bytes = 0
+        self._orphans_removed = 0
+
+    def pin(self, path: Path) -> None:
+        """Protect a file from eviction (e.g. while it is being downloaded).
+
+        Pins are counted; each one must be matched by :meth:`release`. The
+        file is also marked as recently used.
+        """
+        with self._lock:
+            self._pins[path.name] += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def release(self, path: Path) -> None:
+        """Drop a pin taken with :meth:`pin`."""
+        with self._lock:
+            self._pins[path.name] -= 1
+            if self._pins[path.name] <= 0:
+                del self._pins[path.name]
+
+    def is_pinned(self, path: Path) -> bool:
+        with self._lock:
+            return path.name in self._pins
+
+    def sweep_orphans(self) -> int:
+        """Delete leftovers of renders that never finished.
+
+        Removes scratch directories, partially written files and legacy
+        intermediate Markdown. Only safe while no export is running, i.e.
+        at startup.
+
+        Returns:
+            Number of files and directories removed
+        """
+        removed = 0
+        for directory in (
+            self.exports_dir,
+            self.exports_dir / ".cache",
+            self.exports_dir / ".formats",
+        ):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory):
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if directory == self.exports_dir and entry.name.startswith(SCRATCH_PREFIX):
+                            shutil.rmtree(entry.path)
+                            removed += 1
+                    elif entry.name.endswith(TEMP_SUFFIX) or LEGACY_TEMP_PATTERN.match(entry.name):
+                        os.unlink(entry.path)
+                        removed += 1
+                except OSError as e:
+                    logger.warning(f"Could not remove orphaned export file {entry.path}: {e}")
+
+        with self._lock:
+            self._orphans_removed += removed
+        if removed:
+            logger.info(f"Removed {removed} orphaned export files")
+        return removed
+
+    def enforce(self, keep: Optional[Path] = None) -> int:
+        """Delete expired and least recently used exports over the budget.
+
+        Args:
+            keep: A file never to delete in this pass (the export just written)
+
+        Returns:
+            Number of files deleted
+        """
+        now = time.time()
+        removed = removed_bytes = 0
+
+        with self._lock:
+            entries = self._exports()
+            total = sum(size for _, size, _ in entries)
+
+            for mtime, size, path in entries:
+                expired = self.max_age and now - mtime > self.max_age
+                over_budget = self.max_bytes and total > self.max_bytes
+                if not (expired or over_budget):
+                    continue
+                if path.name in self._pins or (keep is not None and path.name == keep.name):
+                    continue
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"Could not remove export {path}: {e}")
+                    continue
+                total -= size
+                removed += 1
+                removed_bytes += size
+
+            self._evicted_files += removed
+            self._evicted_bytes += removed_bytes
+
+        if removed:
+            logger.info(
+                f"Removed {removed} old exports ({removed_bytes} bytes, {total} bytes remain)"
+            )
+        return removed
+
+    def metrics(self) -> ExportStorageMetrics:
+        """Report disk usage of the exports directory.
+
+        Returns:
+            Storage metrics
+        """
+        now = time.time()
+        with self._lock:
+            entries = self._exports()
+            pinned = len(self._pins)
+            evicted_files, evicted_bytes = self._evicted_files, self._evicted_bytes
+            orphans_removed = self._orphans_removed
+
+        return ExportStorageMetrics(
+            files=len(entries),
+            bytes=sum(size for _, size, _ in entries),
+            max_bytes=self.max_bytes,
+            max_age_seconds=self.max_age,
+            oldest_seconds=now - entries[0][0] if entries else 0.0,
+            cache_bytes=_directory_size(self.exports_dir / ".cache"),
+            formats_bytes=_directory_size(self.exports_dir / ".formats"),
+            pinned=pinned,
+            evicted_files=evicted_files,
+            evicted_bytes=evicted_bytes,
+            orphans_removed=orphans_removed,
+        )
+
+    def _exports(self) -> List[Tuple[float, int, Path]]:
+        """Exported files as (mtime, size, path), least recently used first."""
+        entries = []
+        for entry in os.scandir(self.exports_dir):
+            if entry.name.startswith(".") or not entry.is_file(follow_symlinks=False):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        return sorted(entries)
+
+
+def _directory_size(directory: Path) -> int:
+    if not directory.is_dir():
+        return 0
+    total = 0
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file(follow_symlinks=False):
+                total += entry.stat().st_size
+        except FileNotFoundError:
+            continue
+    return total
@@ -1,13 +1,27 @@
 """Export service for generating PDFs and other formats."""
 
+import functools
+import hashlib
 import logging
+import os
 import shutil
 import subprocess
-from datetime import datetime
+import tempfile
+import uuid
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from app.core.config import settings
+from app.core.executor import run_io
+from app.core.processes import ExternalCommand, Pipeline, run_pipeline, run_pipeline_async
+from app.core.storage import TEMP_SUFFIX, atomic_write_text
+from app.services.document_executor import CALC_RENDERER_VERSION, document_executor
+from app.services.export_cache import ExportCache
+from app.services.export_retention import SCRATCH_PREFIX, ExportRetention
+from app.services.export_stats import ExportStatsRecorder, ExportTimer
+from app.services.html_renderer import HTML_RENDERER_VERSION, html_renderer
+from app.services.latex_format import LatexFormatCache
+from app.services.latex_fragments import LatexFragmentCache
 
 logger = logging.getLogger(__name__)
 
@@ -24,13 +38,28 @@ class ExportService:
         self.exports_dir = exports_dir
         self.exports_dir.mkdir(parents=True, exist_ok=True)
 
+        # Previously rendered artifacts, keyed by everything that affects them
+        self.cache = ExportCache(self.exports_dir / ".cache")
+        # Dumped LaTeX preambles, reused across PDF exports
+        self.latex_formats = LatexFormatCache(self.exports_dir / ".formats")
+        # Per-section LaTeX, so edits only reconvert the sections they touch
+        self.latex_fragments = LatexFragmentCache()
+        # Size and age limits for the exported files themselves
+        self.retention = ExportRetention(self.exports_dir)
+        # Stage timings of recent exports
+        self.stats = ExportStatsRecorder()
+
         # Check if pandoc is available
         self.pandoc_available = shutil.which(settings.PANDOC_PATH) is not None
         if not self.pandoc_available:
             logger.warning("Pandoc not found - PDF export will not be available")
 
     def export_to_pdf(
-        self, markdown_content: str, output_filename: str, metadata: Optional[dict] = None
+        self,
+        markdown_content: str,
+        output_filename: str,
+        metadata: Optional[dict] = None,
+        timer: Optional[ExportTimer] = None,
     ) -> Path:
         """Export markdown content to PDF using Pandoc.
 
@@ -38,6 +67,8 @@ class ExportService:
             markdown_content: The markdown content to export
             output_filename: Desired output filename (without extension)
             metadata: Optional metadata for the PDF
+            timer: Collects the export's stage timings (one is created and
+                recorded in :attr:`stats` either way)
 
         Returns:
             Path to the generated PDF file
@@ -45,6 +76,155 @@ class ExportService:
         Raises:
             RuntimeError: If Pandoc is not available or export fails
         """
+        timer = timer or ExportTimer("pdf")
+        with timer.stage("prepare"):
+            output_path, cache_key, options = self._prepare_pdf(
+                markdown_content, output_filename, metadata
+            )
+
+        # Serve an identical earlier export without running pandoc
+        with timer.stage("write"):
+            hit = self._serve_cached(cache_key, ".pdf", output_path)
+        if hit:
+            return self._record(timer, output_path, hit)
+
+        try:
+            with timer.stage("prepare"):
+                markdown_content = self._execute_calcs(markdown_content)
+            with timer.pipeline():
+                run_pipeline(
+                    self._pdf_pipeline(markdown_content, output_path, options),
+                    observer=timer.command,
+                )
+
+            with timer.stage("write"):
+                self._cache_artifact(cache_key, ".pdf", output_path)
+            return self._record(timer, output_path, hit)
+
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"PDF export timed out after {settings.EXPORT_TIMEOUT} seconds")
+
+        except RuntimeError:
+            raise
+
+        except Exception as e:
+            logger.error(f"PDF export error: {e}", exc_info=True)
+            raise RuntimeError(f"PDF export failed: {str(e)}")
+
+    async def export_to_pdf_async(
+        self,
+        markdown_content: str,
+        output_filename: str,
+        metadata: Optional[dict] = None,
+        timer: Optional[ExportTimer] = None,
+    ) -> Path:
+        """Async variant of :meth:`export_to_pdf`.
+
+        Pandoc and LaTeX run as asyncio subprocesses, so no thread is held
+        for the length of the render, and they are killed if the export times
+        out or the awaiting task is cancelled.
+        """
+        timer = timer or ExportTimer("pdf")
+        with timer.stage("prepare"):
+            output_path, cache_key, options = await run_io(
+                self._prepare_pdf, markdown_content, output_filename, metadata
+            )
+
+        with timer.stage("write"):
+            hit = await run_io(self._serve_cached, cache_key, ".pdf", output_path)
+        if hit:
+            return await run_io(self._record, timer, output_path, hit)
+
+        try:
+            with timer.stage("prepare"):
+                markdown_content = await run_io(self._execute_calcs, markdown_content)
+            with timer.pipeline():
+                await run_pipeline_async(
+                    self._pdf_pipeline(markdown_content, output_path, options),
+                    observer=timer.command,
+                )
+
+            with timer.stage("write"):
+                await run_io(self._cache_artifact, cache_key, ".pdf", output_path)
+            return await run_io(self._record, timer, output_path, hit)
+
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"PDF export timed out after {settings.EXPORT_TIMEOUT} seconds")
+
+        except RuntimeError:
+            raise
+
+        except Exception as e:
+            logger.error(f"PDF export error: {e}", exc_info=True)
+            raise RuntimeError(f"PDF export failed: {str(e)}")
+
+    def _pdf_pipeline(
+        self, markdown_content: str, output_path: Path, options: List[str]
+    ) -> Pipeline[Path]:
+        """Render Markdown to ``output_path`` (a process pipeline).
+
+        Uses a precompiled LaTeX format (and the per-section LaTeX cache)
+        when the engine supports it, falling back to letting pandoc run the
+        engine.
+
+        Raises:
+            RuntimeError: If pandoc fails
+        """
+        # Markdown goes to pandoc on stdin; pandoc and LaTeX write into a
+        # scratch dir private to this render, so concurrent exports never
+        # share temp names and a half-written PDF is never visible
+        source = markdown_content.encode("utf-8")
+        scratch = Path(tempfile.mkdtemp(prefix=SCRATCH_PREFIX, dir=self.exports_dir))
+
+        try:
+            engine = settings.PDF_ENGINE
+            if self.latex_formats.available(engine):
+                latex = yield from self.latex_fragments.convert(
+                    markdown_content,
+                    [settings.PANDOC_PATH, "-f", "markdown", "-t", "latex", *options],
+                    self.pandoc_version,
+                )
+                if latex is not None:
+                    rendered = yield from self.latex_formats.compile(
+                        engine, latex, output_path, scratch
+                    )
+                    if rendered is not None:
+                        return rendered
+
+            scratch_pdf = scratch / "output.pdf"
+            result = yield ExternalCommand(
+                [settings.PANDOC_PATH, "-f", "markdown", "-o", str(scratch_pdf), *options],
+                input=source,
+            )
+            if result.returncode != 0:
+                error_msg = f"Pandoc export failed: {result.stderr.decode('utf-8', 'replace')}"
+                logger.error(error_msg)
+                raise RuntimeError(error_msg)
+
+            # Same filesystem, so publishing the finished PDF is an atomic rename
+            os.replace(scratch_pdf, output_path)
+            return output_path
+
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    def _execute_calcs(self, markdown_content: str) -> str:
+        """Replace ``%%calc`` blocks with their results (cached per content)."""
+        if not settings.EXPORT_EXECUTE_CALCS:
+            return markdown_content
+        return document_executor.execute_markdown(markdown_content)
+
+    def _prepare_pdf(
+        self, markdown_content: str, output_filename: str, metadata: Optional[dict]
+    ) -> Tuple[Path, str, List[str]]:
+        """Resolve the output path, pandoc options and cache key of a PDF export.
+
+        The first call runs the pandoc and LaTeX version checks (see
+        :meth:`warm_up`), so async callers run it off the event loop.
+
+        Raises:
+            RuntimeError: If Pandoc is not available
+        """
         if not self.pandoc_available:
             raise RuntimeError("Pandoc is not available. Please install Pandoc for PDF export.")
 
@@ -52,128 +232,186 @@ class ExportService:
         if not output_filename.endswith(".pdf"):
             output_filename += ".pdf"
 
-        output_path = self.exports_dir / output_filename
+        options = self._pdf_options(metadata)
+        self.latex_formats.prepare(settings.PDF_ENGINE)
+        cache_key = self.cache.make_key(
+            markdown=hashlib.sha256(markdown_content.encode("utf-8")).hexdigest(),
+            metadata=metadata,
+            engine=settings.PDF_ENGINE,
+            engine_version=self.latex_formats.engine_version(settings.PDF_ENGINE),
+            pandoc=self.pandoc_version,
+            options=options,
+            execute_calcs=settings.EXPORT_EXECUTE_CALCS,
+            calcs=CALC_RENDERER_VERSION,
+        )
+        return self.exports_dir / output_filename, cache_key, options
+
+    def _serve_cached(self, cache_key: str, suffix: str, output_path: Path) -> bool:
+        """Copy a cached artifact to ``output_path`` if there is one.
 
-        # Create temporary markdown file
-        temp_md_path = self.exports_dir / f"temp_{datetime.now().timestamp()}.md"
+        Returns:
+            True on a cache hit
+        """
+        cached_path = self.cache.get(cache_key, suffix)
+        if cached_path is None:
+            return False
+
+        self._copy_artifact(cached_path, output_path)
+        logger.info(f"Served export from cache: {output_path}")
+        self._enforce_retention(output_path)
+        return True
 
+    def warm_up(self) -> None:
+        """Run the one-off pandoc and LaTeX version checks before the first export.
+
+        They start subprocesses; doing them at startup keeps them off the
+        event loop and out of the first export's latency.
+        """
+        if self.pandoc_available:
+            logger.info(f"Pandoc: {self.pandoc_version}")
+            self.latex_formats.prepare(settings.PDF_ENGINE)
+
+    @functools.cached_property
+    def pandoc_version(self) -> str:
+        """Version line reported by the pandoc binary (part of export cache keys)."""
+        if not self.pandoc_available:
+            return ""
         try:
-            # Write markdown content to temp file
-            with open(temp_md_path, "w", encoding="utf-8") as f:
-                f.write(markdown_content)
-
-            # Build pandoc command
-            pandoc_cmd = [
-                settings.PANDOC_PATH,
-                str(temp_md_path),
-                "-o",
-                str(output_path),
-                "--pdf-engine=" + settings.PDF_ENGINE,
-                "--standalone",
-                # Add nice styling
-                "-V",
-                "geometry:margin=1in",
-                "-V",
-                "fontsize=11pt",
-                # Enable math
-                "--mathjax",
-            ]
-
-            # Add metadata if provided
-            if metadata:
-                if "title" in metadata:
-                    pandoc_cmd.extend(["-V", f"title={metadata['title']}"])
-                if "author" in metadata or "engineer" in metadata:
-                    author = metadata.get("author") or metadata.get("engineer")
-                    pandoc_cmd.extend(["-V", f"author={author}"])
-                if "date" in metadata:
-                    pandoc_cmd.extend(["-V", f"date={metadata['date']}"])
-
-            # Execute pandoc
             result = subprocess.run(
-                pandoc_cmd, capture_output=True, text=True, timeout=60  # 60 second timeout
+                [settings.PANDOC_PATH, "--version"], capture_output=True, text=True, timeout=10
             )
+            return result.stdout.splitlines()[0] if result.stdout else ""
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Could not determine pandoc version: {e}")
+            return ""
 
-            if result.returncode != 0:
-                error_msg = f"Pandoc export failed: {result.stderr}"
-                logger.error(error_msg)
-                raise RuntimeError(error_msg)
+    def _pdf_options(self, metadata: Optional[dict] = None) -> List[str]:
+        """Build the pandoc options for a PDF export.
 
-            logger.info(f"Successfully exported PDF: {output_path}")
-            return output_path
+        Args:
+            metadata: Optional metadata for the PDF
 
-        except subprocess.TimeoutExpired:
-            raise RuntimeError("PDF export timed out after 60 seconds")
+        Returns:
+            Pandoc command-line options (excluding input and output)
+        """
+        options = [
+            "--pdf-engine=" + settings.PDF_ENGINE,
+            "--standalone",
+            # Add nice styling
+            "-V",
+            "geometry:margin=1in",
+            "-V",
+            "fontsize=11pt",
+            # Enable math
+            "--mathjax",
+        ]
+
+        # Add metadata if provided
+        if metadata:
+            if "title" in metadata:
+                options.extend(["-V", f"title={metadata['title']}"])
+            if "author" in metadata or "engineer" in metadata:
+                author = metadata.get("author") or metadata.get("engineer")
+                options.extend(["-V", f"author={author}"])
+            if "date" in metadata:
+                options.extend(["-V", f"date={metadata['date']}"])
+            if metadata.get("toc"):
+                options.append("--toc")
+
+        return options
+
+    def _copy_artifact(self, source: Path, output_path: Path) -> None:
+        """Atomically place a copy of a cached artifact at ``output_path``."""
+        temp_path = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}{TEMP_SUFFIX}")
+        shutil.copyfile(source, temp_path)
+        os.replace(temp_path, output_path)
+
+    def _cache_artifact(self, cache_key: str, suffix: str, output_path: Path) -> None:
+        """Store a rendered artifact in the export cache, then trim old exports."""
+        try:
+            self.cache.put(cache_key, suffix, output_path)
+        except OSError as e:
+            logger.warning(f"Could not cache export {output_path}: {e}")
+        self._enforce_retention(output_path)
 
-        except Exception as e:
-            logger.error(f"PDF export error: {e}", exc_info=True)
-            raise RuntimeError(f"PDF export failed: {str(e)}")
+    def _enforce_retention(self, output_path: Path) -> None:
+        """Apply the retention limits, sparing ``output_path``; failures are not fatal."""
+        try:
+            self.retention.enforce(keep=output_path)
+        except OSError as e:
+            logger.warning(f"Could not enforce export retention: {e}")
 
-        finally:
-            # Clean up temp file
-            if temp_md_path.exists():
-                temp_md_path.unlink()
+    def export_to_html(
+        self, markdown_content: str, output_filename: str, timer: Optional[ExportTimer] = None
+    ) -> Path:
+        """Export markdown content to a self-contained HTML page.
 
-    def export_to_html(self, markdown_content: str, output_filename: str) -> Path:
-        """Export markdown content to HTML.
+        Markdown is rendered on the server and math is converted to MathML,
+        with the stylesheet inlined, so the page works offline and loads
+        nothing from a CDN.
 
         Args:
             markdown_content: The markdown content to export
             output_filename: Desired output filename (without extension)
+            timer: Collects the export's stage timings (one is created and
+                recorded in :attr:`stats` either way)
 
         Returns:
             Path to the generated HTML file
         """
-        # Ensure output filename ends with .html
-        if not output_filename.endswith(".html"):
-            output_filename += ".html"
-
-        output_path = self.exports_dir / output_filename
-
-        # For MVP, simple HTML wrapper
-        # In production, would use a proper HTML template with CSS
-        html_content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Engineering Calculation</title>
-    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/katex@0.16.9/dist/katex.min.css">
-    <script defer src="https://cdn.jsdelivr.net/npm/katex@0.16.9/dist/katex.min.js"></script>
-    <script defer src="https://cdn.jsdelivr.net/npm/katex@0.16.9/dist/contrib/auto-render.min.js"
-        onload="renderMathInElement(document.body);"></script>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            max-width: 800px;
-            margin: 40px auto;
-            padding: 20px;
-            line-height: 1.6;
-        }}
-        pre {{
-            background: #f5f5f5;
-            padding: 10px;
-            border-radius: 4px;
-            overflow-x: auto;
-        }}
-        code {{
-            background: #f5f5f5;
-            padding: 2px 6px;
-            border-radius: 3px;
-        }}
-    </style>
-</head>
-<body>
-{markdown_content}
-</body>
-</html>"""
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
-
-        logger.info(f"Successfully exported HTML: {output_path}")
+        timer = timer or ExportTimer("html")
+        with timer.stage("prepare"):
+            # Ensure output filename ends with .html
+            if not output_filename.endswith(".html"):
+                output_filename += ".html"
+
+            output_path = self.exports_dir / output_filename
+            cache_key = self.cache.make_key(
+                markdown=hashlib.sha256(markdown_content.encode("utf-8")).hexdigest(),
+                format="html",
+                renderer=HTML_RENDERER_VERSION,
+                pandoc=self.pandoc_version,
+                execute_calcs=settings.EXPORT_EXECUTE_CALCS,
+                calcs=CALC_RENDERER_VERSION,
+            )
+
+        with timer.stage("write"):
+            hit = self._serve_cached(cache_key, ".html", output_path)
+        if hit:
+            return self._record(timer, output_path, hit)
+
+        with timer.stage("prepare"):
+            markdown_content = self._execute_calcs(markdown_content)
+        with timer.stage("pandoc"):
+            html_content = html_renderer.render_document(markdown_content)
+        with timer.stage("write"):
+            atomic_write_text(output_path, html_content, fsync=False)
+            self._cache_artifact(cache_key, ".html", output_path)
+        return self._record(timer, output_path, hit)
+
+    def _record(self, timer: ExportTimer, output_path: Path, hit: bool) -> Path:
+        """Finish an export's stats and log it."""
+        if hit:
+            cache = "hit"
+        else:
+            cache = "miss" if self.cache.enabled else "disabled"
+        stats = timer.finish(output_path, cache)
+        self.stats.record(stats)
+        logger.info(
+            f"Exported {output_path.name} in {stats.total_seconds:.2f}s "
+            f"(cache {cache}, pandoc {stats.pandoc_seconds:.2f}s, "
+            f"engine {stats.engine_seconds:.2f}s, {stats.size_bytes} bytes)"
+        )
         return output_path
 
+    # Async variants - run the blocking file I/O on the shared I/O thread pool
+
+    async def export_to_html_async(
+        self, markdown_content: str, output_filename: str, timer: Optional[ExportTimer] = None
+    ) -> Path:
+        """Async variant of :meth:`export_to_html`."""
+        return await run_io(self.export_to_html, markdown_content, output_filename, timer)
+
 
 # Singleton instance
 export_service = ExportService()
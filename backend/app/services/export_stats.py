@@ -0,0 +1,114 @@
+"""Per-stage timing of exports."""
+
+import contextlib
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Iterator
+
+from app.core.config import settings
+from app.core.processes import ExternalCommand
+from app.models.export import ExportStats, ExportStatsSummary
+
+# Number of recent exports the summary is computed over
+STATS_WINDOW = 100
+
+# Recent exports listed individually in the summary
+RECENT_EXPORTS = 20
+
+
+class ExportTimer:
+    """Accumulates the stage timings of one export into :class:`ExportStats`."""
+
+    def __init__(self, fmt: str):
+        self.stats = ExportStats(format=fmt)
+        self._start = time.perf_counter()
+        self._command_seconds = 0.0
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block as part of ``prepare``, ``pandoc``, ``engine`` or ``write``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, time.perf_counter() - start)
+
+    @contextlib.contextmanager
+    def pipeline(self) -> Iterator[None]:
+        """Time a process pipeline.
+
+        Its commands are attributed by :meth:`command`; the time spent in
+        the pipeline's own steps between them (scratch files, publishing)
+        counts as ``write``.
+        """
+        start = time.perf_counter()
+        commands_before = self._command_seconds
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._add("write", max(elapsed - (self._command_seconds - commands_before), 0.0))
+
+    def command(self, command: ExternalCommand, seconds: float) -> None:
+        """Record a finished external command (a pipeline observer).
+
+        Pandoc runs count as ``pandoc`` (including any engine runs pandoc
+        drives itself); other commands are LaTeX runs, counted as ``engine``.
+        """
+        self._command_seconds += seconds
+        self.stats.processes += 1
+        self._add("pandoc" if command.args[0] == settings.PANDOC_PATH else "engine", seconds)
+
+    def finish(self, path: Path, cache: str) -> ExportStats:
+        """Complete the stats with the artifact size and cache status."""
+        self.stats.cache = cache
+        self.stats.size_bytes = path.stat().st_size
+        self.stats.total_seconds = time.perf_counter() - self._start
+        return self.stats
+
+    def _add(self, name: str, seconds: float) -> None:
+        field = f"{name}_seconds"
+        setattr(self.stats, field, getattr(self.stats, field) + seconds)
+
+
+class ExportStatsRecorder:
+    """Keeps the stats of recent exports for the stats endpoint."""
+
+    def __init__(self, window: int = STATS_WINDOW):
+        self._recent: Deque[ExportStats] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, stats: ExportStats) -> None:
+        with self._lock:
+            self._recent.append(stats)
+
+    def summary(self) -> ExportStatsSummary:
+        """Aggregate the recent exports."""
+        with self._lock:
+            recent = list(self._recent)
+
+        def mean(field: str) -> float:
+            return sum(getattr(stats, field) for stats in recent) / len(recent) if recent else 0.0
+
+        return ExportStatsSummary(
+            exports=len(recent),
+            cache_hits=sum(1 for stats in recent if stats.cache == "hit"),
+            avg_prepare_seconds=mean("prepare_seconds"),
+            avg_pandoc_seconds=mean("pandoc_seconds"),
+            avg_engine_seconds=mean("engine_seconds"),
+            avg_write_seconds=mean("write_seconds"),
+            avg_total_seconds=mean("total_seconds"),
+            max_total_seconds=max((stats.total_seconds for stats in recent), default=0.0),
+            avg_size_bytes=mean("size_bytes"),
+            recent=recent[::-1][:RECENT_EXPORTS],
+        )
+
+
+def server_timing(stats: ExportStats) -> str:
+    """Format stats as a ``Server-Timing`` header value (milliseconds)."""
+    stages = ("prepare", "pandoc", "engine", "write", "total")
+    return ", ".join(
+        f"{stage};dur={getattr(stats, f'{stage}_seconds') * 1000:.1f}" for stage in stages
+    )
@@ -0,0 +1,341 @@
+"""Server-side Markdown and math rendering for self-contained HTML exports."""
+
+import hashlib
+import html
+import logging
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from latex2mathml.converter import convert as latex_to_mathml
+from markdown_it import MarkdownIt
+from markdown_it.rules_block import StateBlock
+from markdown_it.rules_inline import StateInline
+
+from app.core.config import settings
+from app.core.processes import ExternalCommand, run_command
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever rendering output changes, so cached HTML exports are rebuilt
+HTML_RENDERER_VERSION = "2"
+
+# (display, TeX source)
+MathExpression = Tuple[bool, str]
+
+PARAGRAPH_PATTERN = re.compile(r"<p>(.*?)</p>", re.DOTALL)
+
+# HTML parsers put <math> in the MathML namespace without being told
+MATHML_XMLNS = ' xmlns="http://www.w3.org/1998/Math/MathML"'
+
+STYLESHEET = """
+body {
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    max-width: 800px;
+    margin: 40px auto;
+    padding: 20px;
+    line-height: 1.6;
+    color: #1f2933;
+}
+h1, h2, h3 { line-height: 1.25; }
+h1 { border-bottom: 2px solid #d0d7de; padding-bottom: 0.3em; }
+pre {
+    background: #f5f5f5;
+    padding: 10px;
+    border-radius: 4px;
+    overflow-x: auto;
+}
+code {
+    background: #f5f5f5;
+    padding: 2px 6px;
+    border-radius: 3px;
+    font-family: Consolas, 'Liberation Mono', Menlo, monospace;
+}
+pre code { padding: 0; background: none; }
+table { border-collapse: collapse; margin: 1em 0; }
+th, td { border: 1px solid #d0d7de; padding: 6px 12px; }
+th { background: #f6f8fa; }
+blockquote { margin: 1em 0; padding: 0 1em; color: #57606a; border-left: 4px solid #d0d7de; }
+math { font-family: 'Latin Modern Math', 'STIX Two Math', 'Cambria Math', math; }
+math[display="block"] { margin: 1em 0; overflow-x: auto; }
+.math.display { display: block; margin: 1em 0; overflow-x: auto; }
+""".strip()
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+{stylesheet}
+    </style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+class MathRenderer:
+    """Converts TeX math to MathML, caching each expression by hash.
+
+    Uncached expressions of a document are converted together in one pandoc
+    call (``--mathml``). Browsers render MathML natively, so the output needs
+    no scripts or fonts from the network. Without pandoc, expressions are
+    converted with latex2mathml instead (pure Python, with less complete TeX
+    coverage); only TeX neither can convert is emitted as escaped source.
+    """
+
+    def __init__(self, cache_size: int = settings.MATH_CACHE_SIZE):
+        """Initialize the math renderer.
+
+        Args:
+            cache_size: Rendered expressions to keep in memory
+        """
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render_all(self, expressions: Iterable[MathExpression]) -> Dict[MathExpression, str]:
+        """Render math expressions to HTML.
+
+        Args:
+            expressions: (display, TeX) pairs; duplicates are rendered once
+
+        Returns:
+            HTML for each expression
+        """
+        rendered: Dict[MathExpression, str] = {}
+        missing: List[MathExpression] = []
+
+        with self._lock:
+            for expression in dict.fromkeys(expressions):
+                cached = self._cache.get(self._key(expression))
+                if cached is not None:
+                    self._cache.move_to_end(self._key(expression))
+                    rendered[expression] = cached
+                else:
+                    missing.append(expression)
+
+        if not missing:
+            return rendered
+
+        converted = self._convert(missing)
+        if converted is None:
+            # Not cached, so a later export uses pandoc once it is available
+            rendered.update((expression, self._fallback(expression)) for expression in missing)
+            return rendered
+
+        with self._lock:
+            for expression, markup in zip(missing, converted):
+                rendered[expression] = markup
+                self._cache[self._key(expression)] = markup
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return rendered
+
+    def _key(self, expression: MathExpression) -> str:
+        display, tex = expression
+        return hashlib.sha256(f"{int(display)}:{tex}".encode("utf-8")).hexdigest()
+
+    def _convert(self, expressions: List[MathExpression]) -> Optional[List[str]]:
+        """Convert expressions to MathML in one pandoc run, one paragraph each.
+
+        Returns:
+            MathML per expression, or None if pandoc is unavailable or failed
+        """
+        if shutil.which(settings.PANDOC_PATH) is None:
+            return None
+
+        source = "\n\n".join(
+            f"$${tex}$$" if display else f"${tex}$" for display, tex in expressions
+        )
+        try:
+            result = run_command(
+                ExternalCommand(
+                    [settings.PANDOC_PATH, "-f", "markdown", "-t", "html", "--mathml"],
+                    input=source.encode("utf-8"),
+                ),
+                settings.EXPORT_TIMEOUT,
+            )
+        except Exception as e:
+            logger.warning(f"Math rendering failed: {e}")
+            return None
+
+        paragraphs = PARAGRAPH_PATTERN.findall(result.stdout.decode("utf-8"))
+        if result.returncode != 0 or len(paragraphs) != len(expressions):
+            logger.warning(f"Math rendering failed: {result.stderr.decode('utf-8', 'replace')}")
+            return None
+        return [paragraph.strip() for paragraph in paragraphs]
+
+    def _fallback(self, expression: MathExpression) -> str:
+        """Convert an expression without pandoc."""
+        display, tex = expression
+        try:
+            mathml = latex_to_mathml(tex, display="block" if display else "inline")
+            return mathml.replace(MATHML_XMLNS, "", 1)
+        except Exception as e:
+            logger.warning(f"Math rendering failed for {tex!r}: {e}")
+            kind = "display" if display else "inline"
+            return f'<span class="math {kind}">{html.escape(tex)}</span>'
+
+
+class HtmlRenderer:
+    """Renders Markdown to a standalone HTML page with markdown-it-py.
+
+    Supports CommonMark plus tables, strikethrough and ``$``/``$$`` math
+    (pandoc's rules: no space inside inline delimiters, no digit right after
+    the closing ``$``). The page has its stylesheet inlined and references
+    nothing external.
+    """
+
+    def __init__(self, math: Optional[MathRenderer] = None):
+        """Initialize the HTML renderer.
+
+        Args:
+            math: Math renderer (a new one by default)
+        """
+        self.math = math or MathRenderer()
+        self.md = MarkdownIt("commonmark").enable(["table", "strikethrough"])
+        self.md.inline.ruler.after("escape", "math_inline", _math_inline)
+        self.md.block.ruler.before(
+            "fence",
+            "math_block",
+            _math_block,
+            {"alt": ["paragraph", "reference", "blockquote", "list"]},
+        )
+        self.md.add_render_rule("math_inline", _render_math)
+        self.md.add_render_rule("math_block", _render_math)
+
+    def render_body(self, markdown: str) -> str:
+        """Render Markdown to an HTML fragment.
+
+        Args:
+            markdown: Markdown source
+
+        Returns:
+            HTML fragment with math already converted
+        """
+        tokens = self.md.parse(markdown)
+        expressions = [
+            (token.markup == "$$", token.content)
+            for token in _walk(tokens)
+            if token.type in ("math_inline", "math_block")
+        ]
+        env = {"math": self.math.render_all(expressions)}
+        return self.md.renderer.render(tokens, self.md.options, env)
+
+    def render_document(self, markdown: str, title: str = "Engineering Calculation") -> str:
+        """Render Markdown to a complete, self-contained HTML page.
+
+        Args:
+            markdown: Markdown source
+            title: Page title
+
+        Returns:
+            HTML document
+        """
+        return PAGE.format(
+            title=html.escape(title),
+            stylesheet=STYLESHEET,
+            body=self.render_body(markdown).rstrip(),
+        )
+
+
+def _walk(tokens):
+    for token in tokens:
+        yield token
+        if token.children:
+            yield from _walk(token.children)
+
+
+def _render_math(self, tokens, idx, options, env) -> str:
+    token = tokens[idx]
+    markup = env["math"][(token.markup == "$$", token.content)]
+    return f"{markup}\n" if token.type == "math_block" else markup
+
+
+def _math_inline(state: StateInline, silent: bool) -> bool:
+    """Inline rule for ``$...$`` and ``$$...$$`` within a paragraph."""
+    src, start = state.src, state.pos
+    if src[start] != "$":
+        return False
+
+    delimiter = "$$" if src.startswith("$$", start) else "$"
+    content_start = start + len(delimiter)
+    if content_start >= state.posMax or src[content_start].isspace():
+        return False
+
+    end = content_start
+    while True:
+        end = src.find(delimiter, end, state.posMax)
+        if end < 0:
+            return False
+        if src[end - 1] == "\\":
+            end += 1
+            continue
+        break
+
+    if delimiter == "$":
+        after = end + 1
+        if src[end - 1].isspace() or (after < state.posMax and src[after].isdigit()):
+            return False
+    if end == content_start:
+        return False
+
+    if not silent:
+        token = state.push("math_inline", "math", 0)
+        token.content = src[content_start:end]
+        token.markup = delimiter
+    state.pos = end + len(delimiter)
+    return True
+
+
+def _math_block(state: StateBlock, start_line: int, end_line: int, silent: bool) -> bool:
+    """Block rule for display math starting a line with ``$$``."""
+    if state.sCount[start_line] - state.blkIndent >= 4:
+        return False
+
+    line_start = state.bMarks[start_line] + state.tShift[start_line]
+    first = state.src[line_start : state.eMarks[start_line]]
+    if not first.startswith("$$"):
+        return False
+
+    rest = first[2:].rstrip()
+    next_line = start_line + 1
+    if rest.endswith("$$") and rest[:-2].strip():
+        content = rest[:-2]
+    else:
+        lines = [rest]
+        while True:
+            if next_line >= end_line:
+                return False
+            line = state.src[state.bMarks[next_line] : state.eMarks[next_line]].rstrip()
+            next_line += 1
+            if line.endswith("$$"):
+                lines.append(line[:-2])
+                break
+            lines.append(line)
+        content = "\n".join(lines)
+
+    if not content.strip():
+        return False
+    if silent:
+        return True
+
+    state.line = next_line
+    token = state.push("math_block", "math", 0)
+    token.block = True
+    token.content = content.strip()
+    token.markup = "$$"
+    token.map = [start_line, next_line]
+    return True
+
+
+# Singleton instance
+html_renderer = HtmlRenderer()
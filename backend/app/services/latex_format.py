@@ -0,0 +1,284 @@
+"""Precompiled LaTeX formats for faster PDF exports."""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.processes import ExternalCommand, Pipeline
+
+logger = logging.getLogger(__name__)
+
+# Engines whose preambles can be dumped with mylatexformat. XeLaTeX and
+# LuaLaTeX can't reliably dump their system fonts into a format.
+SUPPORTED_ENGINES = ("pdflatex",)
+
+# mylatexformat dumps the preamble up to this marker; everything after it is
+# read on every run
+END_OF_DUMP = "%endofdump"
+
+# Pandoc's template sets the title, author and PDF info after loading
+# packages; those lines vary per document, so dumping stops before them
+DOCUMENT_SPECIFIC = re.compile(r"^\\(hypersetup|title|subtitle|author|date)\b", re.MULTILINE)
+
+BEGIN_DOCUMENT = "\\begin{document}"
+
+# LaTeX asks for another run when cross-references/TOC are not yet stable
+RERUN_PATTERN = re.compile(r"Rerun to get|Label\(s\) may have changed|\(rerunfilecheck\)")
+
+MAX_LATEX_RUNS = 3
+
+
+def split_preamble(latex: str) -> Optional[Tuple[str, str]]:
+    """Split a standalone LaTeX document for use with a dumped format.
+
+    Args:
+        latex: Standalone LaTeX source as produced by ``pandoc -t latex -s``
+
+    Returns:
+        (dumpable preamble, rest of the document), or None if the source has
+        no ``\\begin{document}``
+    """
+    body_start = latex.find(BEGIN_DOCUMENT)
+    if body_start < 0:
+        return None
+
+    match = DOCUMENT_SPECIFIC.search(latex, 0, body_start)
+    split = match.start() if match else body_start
+    return latex[:split], latex[split:]
+
+
+class LatexFormatCache:
+    """Builds and reuses precompiled LaTeX formats for PDF exports.
+
+    Loading the preamble (document class, geometry, math packages, fonts)
+    dominates pdflatex's run time for short calculation sheets. Instead of
+    letting pandoc run the engine, exports render Markdown to LaTeX, dump the
+    document-independent part of the preamble into a format file with
+    ``mylatexformat`` once, and compile against that format. Formats are
+    keyed by engine, engine version and the dumped preamble text, so a change
+    of options or packages builds a new one; the ``max_formats`` most
+    recently used are kept.
+
+    Any failure returns None from :meth:`compile` so the caller can fall back
+    to the regular pandoc PDF path.
+    """
+
+    def __init__(self, formats_dir: Path, max_formats: int = settings.LATEX_FORMAT_CACHE_SIZE):
+        """Initialize the format cache.
+
+        Args:
+            formats_dir: Directory holding built ``.fmt`` files
+            max_formats: Formats to keep (least recently used are deleted)
+        """
+        self.formats_dir = formats_dir
+        self.max_formats = max_formats
+        self._lock = threading.Lock()
+        # Key -> renders currently compiling against that format
+        self._in_use: Dict[str, int] = {}
+        self._available: Dict[str, bool] = {}
+        self._versions: Dict[str, str] = {}
+        # Keys whose format failed to build; not retried until restart
+        self._failed: Set[str] = set()
+
+    def available(self, engine: str) -> bool:
+        """Check whether exports with ``engine`` can use precompiled formats."""
+        if not settings.LATEX_PRECOMPILE or Path(engine).name not in SUPPORTED_ENGINES:
+            return False
+
+        if engine not in self._available:
+            self._available[engine] = (
+                shutil.which(engine) is not None and self._find_file("mylatexformat.ltx")
+            )
+            if not self._available[engine]:
+                logger.info(f"Precompiled LaTeX formats unavailable for {engine}")
+        return self._available[engine]
+
+    def prepare(self, engine: str) -> bool:
+        """Run the one-off checks behind :meth:`available` and format keys.
+
+        They start subprocesses, so callers on an event loop run this off it
+        before building a pipeline; afterwards the results are cached.
+
+        Returns:
+            Whether ``engine`` can use precompiled formats
+        """
+        if not self.available(engine):
+            return False
+        self.engine_version(engine)
+        return True
+
+    def compile(
+        self, engine: str, latex: str, output_path: Path, scratch: Path
+    ) -> Pipeline[Optional[Path]]:
+        """Compile standalone LaTeX against a precompiled format (a process pipeline).
+
+        Args:
+            engine: LaTeX engine
+            latex: Standalone LaTeX source, as produced by pandoc
+            output_path: Where to place the PDF
+            scratch: Empty working directory for this render, owned by the
+                caller (on the same filesystem as ``output_path``)
+
+        Returns:
+            ``output_path``, or None if the caller should fall back to pandoc
+        """
+        parts = split_preamble(latex)
+        if parts is None:
+            return None
+        preamble, rest = parts
+
+        key = self._key(engine, preamble)
+        if key in self._failed:
+            return None
+
+        with self._lock:
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+        try:
+            return (yield from self._compile(engine, key, preamble, rest, output_path, scratch))
+        finally:
+            with self._lock:
+                self._in_use[key] -= 1
+                if not self._in_use[key]:
+                    del self._in_use[key]
+
+    def _compile(
+        self, engine: str, key: str, preamble: str, rest: str, output_path: Path, scratch: Path
+    ) -> Pipeline[Optional[Path]]:
+        """Build the format if needed and compile against it; see :meth:`compile`."""
+        env = self._env()
+        format_path = self.formats_dir / f"{key}.fmt"
+
+        if not self._touch(format_path):
+            (scratch / "preamble.tex").write_text(
+                f"{preamble}{END_OF_DUMP}\n{BEGIN_DOCUMENT}\n\\end{{document}}\n",
+                encoding="utf-8",
+            )
+            result = yield ExternalCommand(self._build_args(engine, key), cwd=scratch, env=env)
+            built = scratch / f"{key}.fmt"
+            if result.returncode != 0 or not built.exists():
+                self._failed.add(key)
+                logger.warning(f"Could not build LaTeX format {key[:12]} for {engine}")
+                return None
+
+            self.formats_dir.mkdir(parents=True, exist_ok=True)
+            os.replace(built, format_path)
+            logger.info(f"Built LaTeX format {key[:12]} for {engine}")
+            self.evict()
+
+        (scratch / "document.tex").write_text(f"{preamble}{END_OF_DUMP}\n{rest}", encoding="utf-8")
+        for _ in range(MAX_LATEX_RUNS):
+            result = yield ExternalCommand(
+                [
+                    engine,
+                    "-interaction=nonstopmode",
+                    "-halt-on-error",
+                    f"-fmt={key}",
+                    "document.tex",
+                ],
+                cwd=scratch,
+                env=env,
+            )
+            if result.returncode != 0:
+                logger.warning("Precompiled LaTeX run failed; falling back to pandoc")
+                return None
+
+            log = (scratch / "document.log").read_text(encoding="utf-8", errors="replace")
+            if not RERUN_PATTERN.search(log):
+                break
+
+        os.replace(scratch / "document.pdf", output_path)
+        return output_path
+
+    def evict(self) -> int:
+        """Delete least recently used formats beyond ``max_formats``.
+
+        Formats that a render is compiling against are kept, as is any
+        format that can't be deleted (e.g. held open by another process on
+        Windows); they are retried on the next eviction.
+
+        Returns:
+            Number of formats deleted
+        """
+        deleted = 0
+        with self._lock:
+            formats = sorted(
+                self.formats_dir.glob("*.fmt"), key=lambda p: p.stat().st_mtime, reverse=True
+            )
+            for path in formats[self.max_formats :]:
+                if path.stem in self._in_use:
+                    continue
+                try:
+                    path.unlink(missing_ok=True)
+                    deleted += 1
+                except OSError as e:
+                    logger.debug(f"Keeping LaTeX format {path.name} for now: {e}")
+        return deleted
+
+    def _key(self, engine: str, preamble: str) -> str:
+        """Hash everything a built format depends on."""
+        digest = hashlib.sha256()
+        for part in (Path(engine).name, self.engine_version(engine), preamble):
+            digest.update(part.encode("utf-8") + b"\0")
+        return digest.hexdigest()
+
+    def _build_args(self, engine: str, key: str) -> List[str]:
+        """Command line that dumps ``preamble.tex`` into ``<key>.fmt``."""
+        name = Path(engine).name
+        return [
+            engine,
+            "-ini",
+            "-interaction=nonstopmode",
+            f"-jobname={key}",
+            f"&{name}",
+            "mylatexformat.ltx",
+            "preamble.tex",
+        ]
+
+    def _env(self) -> Dict[str, str]:
+        """Environment for LaTeX runs in a scratch directory.
+
+        Formats are found in ``formats_dir``; relative ``\\includegraphics``
+        paths still resolve against the server's working directory, as they
+        do when pandoc runs the engine.
+        """
+        env = dict(os.environ)
+        env["TEXFORMATS"] = f"{self.formats_dir}{os.pathsep}{env.get('TEXFORMATS', '')}"
+        env["TEXINPUTS"] = f"{os.getcwd()}{os.pathsep}{env.get('TEXINPUTS', '')}"
+        return env
+
+    def _touch(self, path: Path) -> bool:
+        """Mark a format as recently used; False if it doesn't exist."""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def engine_version(self, engine: str) -> str:
+        """Version line reported by a LaTeX engine (checked once, then cached)."""
+        if engine not in self._versions:
+            try:
+                result = subprocess.run(
+                    [engine, "--version"], capture_output=True, text=True, timeout=10
+                )
+                self._versions[engine] = result.stdout.splitlines()[0] if result.stdout else ""
+            except (OSError, subprocess.SubprocessError):
+                self._versions[engine] = ""
+        return self._versions[engine]
+
+    def _find_file(self, name: str) -> bool:
+        """Check that kpathsea can find a TeX input file."""
+        try:
+            result = subprocess.run(
+                ["kpsewhich", name], capture_output=True, text=True, timeout=10
+            )
+        except (OSError, subprocess.SubprocessError):
+            return False
+        return result.returncode == 0 and bool(result.stdout.strip())
@@ -0,0 +1,239 @@
+"""Per-section cache of Markdown converted to LaTeX."""
+
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.processes import ExternalCommand, Pipeline
+
+logger = logging.getLogger(__name__)
+
+# Level 1-2 ATX headings start a new section; code fence delimiters
+SECTION_PATTERN = re.compile(r"^#{1,2}\s")
+FENCE_PATTERN = re.compile(r"^(```|~~~)")
+
+# Link reference and footnote definitions, which other sections may use
+DEFINITION_PATTERN = re.compile(r"^ {0,3}\[[^\]]+\]:\s*\S")
+
+# Paragraphs separating sections in a batched conversion; they survive
+# pandoc's LaTeX writer unchanged
+MARKER = "EngiCalcFragment{}"
+MARKER_PATTERN = re.compile(r"^EngiCalcFragment(\w+)$", re.MULTILINE)
+
+# Uses every construct that makes pandoc's template load extra packages, so
+# the preamble converted along with any subset of sections fits them all
+FEATURE_SAMPLER = """
+| a | b |
+|---|---|
+| 1 | 2 |
+
+```python
+x = 1
+```
+
+~~struck~~ [link](https://example.com) ![figure](figure.png) $x$ note[^1]
+
+$$y$$
+
+[^1]: Footnote
+"""
+
+MAX_WRAPPERS = 32
+
+
+def split_sections(markdown: str) -> List[str]:
+    """Split Markdown at level 1 and 2 headings, leaving code blocks alone.
+
+    Args:
+        markdown: Document Markdown
+
+    Returns:
+        Sections in document order (joined with newlines, they give back
+        the input)
+    """
+    sections: List[List[str]] = [[]]
+    in_fence = False
+    for line in markdown.split("\n"):
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        elif not in_fence and SECTION_PATTERN.match(line) and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+    return ["\n".join(lines) for lines in sections]
+
+
+def definitions(markdown: str) -> str:
+    """Collect the reference and footnote definitions of a document.
+
+    A definition takes the indented lines after it along (a link title on
+    the next line, further paragraphs of a footnote, with the blank lines
+    between them), and a footnote also its unindented continuation lines.
+    """
+    lines: List[str] = []
+    in_fence = False
+    current: Optional[str] = None  # The definition being collected
+    blanks = 0  # Blank lines seen since its last line
+    for line in markdown.split("\n"):
+        if current is not None:
+            if not line.strip():
+                blanks += 1
+                continue
+            lazy = (
+                not blanks
+                and current.lstrip().startswith("[^")
+                and not any(
+                    pattern.match(line)
+                    for pattern in (SECTION_PATTERN, FENCE_PATTERN, DEFINITION_PATTERN)
+                )
+            )
+            if line[0] in " \t" or lazy:
+                lines.extend([""] * blanks + [line])
+                blanks = 0
+                continue
+            current = None
+
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        elif not in_fence and DEFINITION_PATTERN.match(line):
+            # Kept apart, so none reads as a continuation of the one before
+            lines.extend(["", line] if lines else [line])
+            current, blanks = line, 0
+    return "\n".join(lines)
+
+
+class LatexFragmentCache:
+    """Converts Markdown to standalone LaTeX one section at a time, with caching.
+
+    Documents are split at level 1-2 headings, and each section's LaTeX is
+    cached by a hash of its Markdown and the pandoc options that affect the
+    body. On an export only the sections not in the cache are converted, in
+    a single pandoc run; the template around the body (preamble, title,
+    table of contents) comes from that run or, if every section is cached,
+    from the cache too. Editing one paragraph of a long package therefore
+    converts just the section containing it.
+
+    Documents starting with a YAML metadata block are converted whole.
+    """
+
+    def __init__(self, max_fragments: int = settings.LATEX_FRAGMENT_CACHE_SIZE):
+        """Initialize the fragment cache.
+
+        Args:
+            max_fragments: Converted sections to keep in memory
+        """
+        self.max_fragments = max_fragments
+        self._fragments: "OrderedDict[str, str]" = OrderedDict()
+        self._wrappers: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def convert(
+        self, markdown: str, args: Sequence[str], version: str = ""
+    ) -> Pipeline[Optional[str]]:
+        """Convert Markdown to standalone LaTeX (a process pipeline).
+
+        Args:
+            markdown: Document Markdown
+            args: Pandoc command producing standalone LaTeX on stdout
+            version: Pandoc version (part of the cache keys)
+
+        Returns:
+            LaTeX source, or None if pandoc failed
+        """
+        if markdown.startswith("---"):
+            result = yield ExternalCommand(list(args), input=markdown.encode("utf-8"))
+            return result.stdout.decode("utf-8") if result.returncode == 0 else None
+
+        # -V variables only fill in the template, so they key the wrapper alone
+        body_key = _hash(version, *_without_variables(args))
+        wrapper_key = _hash(version, *args)
+        shared = definitions(markdown)
+        sections = split_sections(markdown)
+        keys = [_hash(body_key, section, shared) for section in sections]
+
+        with self._lock:
+            fragments = [self._fragments.get(key) for key in keys]
+            for key, fragment in zip(keys, fragments):
+                if fragment is not None:
+                    self._fragments.move_to_end(key)
+            wrapper = self._wrappers.get(wrapper_key)
+
+        missing = [index for index, fragment in enumerate(fragments) if fragment is None]
+        if missing or wrapper is None:
+            parts = [MARKER.format("Start"), FEATURE_SAMPLER]
+            for index in missing:
+                section = sections[index]
+                parts.extend(
+                    [MARKER.format(index), f"{section}\n\n{shared}" if shared else section]
+                )
+            parts.append(MARKER.format("End"))
+
+            result = yield ExternalCommand(list(args), input="\n\n".join(parts).encode("utf-8"))
+            if result.returncode != 0:
+                return None
+            converted = self._split_output(result.stdout.decode("utf-8"), missing)
+            if converted is None:
+                logger.warning("Could not split converted LaTeX into sections; converting whole")
+                result = yield ExternalCommand(list(args), input=markdown.encode("utf-8"))
+                return result.stdout.decode("utf-8") if result.returncode == 0 else None
+
+            wrapper, converted_fragments = converted
+            with self._lock:
+                for index, fragment in zip(missing, converted_fragments):
+                    fragments[index] = fragment
+                    self._fragments[keys[index]] = fragment
+                while len(self._fragments) > self.max_fragments:
+                    self._fragments.popitem(last=False)
+                self._wrappers[wrapper_key] = wrapper
+                while len(self._wrappers) > MAX_WRAPPERS:
+                    self._wrappers.popitem(last=False)
+
+        logger.info(f"Converted {len(missing)} of {len(sections)} sections to LaTeX")
+        head, tail = wrapper
+        return head + "\n\n".join(fragments) + tail
+
+    def _split_output(
+        self, latex: str, missing: List[int]
+    ) -> Optional[Tuple[Tuple[str, str], List[str]]]:
+        """Cut a batched conversion at its markers.
+
+        Returns:
+            ((head, tail), LaTeX per missing section), or None if the markers
+            did not come through intact
+        """
+        markers = list(MARKER_PATTERN.finditer(latex))
+        expected = ["Start", *map(str, missing), "End"]
+        if [marker.group(1) for marker in markers] != expected:
+            return None
+
+        head = latex[: markers[0].start()]
+        tail = latex[markers[-1].end() :]
+        fragments = [
+            latex[marker.end() : following.start()].strip("\n")
+            for marker, following in zip(markers[1:-1], markers[2:])
+        ]
+        return (head, "\n" + tail.lstrip("\n")), fragments
+
+
+def _without_variables(args: Sequence[str]) -> List[str]:
+    """Drop ``-V name=value`` pairs from pandoc arguments."""
+    kept = []
+    skip = False
+    for arg in args:
+        if skip:
+            skip = False
+        elif arg == "-V":
+            skip = True
+        else:
+            kept.append(arg)
+    return kept
+
+
+def _hash(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8") + b"\0")
+    return digest.hexdigest()
@@ -0,0 +1,282 @@
+"""Content-addressed revision history for documents."""
+
+import difflib
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from app.core.config import settings
+from app.core.storage import atomic_write_bytes
+from app.models.document import Revision
+
+logger = logging.getLogger(__name__)
+
+# A delta op either copies base lines [start, end) or inserts literal text
+DeltaOp = Union[List[int], str]
+
+
+class _RevisionLog:
+    """A document's revisions in memory, indexed by version."""
+
+    def __init__(self, revisions: List[Revision]):
+        self.revisions: List[Revision] = []
+        self.by_version: Dict[str, Revision] = {}
+        for revision in revisions:
+            self.append(revision)
+
+    def append(self, revision: Revision) -> None:
+        self.revisions.append(revision)
+        # A version saved again later keeps pointing at its first revision
+        self.by_version.setdefault(revision.version, revision)
+
+
+class RevisionStore:
+    """Deduplicated, compressed store of document revisions.
+
+    Every distinct document text is stored once as an object named by its
+    SHA-256 (the same hash as ``Document.version``). Objects are zlib
+    compressed and, where smaller, stored as a line delta against the
+    document's previous revision, so storage grows with the size of each
+    change rather than the size of the document. Each document has an
+    append-only log of the versions it has been saved as.
+
+    Layout under ``root``::
+
+        objects/ab/cdef...   compressed object, named by content hash
+        logs/<doc id>.log    one JSON line per revision
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        compress_level: int = settings.REVISION_COMPRESS_LEVEL,
+        max_delta_chain: int = settings.REVISION_MAX_DELTA_CHAIN,
+        fsync: bool = settings.DOCUMENT_FSYNC,
+        log_cache_size: int = settings.REVISION_LOG_CACHE_SIZE,
+    ):
+        """Initialize the revision store.
+
+        Args:
+            root: Directory holding objects and logs
+            compress_level: zlib level for objects (0 stores uncompressed)
+            max_delta_chain: Deltas allowed before a full snapshot is stored,
+                bounding the work needed to rebuild any revision
+            fsync: Flush object writes to disk
+            log_cache_size: Documents whose parsed logs are kept in memory
+        """
+        self.root = root
+        self.objects_dir = root / "objects"
+        self.logs_dir = root / "logs"
+        self.compress_level = compress_level
+        self.max_delta_chain = max_delta_chain
+        self.fsync = fsync
+        self.log_cache_size = log_cache_size
+        self._lock = threading.Lock()  # Guards logs and the log cache
+        # doc ID -> parsed log; the store is the only log writer, so an entry
+        # stays valid once loaded and is appended to as revisions are recorded
+        self._logs: "OrderedDict[str, _RevisionLog]" = OrderedDict()
+        # Objects are immutable, so rebuilt texts can be cached freely
+        self._cached_text = functools.lru_cache(maxsize=settings.REVISION_CACHE_SIZE)(
+            self._load_text
+        )
+
+    def record(self, doc_id: str, text: str, timestamp: Optional[float] = None) -> Revision:
+        """Record a saved document text as a new revision.
+
+        Saving identical content again does not add a revision.
+
+        Args:
+            doc_id: Document ID
+            text: Full stored file text
+            timestamp: Save time (defaults to now)
+
+        Returns:
+            The document's latest revision
+        """
+        version = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        with self._lock:
+            log = self._log(doc_id)
+            previous = log.revisions[-1] if log.revisions else None
+            if previous is not None and previous.version == version:
+                return previous
+
+            if not self._object_path(version).exists():
+                self._write_object(version, text, previous.version if previous else None)
+
+            revision = Revision(
+                number=len(log.revisions) + 1,
+                version=version,
+                timestamp=timestamp if timestamp is not None else time.time(),
+                size=len(text.encode("utf-8")),
+            )
+            log_path = self._log_path(doc_id)
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(revision.model_dump()) + "\n")
+            log.append(revision)
+
+        return revision
+
+    def list_revisions(self, doc_id: str) -> List[Revision]:
+        """List a document's revisions, oldest first.
+
+        Args:
+            doc_id: Document ID
+
+        Returns:
+            List of revisions (empty if the document has no history)
+        """
+        with self._lock:
+            return list(self._log(doc_id).revisions)
+
+    def find_revision(self, doc_id: str, version: str) -> Optional[Revision]:
+        """Look up the revision a document was first saved as a version.
+
+        Args:
+            doc_id: Document ID
+            version: Content hash
+
+        Returns:
+            The revision, or None if the document was never saved as it
+        """
+        with self._lock:
+            return self._log(doc_id).by_version.get(version)
+
+    def get_text(self, version: str) -> str:
+        """Get the full text of a stored version.
+
+        Args:
+            version: Content hash
+
+        Returns:
+            Document text
+
+        Raises:
+            FileNotFoundError: If the version is not stored
+        """
+        return self._cached_text(version)
+
+    def diff(self, from_version: str, to_version: str, name: str = "") -> str:
+        """Produce a unified diff between two stored versions.
+
+        Args:
+            from_version: Content hash of the old version
+            to_version: Content hash of the new version
+            name: Label for the diff headers
+
+        Returns:
+            Unified diff text (empty if the versions are identical)
+        """
+        return "".join(
+            difflib.unified_diff(
+                self.get_text(from_version).splitlines(keepends=True),
+                self.get_text(to_version).splitlines(keepends=True),
+                fromfile=f"{name}@{from_version[:12]}",
+                tofile=f"{name}@{to_version[:12]}",
+            )
+        )
+
+    def _log(self, doc_id: str) -> _RevisionLog:
+        """Get a document's log, parsing it from disk on first use.
+
+        Must be called with ``_lock`` held.
+        """
+        log = self._logs.get(doc_id)
+        if log is not None:
+            self._logs.move_to_end(doc_id)
+            return log
+
+        revisions = []
+        log_path = self._log_path(doc_id)
+        if log_path.exists():
+            with open(log_path, "r", encoding="utf-8") as f:
+                revisions = [Revision(**json.loads(line)) for line in f if line.strip()]
+
+        log = self._logs[doc_id] = _RevisionLog(revisions)
+        while len(self._logs) > self.log_cache_size:
+            self._logs.popitem(last=False)
+        return log
+
+    def _object_path(self, version: str) -> Path:
+        return self.objects_dir / version[:2] / version[2:]
+
+    def _log_path(self, doc_id: str) -> Path:
+        return self.logs_dir / f"{doc_id}.log"
+
+    def _write_object(self, version: str, text: str, base: Optional[str]) -> None:
+        """Store a text as a delta against ``base`` if worthwhile, else in full.
+
+        Args:
+            version: Content hash of ``text``
+            text: Full text
+            base: Content hash of the previous revision, if any
+        """
+        obj: dict = {"type": "full", "text": text}
+
+        if base is not None:
+            try:
+                base_obj = self._read_object(base)
+                depth = base_obj.get("depth", 0) + 1 if base_obj["type"] == "delta" else 1
+                if depth <= self.max_delta_chain:
+                    ops = self._make_delta(self.get_text(base), text)
+                    delta = {"type": "delta", "base": base, "depth": depth, "ops": ops}
+                    # Only worth it if the delta is clearly smaller than the text
+                    if len(json.dumps(ops)) < len(text) // 2:
+                        obj = delta
+            except FileNotFoundError:
+                logger.warning(f"Revision base {base} missing; storing {version} in full")
+
+        path = self._object_path(version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(json.dumps(obj).encode("utf-8"), self.compress_level)
+        atomic_write_bytes(path, data, fsync=self.fsync)
+
+    def _read_object(self, version: str) -> dict:
+        """Read and decompress a stored object.
+
+        Raises:
+            FileNotFoundError: If the version is not stored
+        """
+        path = self._object_path(version)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Revision not found: {version}")
+        return json.loads(zlib.decompress(data))
+
+    def _load_text(self, version: str) -> str:
+        """Rebuild a version's text, applying deltas along its chain."""
+        obj = self._read_object(version)
+        if obj["type"] == "full":
+            return obj["text"]
+
+        base_lines = self.get_text(obj["base"]).splitlines(keepends=True)
+        parts = []
+        for op in obj["ops"]:
+            if isinstance(op, str):
+                parts.append(op)
+            else:
+                parts.extend(base_lines[op[0] : op[1]])
+        return "".join(parts)
+
+    def _make_delta(self, base: str, text: str) -> List[DeltaOp]:
+        """Compute line-based delta ops that turn ``base`` into ``text``."""
+        base_lines = base.splitlines(keepends=True)
+        new_lines = text.splitlines(keepends=True)
+        matcher = difflib.SequenceMatcher(None, base_lines, new_lines, autojunk=False)
+
+        ops: List[DeltaOp] = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                ops.append([i1, i2])
+            elif tag in ("replace", "insert"):
+                ops.append("".join(new_lines[j1:j2]))
+        return ops
@@ -0,0 +1,301 @@
+"""Streaming export of calculation variables as tables."""
+
+import csv
+import io
+import itertools
+import logging
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import pint
+
+from app.core.config import settings
+from app.models.calculation import CalculationResult
+from app.services.calculation_engine import CalculationEngine, calculation_engine
+from app.services.document_executor import DocumentExecutor, document_executor
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Optional: only needed for the columnar formats
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+TABLE_FORMATS = ("csv", "parquet", "arrow")
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+# Columns identifying where a row came from
+KEY_COLUMNS = ("document", "case")
+
+
+class TableSource(NamedTuple):
+    """A document whose calc variables become table rows."""
+
+    name: str  # Document ID or other label written to the "document" column
+    markdown: str
+
+
+class TableCase(NamedTuple):
+    """Inputs a document's calc blocks start from."""
+
+    name: str  # Written to the "case" column
+    inputs: Dict[str, Any]  # Values as returned by the calculation API
+
+
+class TableColumn(NamedTuple):
+    """A variable column; quantities are converted to the column's units."""
+
+    variable: str
+    units: Optional[pint.Unit] = None
+
+    @property
+    def header(self) -> str:
+        return f"{self.variable} [{self.units:~P}]" if self.units is not None else self.variable
+
+
+def columnar_available() -> bool:
+    """Check whether Parquet and Arrow IPC export are available (pyarrow)."""
+    return pyarrow is not None
+
+
+def _is_scalar(value: Any) -> bool:
+    if isinstance(value, str):
+        # Objects without a JSON form arrive as their repr, e.g. "<module 'numpy'>"
+        return not (value.startswith("<") and value.endswith(">"))
+    return isinstance(value, (int, float, bool, pint.Quantity))
+
+
+class TableExportService:
+    """Runs documents (optionally once per case) and streams their variables.
+
+    Each (document, case) yields one row; a variable holding a list (a sweep)
+    expands into one row per element, with scalar variables repeated. The
+    columns are the requested variables, or those of the first case; units
+    come from the first value seen and later quantities are converted to
+    them. Rows are produced and written in batches of ``batch_rows``, so the
+    size of the output doesn't bound memory.
+    """
+
+    def __init__(
+        self,
+        executor: DocumentExecutor = document_executor,
+        engine: CalculationEngine = calculation_engine,
+        batch_rows: int = settings.TABLE_EXPORT_BATCH_ROWS,
+    ):
+        """Initialize the table export service.
+
+        Args:
+            executor: Runs documents' calc blocks
+            engine: Calculation engine (for its unit registry)
+            batch_rows: Rows per written chunk or record batch
+        """
+        self.executor = executor
+        self.engine = engine
+        self.batch_rows = batch_rows
+
+    def iter_csv(
+        self,
+        sources: Sequence[TableSource],
+        cases: Sequence[TableCase] = (),
+        variables: Optional[Sequence[str]] = None,
+    ) -> Iterator[bytes]:
+        """Stream variables as UTF-8 CSV with a header row.
+
+        Args:
+            sources: Documents to run
+            cases: Inputs to run every document with (none runs each once)
+            variables: Variable columns (default: those of the first case)
+
+        Yields:
+            CSV chunks
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        columns, batches = self._batches(sources, cases, variables)
+
+        writer.writerow([*KEY_COLUMNS, *(column.header for column in columns)])
+        for batch in batches:
+            writer.writerows(batch)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    def iter_columnar(
+        self,
+        fmt: str,
+        sources: Sequence[TableSource],
+        cases: Sequence[TableCase] = (),
+        variables: Optional[Sequence[str]] = None,
+    ) -> Iterator[bytes]:
+        """Stream variables as Parquet or an Arrow IPC stream.
+
+        Args:
+            fmt: ``"parquet"`` or ``"arrow"``
+            sources: Documents to run
+            cases: Inputs to run every document with (none runs each once)
+            variables: Variable columns (default: those of the first case)
+
+        Yields:
+            Chunks of the file, one or more per record batch
+
+        Raises:
+            RuntimeError: If pyarrow is not installed
+            ValueError: If the format is not columnar
+        """
+        if pyarrow is None:
+            raise RuntimeError("Parquet and Arrow export require pyarrow to be installed")
+        if fmt not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported columnar format: {fmt}")
+
+        columns, batches = self._batches(sources, cases, variables)
+        names = [*KEY_COLUMNS, *(column.header for column in columns)]
+        sink = _ChunkSink()
+        writer = schema = None
+
+        try:
+            for batch in batches:
+                table = pyarrow.table(
+                    {name: list(values) for name, values in zip(names, zip(*batch))}
+                )
+                if writer is None:
+                    # The schema is inferred from the first batch
+                    schema = table.schema
+                    if fmt == "parquet":
+                        writer = pyarrow.parquet.ParquetWriter(sink, schema)
+                    else:
+                        writer = pyarrow.ipc.new_stream(sink, schema)
+                writer.write_table(table.cast(schema))
+                yield from sink.drain()
+        finally:
+            if writer is not None:
+                writer.close()
+        yield from sink.drain()
+
+    def _batches(
+        self,
+        sources: Sequence[TableSource],
+        cases: Sequence[TableCase],
+        variables: Optional[Sequence[str]],
+    ):
+        """Fix the columns, then lazily produce row batches.
+
+        Returns:
+            (columns, iterator of row lists)
+        """
+        runs = self._runs(sources, cases or [TableCase("", {})])
+        first = next(runs, None)
+        if first is None:
+            return [], iter(())
+
+        names = (
+            list(variables)
+            if variables
+            else [name for name, value in first[2].items() if self._column_value(value) is not None]
+        )
+        columns = [self._column(name, first[2].get(name)) for name in names]
+
+        def batches() -> Iterator[List[list]]:
+            batch: List[list] = []
+            for document, case, values in itertools.chain([first], runs):
+                for row in self._rows(columns, values):
+                    batch.append([document, case, *row])
+                    if len(batch) >= self.batch_rows:
+                        yield batch
+                        batch = []
+            if batch:
+                yield batch
+
+        return columns, batches()
+
+    def _runs(self, sources: Sequence[TableSource], cases: Sequence[TableCase]):
+        """Run every document for every case, yielding (document, case, variables)."""
+        for source in sources:
+            for case in cases:
+                context: Dict[str, Any] = {}
+                inputs = CalculationResult(success=True, result=case.inputs)
+                self.engine.update_context(context, inputs)
+                values = self.executor.execute_context(source.markdown, context)
+                yield source.name, case.name, values
+
+    def _column(self, name: str, value: Any) -> TableColumn:
+        value = self._column_value(value)
+        if isinstance(value, list):
+            value = next((item for item in value if item is not None), None)
+        units = value.units if isinstance(value, pint.Quantity) else None
+        return TableColumn(name, units)
+
+    def _column_value(self, value: Any) -> Any:
+        """A variable's table value: a scalar, a list of scalars, or None if unsupported."""
+        if isinstance(value, (list, tuple)):
+            items = [self._quantity(item) for item in value]
+            return items if items and all(_is_scalar(item) for item in items) else None
+        value = self._quantity(value)
+        return value if _is_scalar(value) else None
+
+    def _quantity(self, value: Any) -> Any:
+        """Rebuild a quantity serialized by the calculation engine."""
+        if isinstance(value, dict) and "magnitude" in value and "units" in value:
+            return value["magnitude"] * self.engine.ureg(value["units"])
+        return value
+
+    def _rows(self, columns: List[TableColumn], values: Dict[str, Any]) -> Iterator[list]:
+        """Rows for one run: list variables expand into one row per element."""
+        cells = [self._column_value(values.get(column.variable)) for column in columns]
+        length = max((len(cell) for cell in cells if isinstance(cell, list)), default=1)
+
+        for index in range(length):
+            row = []
+            for column, cell in zip(columns, cells):
+                if isinstance(cell, list):
+                    cell = cell[index] if index < len(cell) else None
+                row.append(self._cell(column, cell))
+            yield row
+
+    def _cell(self, column: TableColumn, value: Any) -> Any:
+        if isinstance(value, pint.Quantity):
+            if column.units is None:
+                return str(value)
+            try:
+                return float(value.to(column.units).magnitude)
+            except pint.DimensionalityError:
+                logger.warning(f"{column.variable}: {value:~P} is not in {column.units:~P}")
+                return None
+        if (
+            column.units is not None
+            and isinstance(value, (int, float))
+            and not isinstance(value, bool)
+        ):
+            return None  # A bare number in a column with units is ambiguous
+        return value
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting what pyarrow writes, for streaming it out."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        return iter(chunks)
+
+
+# Singleton instance
+table_export_service = TableExportService()
@@ -0,0 +1,240 @@
+"""Creating many documents from one template, one per row of variables."""
+
+import csv
+import io
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from jinja2.sandbox import SandboxedEnvironment
+
+from app.core.config import settings
+from app.core.executor import run_io
+from app.models.document import DocumentMetadata
+from app.models.template import TemplateBatchItem, TemplateBatchResult
+from app.services.document_executor import DocumentExecutor, document_executor, has_calc_blocks
+from app.services.document_service import DocumentService, document_service, format_document
+from app.services.template_service import TemplateService, template_service
+
+logger = logging.getLogger(__name__)
+
+
+def parse_csv_rows(text: str) -> List[Dict[str, str]]:
+    """Parse CSV text whose header row names the template variables.
+
+    Raises:
+        ValueError: If the CSV has no header row
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise ValueError("CSV must start with a header row of variable names")
+    # Short rows leave None for the missing cells
+    return [{key: value or "" for key, value in row.items() if key} for row in reader]
+
+
+def first_calc_error(executor: DocumentExecutor, markdown: str) -> Optional[str]:
+    """Describe the first failing calc block of a document, if any."""
+    for number, result in enumerate(executor.execute_results(markdown), 1):
+        if not result.success:
+            return f"Calc block {number} failed: {result.error}"
+    return None
+
+
+def _worker_calc_error(markdown: str) -> Optional[str]:
+    """:func:`first_calc_error` in a pool process, with that process's executor."""
+    return first_calc_error(document_executor, markdown)
+
+
+class TemplateBatchService:
+    """Instantiates a template once per row of variables.
+
+    The template is compiled once and rendered for every row; the documents
+    are then written with a single all-or-nothing
+    :meth:`DocumentService.import_documents` batch. Optionally every distinct
+    document's calc blocks are run first, spread over a process pool, and
+    documents whose blocks fail are reported rather than written. The pool
+    is started on first use and kept until :meth:`shutdown`, so batches
+    don't pay for spawning interpreters and importing the app every time.
+    """
+
+    def __init__(
+        self,
+        templates: TemplateService = template_service,
+        documents: DocumentService = document_service,
+        executor: DocumentExecutor = document_executor,
+        max_workers: int = settings.TEMPLATE_BATCH_WORKERS,
+        max_rows: int = settings.TEMPLATE_BATCH_MAX_ROWS,
+    ):
+        """Initialize the batch instantiation service.
+
+        Args:
+            templates: Template service providing compiled templates
+            documents: Document service the documents are written to
+            executor: Runs calc blocks when a pool isn't worth starting
+            max_workers: Processes to run calc blocks in
+            max_rows: Largest batch accepted
+        """
+        self.templates = templates
+        self.documents = documents
+        self.executor = executor
+        self.max_workers = max_workers
+        self.max_rows = max_rows
+        # Filename patterns come from the request, so they never see the
+        # shared template environment and can't reach Python internals
+        self._names = SandboxedEnvironment()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def instantiate(
+        self,
+        template_filename: str,
+        rows: Sequence[Dict[str, str]],
+        filename_pattern: Optional[str] = None,
+        folder: str = "",
+        metadata: Optional[DocumentMetadata] = None,
+        execute: bool = False,
+        overwrite: bool = False,
+    ) -> TemplateBatchResult:
+        """Create one document per row of variables.
+
+        Args:
+            template_filename: Name of the template file
+            rows: Variable sets, one per document
+            filename_pattern: Jinja2 pattern for the document names, given
+                the row's variables and its 1-based ``row`` number (default:
+                ``"<template>-{{ row }}"``)
+            folder: Project folder to create the documents in
+            metadata: Frontmatter written to every document
+            execute: Run the calc blocks and reject documents where one fails
+            overwrite: Replace existing documents instead of skipping them
+
+        Returns:
+            Per-row outcomes (a failed row doesn't stop the others)
+
+        Raises:
+            FileNotFoundError: If the template doesn't exist
+            ValueError: If there are no rows or too many
+            jinja2.TemplateSyntaxError: If the filename pattern is invalid
+        """
+        start = time.perf_counter()
+        if not rows:
+            raise ValueError("No rows to instantiate the template with")
+        if len(rows) > self.max_rows:
+            raise ValueError(f"At most {self.max_rows} documents can be created at once")
+
+        template = self.templates.compiled_template(template_filename)
+        pattern = filename_pattern or f"{Path(template_filename).stem}-{{{{ row }}}}"
+        name_template = self._names.from_string(pattern)
+        prefix = folder.replace("\\", "/").strip("/")
+
+        items: List[TemplateBatchItem] = []
+        contents: Dict[int, str] = {}
+        seen: Dict[str, int] = {}
+        for number, row in enumerate(rows, 1):
+            item = TemplateBatchItem(row=number)
+            items.append(item)
+            try:
+                name = name_template.render({**row, "row": number}).strip().replace("\\", "/")
+                if not name:
+                    raise ValueError("Filename pattern rendered an empty name")
+                if not name.endswith(".md"):
+                    name += ".md"
+                item.filename = self.documents.normalize_id(f"{prefix}/{name}" if prefix else name)
+                if item.filename in seen:
+                    raise ValueError(f"Same document name as row {seen[item.filename]}")
+                seen[item.filename] = number
+                contents[number] = template.render(**row)
+            except Exception as e:
+                item.status, item.error = "failed", str(e)
+
+        executed = workers = 0
+        if execute:
+            executed, workers = self._check_calcs(items, contents)
+
+        document_metadata = metadata or DocumentMetadata()
+        pending = [item for item in items if item.status != "failed"]
+        result = self.documents.import_documents(
+            (
+                (item.filename, format_document(document_metadata, contents[item.row]))
+                for item in pending
+            ),
+            overwrite=overwrite,
+        )
+        skipped = set(result.skipped)
+        for item in pending:
+            if item.filename in result.errors:
+                item.status, item.error = "failed", result.errors[item.filename]
+            elif item.filename in skipped:
+                item.status = "skipped"
+
+        summary = TemplateBatchResult(
+            items=items,
+            created=sum(1 for item in items if item.status == "created"),
+            skipped=sum(1 for item in items if item.status == "skipped"),
+            failed=sum(1 for item in items if item.status == "failed"),
+            executed=executed,
+            workers=workers,
+            total_seconds=time.perf_counter() - start,
+        )
+        logger.info(
+            f"Instantiated {template_filename} {summary.created}/{len(rows)} times "
+            f"({summary.skipped} skipped, {summary.failed} failed) in {summary.total_seconds:.2f}s"
+        )
+        return summary
+
+    def _check_calcs(self, items: List[TemplateBatchItem], contents: Dict[int, str]):
+        """Run each distinct document's calc blocks, failing rows whose blocks error.
+
+        Returns:
+            (documents executed, worker processes used)
+        """
+        # Rows differing only in prose render to the same calcs far more
+        # often than not, so each distinct document runs once
+        distinct = sorted({markdown for markdown in contents.values() if has_calc_blocks(markdown)})
+        workers = min(self.max_workers, len(distinct))
+
+        if workers > 1:
+            errors = dict(zip(distinct, self._get_pool().map(_worker_calc_error, distinct)))
+        else:
+            workers = 0
+            errors = {markdown: first_calc_error(self.executor, markdown) for markdown in distinct}
+
+        for item in items:
+            error = errors.get(contents.get(item.row, ""))
+            if error:
+                item.status, item.error = "failed", error
+        return len(distinct), workers
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Get the calc-checking process pool, starting it on first use."""
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: forking a server process that runs threads isn't safe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.debug(f"Started template batch pool with {self.max_workers} processes")
+            return self._pool
+
+    def shutdown(self) -> None:
+        """Shut down the process pool, waiting for running checks."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    # Async variants - run the blocking file I/O on the shared I/O thread pool
+
+    async def instantiate_async(
+        self, template_filename: str, rows: Sequence[Dict[str, str]], **options
+    ) -> TemplateBatchResult:
+        """Async variant of :meth:`instantiate`."""
+        return await run_io(self.instantiate, template_filename, rows, **options)
+
+
+# Singleton instance
+template_batch_service = TemplateBatchService()
@@ -1,50 +1,136 @@
 """Template management service."""
 
+import hashlib
 import logging
+import os
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
 
 import frontmatter
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    TemplateNotFound,
+    TemplateSyntaxError,
+    meta,
+)
 from jinja2 import Template as Jinja2Template
 
 from app.core.config import settings
+from app.core.executor import run_io
 from app.models.template import Template, TemplateMetadata
+from app.services.calculation_engine import CalculationEngine, calculation_engine
+from app.services.document_executor import CALC_BLOCK_PATTERN
 
 logger = logging.getLogger(__name__)
 
 
+class _TemplateLoader(FileSystemLoader):
+    """Loads a template's body, without its YAML frontmatter, for Jinja2."""
+
+    def get_source(
+        self, environment: Environment, template: str
+    ) -> Tuple[str, Optional[str], Optional[Callable[[], bool]]]:
+        source, path, uptodate = super().get_source(environment, template)
+        return frontmatter.loads(source).content, path, uptodate
+
+
 class TemplateService:
     """Service for managing calculation templates."""
 
-    def __init__(self, templates_dir: Path = settings.TEMPLATES_DIR):
+    def __init__(
+        self,
+        templates_dir: Path = settings.TEMPLATES_DIR,
+        engine: CalculationEngine = calculation_engine,
+    ):
         """Initialize template service.
 
         Args:
             templates_dir: Directory containing templates
+            engine: Calculation engine whose compiled-code cache is seeded
+                with the templates' calc blocks
         """
         self.templates_dir = templates_dir
+        self.engine = engine
         self.templates_dir.mkdir(parents=True, exist_ok=True)
 
+        # Parsed templates by filename, with the (mtime_ns, size) they were read at
+        self._catalog: Dict[str, Tuple[Tuple[int, int], Template]] = {}
+        self._listing: Tuple[tuple, List[Template]] = ((), [])
+        # Variables used by each template version (content hash)
+        self._variables: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._catalog_lock = threading.Lock()
+
+        # Compiled templates are kept in memory (revalidated against the
+        # file's mtime on each lookup) and their bytecode on disk, so only
+        # a changed template is parsed and compiled again
+        self.environment = Environment(
+            loader=_TemplateLoader(self.templates_dir, encoding="utf-8"),
+            bytecode_cache=self._bytecode_cache(),
+            cache_size=settings.TEMPLATE_CACHE_SIZE,
+            auto_reload=True,
+        )
+
+    def _bytecode_cache(self) -> Optional[FileSystemBytecodeCache]:
+        if not settings.TEMPLATE_BYTECODE_CACHE:
+            return None
+        cache_dir = self.templates_dir / ".cache"
+        try:
+            cache_dir.mkdir(exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Template bytecode cache disabled: {e}")
+            return None
+        return FileSystemBytecodeCache(str(cache_dir))
+
     def list_templates(self) -> List[Template]:
         """List all available templates.
 
+        Served from the catalog: only templates added or changed since the
+        last call (by mtime and size) are read and parsed again.
+
         Returns:
             List of Template objects
         """
         templates = []
+        stamps = []
 
-        for file_path in self.templates_dir.glob("*.md"):
+        with os.scandir(self.templates_dir) as entries:
+            files = [entry for entry in entries if entry.name.endswith(".md") and entry.is_file()]
+
+        for entry in files:
             try:
-                template = self.load_template(file_path.name)
-                templates.append(template)
+                stat = entry.stat()
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                templates.append(self._catalog_template(entry.name, stamp))
+                stamps.append((entry.name, stamp))
             except Exception as e:
-                logger.error(f"Error loading template {file_path}: {e}")
-
-        return sorted(templates, key=lambda x: x.metadata.name)
+                logger.error(f"Error loading template {entry.path}: {e}")
+
+        stamps.sort()
+        with self._catalog_lock:
+            # Forget deleted templates
+            listed = {name for name, _ in stamps}
+            for filename in [name for name in self._catalog if name not in listed]:
+                del self._catalog[filename]
+
+            if self._listing[0] != tuple(stamps):
+                self._listing = (tuple(stamps), sorted(templates, key=lambda x: x.metadata.name))
+            return list(self._listing[1])
+
+    @staticmethod
+    def catalog_version(templates: List[Template]) -> str:
+        """Content hash of a template listing, for use as its entity tag."""
+        digest = hashlib.sha256()
+        for template in templates:
+            digest.update(f"{template.filename}\0{template.version}\0".encode("utf-8"))
+        return digest.hexdigest()
 
     def load_template(self, filename: str) -> Template:
-        """Load a template from disk.
+        """Load a template, from the catalog if the file is unchanged.
 
         Args:
             filename: Name of the template file
@@ -52,6 +138,32 @@ class TemplateService:
         Returns:
             Template object
 
+        Raises:
+            FileNotFoundError: If template doesn't exist
+        """
+        try:
+            stat = (self.templates_dir / filename).stat()
+        except (FileNotFoundError, NotADirectoryError):
+            raise FileNotFoundError(f"Template not found: {filename}")
+
+        return self._catalog_template(filename, (stat.st_mtime_ns, stat.st_size))
+
+    def _catalog_template(self, filename: str, stamp: Tuple[int, int]) -> Template:
+        """Return the cached template if it was read at ``stamp``, else read it."""
+        with self._catalog_lock:
+            cached = self._catalog.get(filename)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        # Stamped before reading, so a concurrent edit only causes another read
+        template = self._read_template(filename)
+        with self._catalog_lock:
+            self._catalog[filename] = (stamp, template)
+        return template
+
+    def _read_template(self, filename: str) -> Template:
+        """Read and parse a template file.
+
         Raises:
             FileNotFoundError: If template doesn't exist
         """
@@ -62,22 +174,85 @@ class TemplateService:
 
         # Parse frontmatter and content
         with open(file_path, "r", encoding="utf-8") as f:
-            post = frontmatter.load(f)
+            modified = os.fstat(f.fileno()).st_mtime
+            text = f.read()
+        post = frontmatter.loads(text)
 
         # Extract metadata
         metadata_dict = post.metadata if post.metadata else {}
 
-        # Extract variables from template content
-        variables = self._extract_variables(post.content)
+        version = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        # Declared variables keep their order (the form's field order);
+        # any others the content uses follow them
+        declared = list(metadata_dict.get("variables") or [])
+        discovered = self._template_variables(post.content, version)
+        variables = declared + [name for name in discovered if name not in declared]
 
         metadata = TemplateMetadata(
             name=metadata_dict.get("name", filename.replace(".md", "")),
             description=metadata_dict.get("description"),
             category=metadata_dict.get("category"),
-            variables=metadata_dict.get("variables", variables),
+            variables=variables,
         )
 
-        return Template(filename=filename, metadata=metadata, content=post.content)
+        calc_blocks, calc_errors = self._check_calc_blocks(post.content)
+        if calc_errors:
+            logger.warning(f"Template {filename} has calc block problems: {'; '.join(calc_errors)}")
+
+        return Template(
+            filename=filename,
+            metadata=metadata,
+            content=post.content,
+            version=version,
+            modified=modified,
+            calc_blocks=calc_blocks,
+            calc_errors=calc_errors,
+        )
+
+    def _check_calc_blocks(self, content: str) -> Tuple[int, List[str]]:
+        """Compile and statically check a template's ``%%calc`` blocks.
+
+        Blocks without template markup reach documents unchanged, so their
+        compiled code is put in the engine's cache and documents made from
+        the template run without compiling them. Blocks using template
+        variables are checked with every variable rendered as ``1``; if one
+        can't be rendered that way, later blocks skip the undefined-name
+        check, as the names it defines are unknown.
+
+        Args:
+            content: Template content
+
+        Returns:
+            (number of calc blocks, problems found, each naming its block)
+        """
+        errors: List[str] = []
+        known: Optional[set] = set()
+        blocks = list(CALC_BLOCK_PATTERN.finditer(content))
+
+        for number, match in enumerate(blocks, 1):
+            code = match.group("code")
+            templated = "{{" in code or "{%" in code
+            if templated:
+                try:
+                    source = self.environment.from_string(code)
+                    placeholders = meta.find_undeclared_variables(self.environment.parse(code))
+                    code = source.render({name: 1 for name in placeholders})
+                except TemplateSyntaxError as e:
+                    errors.append(f"Calc block {number}: template syntax error: {e.message}")
+                    known = None
+                    continue
+                except Exception:
+                    known = None
+                    continue
+
+            names = known if known is not None else set()
+            problems = self.engine.check_block(code, names, seed=not templated)
+            if known is None:
+                problems = [problem for problem in problems if not problem.startswith("NameError")]
+            errors.extend(f"Calc block {number}: {problem}" for problem in problems)
+
+        return len(blocks), errors
 
     def render_template(self, filename: str, variables: Dict[str, str]) -> str:
         """Render a template with provided variables.
@@ -88,17 +263,58 @@ class TemplateService:
 
         Returns:
             Rendered template content
+
+        Raises:
+            FileNotFoundError: If template doesn't exist
+        """
+        return self.compiled_template(filename).render(**variables)
+
+    def compiled_template(self, filename: str) -> Jinja2Template:
+        """Get the compiled Jinja2 template for a template file.
+
+        Args:
+            filename: Name of the template file
+
+        Returns:
+            Compiled template (cached until the file changes)
+
+        Raises:
+            FileNotFoundError: If template doesn't exist
         """
-        template = self.load_template(filename)
+        try:
+            return self.environment.get_template(filename)
+        except TemplateNotFound:
+            raise FileNotFoundError(f"Template not found: {filename}")
 
-        # Use Jinja2 for rendering
-        jinja_template = Jinja2Template(template.content)
-        rendered_content = jinja_template.render(**variables)
+    def _template_variables(self, content: str, version: str) -> List[str]:
+        """Variables a template's content uses, cached by template version.
 
-        return rendered_content
+        Args:
+            content: Template content
+            version: Content hash of the template file
+
+        Returns:
+            Sorted unique variable names
+        """
+        with self._catalog_lock:
+            variables = self._variables.get(version)
+            if variables is not None:
+                self._variables.move_to_end(version)
+                return variables
+
+        variables = self._extract_variables(content)
+        with self._catalog_lock:
+            self._variables[version] = variables
+            while len(self._variables) > settings.TEMPLATE_CACHE_SIZE:
+                self._variables.popitem(last=False)
+        return variables
 
     def _extract_variables(self, content: str) -> List[str]:
-        """Extract variable placeholders from template content.
+        """Extract the variables template content reads from its context.
+
+        Uses Jinja2's parsed AST, so expressions with filters, whitespace or
+        attribute access count, while names the template assigns itself
+        (loop variables, ``{% set %}``) and built-in globals don't.
 
         Args:
             content: Template content
@@ -106,12 +322,29 @@ class TemplateService:
         Returns:
             List of unique variable names
         """
-        # Find all {{variable_name}} patterns
-        pattern = settings.TEMPLATE_VARIABLES_PATTERN
-        matches = re.findall(pattern, content)
+        try:
+            names = meta.find_undeclared_variables(self.environment.parse(content))
+        except TemplateSyntaxError as e:
+            logger.warning(f"Template syntax error, scanning for placeholders instead: {e}")
+            # Find all {{variable_name}} patterns
+            names = set(re.findall(settings.TEMPLATE_VARIABLES_PATTERN, content))
 
         # Return unique variable names
-        return sorted(set(matches))
+        return sorted(name for name in names if name not in self.environment.globals)
+
+    # Async variants - run the blocking file I/O on the shared I/O thread pool
+
+    async def list_templates_async(self) -> List[Template]:
+        """Async variant of :meth:`list_templates`."""
+        return await run_io(self.list_templates)
+
+    async def load_template_async(self, filename: str) -> Template:
+        """Async variant of :meth:`load_template`."""
+        return await run_io(self.load_template, filename)
+
+    async def render_template_async(self, filename: str, variables: Dict[str, str]) -> str:
+        """Async variant of :meth:`render_template`."""
+        return await run_io(self.render_template, filename, variables)
 
 
 # Singleton instance
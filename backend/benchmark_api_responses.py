@@ -0,0 +1,119 @@
+"""Benchmark API response size and JSON encode time on realistic payloads.
+
+Compares the standard library encoder (Starlette's default) with the app's
+encoder (orjson when installed), and the payload size uncompressed, gzipped
+and brotli-compressed (when brotli is installed).
+
+Usage:
+    python benchmark_api_responses.py [runs]
+"""
+
+import gzip
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.responses import dumps, orjson
+from app.models.calculation import CalculationBlock, CalculationResponse
+from app.models.document import DocumentMetadata
+from app.services.calculation_engine import calculation_engine
+from app.services.document_executor import CALC_BLOCK_PATTERN
+from app.services.document_service import DocumentService
+from app.services.template_service import template_service
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Documents in the listing payload
+LISTED_DOCUMENTS = 500
+
+
+def calculation_payload() -> dict:
+    """Execute the calc blocks of the bundled templates, as the editor would.
+
+    Each template runs in its own context; the results are combined into one
+    response.
+    """
+    sample = {name: "1" for name in ("project_name", "engineer_name", "date")}
+    results, final_context = [], {}
+    for template in template_service.list_templates():
+        rendered = template_service.render_template(template.filename, sample)
+        context = {}
+        for match in CALC_BLOCK_PATTERN.finditer(rendered):
+            block = CalculationBlock(code=match.group("code"))
+            result = calculation_engine.execute_block(block, context)
+            calculation_engine.update_context(context, result)
+            results.append(result)
+        final_context.update(
+            {k: calculation_engine._serialize_value(v) for k, v in context.items()}
+        )
+
+    response = CalculationResponse(results=results, final_context=final_context)
+    return jsonable_encoder(response)
+
+
+def listing_payload(documents_dir: Path) -> dict:
+    """List a project of saved documents."""
+    service = DocumentService(documents_dir=documents_dir, fsync=False)
+    for n in range(LISTED_DOCUMENTS):
+        metadata = DocumentMetadata(
+            project="Depot extension", engineer="A. Engineer", revision="B", title=f"Beam B{n}"
+        )
+        service.save_document(f"beams/b{n}.md", metadata, f"# Beam B{n}\n")
+    documents = service.list_documents(recursive=True)
+    return jsonable_encoder({"documents": documents, "count": len(documents)})
+
+
+def stdlib_dumps(content) -> bytes:
+    """What Starlette's JSONResponse does."""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def time_encode(encode, payload, runs: int) -> float:
+    """Median seconds to encode the payload."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        encode(payload)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def report(label: str, payload, runs: int) -> None:
+    body = dumps(payload)
+    stdlib = time_encode(stdlib_dumps, payload, runs)
+    fast = time_encode(dumps, payload, runs)
+
+    print(f"{label}:")
+    print(f"  encode  json {stdlib * 1000:.3f}ms  app {fast * 1000:.3f}ms  ({stdlib / fast:.1f}x)")
+    sizes = [f"raw {len(body):,}B", f"gzip {len(gzip.compress(body, settings.GZIP_LEVEL)):,}B"]
+    if brotli is not None:
+        sizes.append(f"br {len(brotli.compress(body, quality=settings.BROTLI_QUALITY)):,}B")
+    print(f"  size    {'  '.join(sizes)}")
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    logging.disable(logging.ERROR)  # Calc errors in the samples are part of the payload
+
+    print(f"JSON encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print(f"Brotli: {'available' if brotli is not None else 'not installed'}\n")
+
+    report("Calculation response (bundled templates)", calculation_payload(), runs)
+    with tempfile.TemporaryDirectory() as documents_dir:
+        listing = listing_payload(Path(documents_dir))
+        report(f"Document listing ({LISTED_DOCUMENTS} documents)", listing, runs)
@@ -0,0 +1,90 @@
+"""Benchmark PDF export time with and without precompiled LaTeX formats.
+
+Usage:
+    python benchmark_pdf_export.py [runs]
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.config import settings
+from app.services.export_service import ExportService
+
+SAMPLE = """
+# Beam Design Check {run}
+
+## Inputs
+
+- Span $L = 6$ m
+- Uniform load $w = 10 + {run}$ kN/m
+
+## Bending
+
+$$M_{{max}} = \\frac{{wL^2}}{{8}}$$
+
+| Quantity | Value | Unit |
+|----------|-------|------|
+| $M_{{max}}$ | 45.0 | kN·m |
+| $V_{{max}}$ | 30.0 | kN |
+"""
+
+
+def time_exports(precompile: bool, runs: int) -> list:
+    """Export ``runs`` distinct documents, returning per-export seconds.
+
+    A warm-up export (which builds the format when precompiling) is not timed.
+    """
+    settings.LATEX_PRECOMPILE = precompile
+    with tempfile.TemporaryDirectory() as exports_dir:
+        service = ExportService(exports_dir=Path(exports_dir))
+        service.cache.max_bytes = 0  # Measure rendering, not the export cache
+
+        start = time.perf_counter()
+        service.export_to_pdf(SAMPLE.format(run="warm-up"), "warm_up")
+        print(f"  warm-up: {time.perf_counter() - start:.2f}s")
+
+        timings = []
+        for run in range(runs):
+            start = time.perf_counter()
+            service.export_to_pdf(SAMPLE.format(run=run), f"bench_{run}")
+            timings.append(time.perf_counter() - start)
+        return timings
+
+
+def report(label: str, timings: list) -> None:
+    print(
+        f"{label:<14} mean {statistics.mean(timings):.3f}s  "
+        f"median {statistics.median(timings):.3f}s  "
+        f"min {min(timings):.3f}s  max {max(timings):.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    with tempfile.TemporaryDirectory() as probe_dir:
+        probe = ExportService(exports_dir=Path(probe_dir))
+        if not probe.pandoc_available:
+            print("✗ Error: Pandoc is not available!")
+            sys.exit(1)
+        if not probe.latex_formats.available(settings.PDF_ENGINE):
+            print(f"✗ Precompiled formats are not supported for {settings.PDF_ENGINE}")
+            print("  (requires pdflatex and the mylatexformat package)")
+            sys.exit(1)
+
+    print(f"Exporting {runs} documents with {settings.PDF_ENGINE}...")
+    print("Without precompiled format:")
+    before = time_exports(False, runs)
+    print("With precompiled format:")
+    after = time_exports(True, runs)
+
+    print()
+    report("pandoc only", before)
+    report("precompiled", after)
+    print(f"\n✓ Speed-up: {statistics.mean(before) / statistics.mean(after):.2f}x per export")
@@ -0,0 +1,74 @@
+"""Export many documents to PDF concurrently from the command line.
+
+Usage:
+    python export_batch.py beam.md column.md --package calc_package --title "Calc Package"
+    python export_batch.py --folder project-a --package project_a
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.executor import shutdown_io_executor
+from app.services.batch_export import BatchExportService
+from app.services.document_service import document_service
+from app.services.export_service import export_service
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export documents to PDF in parallel")
+    parser.add_argument("documents", nargs="*", help="Document IDs, in package order")
+    parser.add_argument("--folder", help="Export every document in a folder (recursively)")
+    parser.add_argument("--package", help="Also concatenate into one PDF with this name")
+    parser.add_argument("--title", help="Package title")
+    parser.add_argument("--workers", type=int, help="Concurrent renders (default: CPU cores)")
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> int:
+    filenames = list(args.documents)
+    if args.folder is not None:
+        listed = document_service.list_documents(args.folder, recursive=True)
+        filenames.extend(sorted(d["filename"] for d in listed))
+    if not filenames:
+        print("✗ No documents to export")
+        return 1
+
+    service = BatchExportService()
+    if args.workers:
+        service.max_workers = args.workers
+
+    result = await service.export_documents(filenames, args.package, args.title)
+
+    for item in result.items:
+        if item.error:
+            print(f"✗ {item.filename:<40} {item.seconds:7.2f}s  {item.error}")
+        else:
+            print(f"✓ {item.filename:<40} {item.seconds:7.2f}s  {item.output_filename}")
+
+    if result.package_filename:
+        print(f"\n✓ Package: {result.package_filename} ({result.package_seconds:.2f}s)")
+    elif result.package_error:
+        print(f"\n✗ Package failed: {result.package_error}")
+
+    print(
+        f"\n{result.succeeded} exported, {result.failed} failed in "
+        f"{result.total_seconds:.2f}s with {result.workers} workers"
+    )
+    print(f"✓ Location: {export_service.exports_dir}")
+    return 1 if result.failed or result.package_error else 0
+
+
+if __name__ == "__main__":
+    if not export_service.pandoc_available:
+        print("✗ Error: Pandoc is not available!")
+        sys.exit(1)
+
+    try:
+        sys.exit(asyncio.run(main(parse_args())))
+    finally:
+        shutdown_io_executor()
@@ -1,16 +1,19 @@
 """Script to generate all test PDF outputs for review."""
 
+import asyncio
 import sys
 from pathlib import Path
 
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from app.services.batch_export import BatchSource, batch_export_service
 from app.services.export_service import export_service
 
 
 def generate_test_pdfs():
-    """Generate all PDF test outputs."""
+    """Generate all PDF test outputs, rendering them concurrently."""
+    sources = []
 
     # 1. Simple PDF export
     simple_content = """
@@ -28,8 +31,7 @@ Some content with **bold** and *italic* text.
 - List item 2
 - List item 3
 """
-    output = export_service.export_to_pdf(simple_content, "test_simple")
-    print(f"✓ Generated: {output} ({output.stat().st_size} bytes)")
+    sources.append(BatchSource("test_simple", simple_content, "test_simple"))
 
     # 2. PDF with math
     math_content = """
@@ -54,8 +56,7 @@ Given:
 Calculate:
 $$M_{max} = \\frac{10 \\times 6^2}{8} = 45 \\text{ kN·m}$$
 """
-    output = export_service.export_to_pdf(math_content, "test_math")
-    print(f"✓ Generated: {output} ({output.stat().st_size} bytes)")
+    sources.append(BatchSource("test_math", math_content, "test_math"))
 
     # 3. PDF with metadata
     metadata_content = """
@@ -68,8 +69,7 @@ This is a calculation document with metadata.
         "author": "Test Engineer",
         "date": "2024-11-12",
     }
-    output = export_service.export_to_pdf(metadata_content, "test_metadata", metadata=metadata)
-    print(f"✓ Generated: {output} ({output.stat().st_size} bytes)")
+    sources.append(BatchSource("test_metadata", metadata_content, "test_metadata", metadata))
 
     # 4. PDF with code blocks
     code_content = """
@@ -91,8 +91,7 @@ print(f"Maximum moment: {M_max:.2f} kN·m")
 
 The calculation shows that the maximum moment is 67.50 kN·m.
 """
-    output = export_service.export_to_pdf(code_content, "test_code")
-    print(f"✓ Generated: {output} ({output.stat().st_size} bytes)")
+    sources.append(BatchSource("test_code", code_content, "test_code"))
 
     # 5. Complex engineering document
     complex_content = """
@@ -158,8 +157,18 @@ print(f"Max moment: {M_max:.2f}")
 
 All values are within acceptable limits.
 """
-    output = export_service.export_to_pdf(complex_content, "test_complex")
-    print(f"✓ Generated: {output} ({output.stat().st_size} bytes)")
+    sources.append(BatchSource("test_complex", complex_content, "test_complex"))
+
+    items = asyncio.run(batch_export_service.render_many(sources))
+    for item in items:
+        if item.error:
+            print(f"✗ Failed: {item.filename} ({item.error})")
+            continue
+        output = export_service.exports_dir / item.output_filename
+        print(f"✓ Generated: {output} ({output.stat().st_size} bytes, {item.seconds:.2f}s)")
+
+    if any(item.error for item in items):
+        sys.exit(1)
 
     print(f"\n✓ All PDFs generated successfully!")
     print(f"✓ Location: {export_service.exports_dir}")
@@ -11,8 +11,17 @@ from fastapi import FastAPI
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
-from app.api import calculation, document, export, template
+from app.api import admission, calculation, document, export, template
+from app.core.admission import AdmissionRejectedError, admission_rejected_handler
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.executor import shutdown_io_executor
+from app.core.responses import FastJSONResponse
+from app.services.document_service import document_service
+from app.services.export_jobs import export_job_manager
+from app.services.export_service import export_service
+from app.services.template_batch import template_batch_service
+from app.services.template_service import template_service
 
 # Configure logging
 logging.basicConfig(
@@ -70,6 +79,16 @@ async def lifespan(app: FastAPI):
     settings.EXPORTS_DIR.mkdir(parents=True, exist_ok=True)
     settings.IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 
+    # Clean up after renders interrupted by the last shutdown, then trim old exports
+    export_service.retention.sweep_orphans()
+    export_service.retention.enforce()
+
+    # Check the pandoc and LaTeX versions now rather than during an export
+    export_service.warm_up()
+
+    # Build the template catalog so the first listing doesn't parse every file
+    logger.info(f"Templates available: {len(template_service.list_templates())}")
+
     # Create a sample document if none exist
     sample_doc = settings.DOCUMENTS_DIR / "example.md"
     if not sample_doc.exists():
@@ -122,6 +141,10 @@ Edit this document or create a new one to get started!
     yield
 
     logger.info("Shutting down EngiCalc...")
+    await export_job_manager.shutdown()
+    template_batch_service.shutdown()
+    document_service.flush()
+    shutdown_io_executor()
 
 
 # Create FastAPI app
@@ -130,13 +153,21 @@ app = FastAPI(
     description="Engineering calculation tool",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
+# Refuse excess compute-heavy requests with 429 + Retry-After
+app.add_exception_handler(AdmissionRejectedError, admission_rejected_handler)
+
+# Compress responses (gzip, or brotli when installed) for clients that accept it
+app.add_middleware(CompressionMiddleware)
+
 # Include API routers
 app.include_router(calculation.router, prefix="/api/calculation", tags=["calculation"])
 app.include_router(document.router, prefix="/api/document", tags=["document"])
 app.include_router(export.router, prefix="/api/export", tags=["export"])
 app.include_router(template.router, prefix="/api/template", tags=["template"])
+app.include_router(admission.router, prefix="/api/admission", tags=["admission"])
 
 
 @app.get("/health")
@@ -172,8 +203,14 @@ else:
 
 
 if __name__ == "__main__":
+    import multiprocessing
+
     import uvicorn
 
+    # In the frozen build, spawned worker processes (batch calc checks) start
+    # this executable; hand them to multiprocessing instead of the server
+    multiprocessing.freeze_support()
+
     # Disable CORS in standalone mode since everything is served from same origin
     settings.CORS_ORIGINS = ["*"]
     settings.DEBUG = False
@@ -0,0 +1,171 @@
+"""Shared test fixtures."""
+
+import os
+import stat
+import sys
+import textwrap
+
+import pytest
+from app.core.config import settings
+
+FAKE_PANDOC = textwrap.dedent(
+    """\
+    #!{python}
+    # Minimal pandoc stand-in: "renders" its Markdown input into a fake PDF
+    import sys
+    import time
+
+    args = sys.argv[1:]
+    if "--version" in args:
+        print("pandoc 0.0-fake")
+        sys.exit(0)
+
+    with open({log!r}, "a") as log:
+        log.write(" ".join(args) + "\\n")
+
+    output = args[args.index("-o") + 1] if "-o" in args else "-"
+    inputs = [a for a in args if a.endswith(".md")]
+    if inputs:
+        source = open(inputs[0], encoding="utf-8").read()
+    else:
+        source = sys.stdin.read()
+    with open({inputs!r}, "a", encoding="utf-8") as log:
+        log.write(source + "\\0")
+
+    if "SLOW" in source:
+        time.sleep(30)
+
+    if "FAIL" in source:
+        sys.stderr.write("Error producing PDF.\\n")
+        sys.exit(43)
+
+    if "-t" in args and args[args.index("-t") + 1] == "latex":
+        # Standalone LaTeX, with the document-specific title after the packages
+        bs = chr(92)
+        title = next((a[6:] for a in args if a.startswith("title=")), "")
+        fontsize = next((a[9:] for a in args if a.startswith("fontsize=")), "")
+        data = "".join([
+            bs + "documentclass[" + fontsize + "]{{article}}\\n",
+            bs + "usepackage{{amsmath}}\\n",
+            bs + "title{{" + title + "}}\\n",
+            bs + "begin{{document}}\\n",
+            source + "\\n",
+            bs + "end{{document}}\\n",
+        ]).encode("utf-8")
+    elif "-t" in args and args[args.index("-t") + 1] == "html":
+        # One paragraph of "MathML" per $...$ or $$...$$ paragraph
+        paragraphs = []
+        for paragraph in source.split("\\n\\n"):
+            if paragraph.startswith("$$"):
+                paragraphs.append('<p><math display="block">' + paragraph[2:-2] + "</math></p>")
+            else:
+                paragraphs.append("<p><math>" + paragraph[1:-1] + "</math></p>")
+        data = "\\n".join(paragraphs).encode("utf-8")
+    else:
+        data = b"%PDF-1.4 fake\\n" + source.encode("utf-8")
+    if output == "-":
+        sys.stdout.buffer.write(data)
+    else:
+        with open(output, "wb") as f:
+            f.write(data)
+    """
+)
+
+FAKE_PDFLATEX = textwrap.dedent(
+    """\
+    #!{python}
+    # Minimal pdflatex stand-in supporting mylatexformat-style format dumps
+    import os
+    import sys
+
+    args = sys.argv[1:]
+    if "--version" in args:
+        print("pdfTeX 0.0-fake")
+        sys.exit(0)
+
+    with open({log!r}, "a") as log:
+        log.write(" ".join(args) + "\\n")
+
+    if "-ini" in args:
+        jobname = next(a[9:] for a in args if a.startswith("-jobname="))
+        preamble = open("preamble.tex", encoding="utf-8").read()
+        with open(jobname + ".fmt", "w", encoding="utf-8") as f:
+            f.write(preamble.split("%endofdump")[0])
+        sys.exit(0)
+
+    fmt = next(a[5:] for a in args if a.startswith("-fmt="))
+    dirs = [d for d in os.environ.get("TEXFORMATS", "").split(os.pathsep) if d]
+    if not any(os.path.exists(os.path.join(d, fmt + ".fmt")) for d in dirs):
+        sys.exit(1)
+
+    source = open(args[-1], encoding="utf-8").read()
+    if "BADTEX" in source:
+        sys.exit(1)
+    stem = os.path.splitext(args[-1])[0]
+    with open(stem + ".pdf", "wb") as f:
+        f.write(b"%PDF-1.4 latex\\n" + source.split("%endofdump")[1].encode("utf-8"))
+    with open(stem + ".log", "w") as f:
+        f.write("Output written\\n")
+    """
+)
+
+
+class FakePandoc:
+    """Handle on the fake pandoc binary installed by the ``fake_pandoc`` fixture."""
+
+    def __init__(self, path, log_path, inputs_path):
+        self.path = path
+        self.log_path = log_path
+        self.inputs_path = inputs_path
+
+    @property
+    def calls(self):
+        """Argument lines of every render (excluding --version probes)."""
+        if not self.log_path.exists():
+            return []
+        return self.log_path.read_text().splitlines()
+
+    @property
+    def inputs(self):
+        """Markdown each render read, in the same order as :attr:`calls`."""
+        if not self.inputs_path.exists():
+            return []
+        return self.inputs_path.read_text(encoding="utf-8").split("\0")[:-1]
+
+
+@pytest.fixture
+def fake_pandoc(tmp_path, monkeypatch):
+    """Point PANDOC_PATH at a scripted stand-in so export logic runs without LaTeX."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log_path = tmp_path / "pandoc-calls.log"
+    inputs_path = tmp_path / "pandoc-inputs.log"
+    script = bin_dir / "pandoc"
+    script.write_text(
+        FAKE_PANDOC.format(python=sys.executable, log=str(log_path), inputs=str(inputs_path))
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+    monkeypatch.setattr(settings, "PANDOC_PATH", str(script))
+    return FakePandoc(script, log_path, inputs_path)
+
+
+@pytest.fixture
+def fake_latex(fake_pandoc, tmp_path, monkeypatch):
+    """Put a scripted pdflatex (and kpsewhich) on PATH for precompiled-format tests.
+
+    Returns the path of the log of its runs, one line of arguments per run.
+    """
+    bin_dir = fake_pandoc.path.parent
+    log_path = tmp_path / "latex-calls.log"
+    script = bin_dir / "pdflatex"
+    script.write_text(FAKE_PDFLATEX.format(python=sys.executable, log=str(log_path)))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    kpsewhich = bin_dir / "kpsewhich"
+    kpsewhich.write_text(f"#!{sys.executable}\nimport sys\nprint('/texmf/' + sys.argv[1])\n")
+    kpsewhich.chmod(kpsewhich.stat().st_mode | stat.S_IEXEC)
+
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(settings, "PDF_ENGINE", "pdflatex")
+    monkeypatch.setattr(settings, "LATEX_PRECOMPILE", True)
+    return log_path
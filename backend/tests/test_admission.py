@@ -0,0 +1,159 @@
+"""Tests for admission control of compute-heavy endpoints."""
+
+import asyncio
+
+import pytest
+from app.core.admission import AdmissionLimiter, AdmissionRejectedError, Priority
+
+
+async def settle():
+    """Let queued tasks run up to their next wait."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestAdmissionLimiter:
+    """Test the concurrency limit, wait queue and priorities."""
+
+    @pytest.mark.asyncio
+    async def test_waiters_admitted_interactive_first(self):
+        """Test queued requests get freed slots, interactive before batch."""
+        limiter = AdmissionLimiter("calc", max_concurrency=1, max_queue=4, max_wait=5)
+        order = []
+
+        async def request(name, priority):
+            async with limiter.admit(priority):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        first = asyncio.create_task(request("first", Priority.INTERACTIVE))
+        await settle()
+        batch = asyncio.create_task(request("batch", Priority.BATCH))
+        await settle()
+        interactive = asyncio.create_task(request("interactive", Priority.INTERACTIVE))
+        await settle()
+
+        metrics = limiter.metrics()
+        assert (metrics.running, metrics.queued_interactive, metrics.queued_batch) == (1, 1, 1)
+
+        await asyncio.gather(first, batch, interactive)
+        assert order == ["first", "interactive", "batch"]
+        assert limiter.metrics().running == 0
+        assert limiter.metrics().admitted == 3
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects(self):
+        """Test a request is refused with a retry estimate when the queue is full."""
+        limiter = AdmissionLimiter("export", max_concurrency=1, max_queue=1, max_wait=5)
+        release = await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await settle()
+
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            await limiter.acquire()
+        assert rejected.value.retry_after >= 1
+
+        release()
+        (await waiter)()
+        assert limiter.metrics().rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_interactive_displaces_batch(self):
+        """Test a full queue makes room for interactive work by refusing batch work."""
+        limiter = AdmissionLimiter("template", max_concurrency=1, max_queue=1, max_wait=5)
+        release = await limiter.acquire()
+        batch = asyncio.create_task(limiter.acquire(Priority.BATCH))
+        await settle()
+        interactive = asyncio.create_task(limiter.acquire(Priority.INTERACTIVE))
+        await settle()
+
+        with pytest.raises(AdmissionRejectedError):
+            await batch
+        release()
+        (await interactive)()
+        assert limiter.metrics().running == 0
+
+    @pytest.mark.asyncio
+    async def test_wait_times_out(self):
+        """Test a request waiting past max_wait is refused and leaves the queue."""
+        limiter = AdmissionLimiter("calc", max_concurrency=1, max_queue=2, max_wait=0.05)
+        release = await limiter.acquire()
+
+        with pytest.raises(AdmissionRejectedError):
+            await limiter.acquire()
+
+        metrics = limiter.metrics()
+        assert (metrics.timed_out, metrics.queued_interactive) == (1, 0)
+        release()
+        release()  # Releasing twice is harmless
+        assert limiter.metrics().running == 0
+
+
+class TestAdmissionRoutes:
+    """Test saturated endpoint classes answer 429."""
+
+    def test_saturated_calc_returns_429(self, monkeypatch):
+        """Test refusals carry Retry-After and show up in the metrics."""
+        from fastapi.testclient import TestClient
+
+        from app.core.admission import admission
+        from app.main import app
+
+        monkeypatch.setattr(admission.calc, "max_concurrency", 0)
+        monkeypatch.setattr(admission.calc, "max_queue", 0)
+
+        with TestClient(app) as client:
+            response = client.post("/api/calculation/execute", json={"blocks": [{"code": "x = 1"}]})
+            metrics = client.get("/api/admission/metrics").json()
+
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+        calc = next(item for item in metrics["classes"] if item["name"] == "calc")
+        assert calc["rejected"] >= 1
+
+    def test_admitted_calc_runs(self):
+        """Test calculations run normally below the limit."""
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        with TestClient(app) as client:
+            response = client.post("/api/calculation/execute", json={"blocks": [{"code": "x = 2"}]})
+
+        assert response.status_code == 200
+        assert response.json()["final_context"]["x"] == 2
+
+    def test_parallel_calcs_keep_their_output(self, monkeypatch):
+        """Test calc requests running alongside export-side calcs capture only their own prints."""
+        import threading
+
+        from fastapi.testclient import TestClient
+
+        from app.core.admission import admission
+        from app.main import app
+        from app.services.document_executor import DocumentExecutor
+
+        monkeypatch.setattr(admission.calc, "max_concurrency", 4)
+        loop = "import time\nfor i in range(30):\n    print('{}')\n    time.sleep(0.0005)"
+        outputs = {}
+
+        def request(tag):
+            response = client.post(
+                "/api/calculation/execute", json={"blocks": [{"code": loop.format(tag)}]}
+            )
+            outputs[tag] = response.json()["results"][0]["output"]
+
+        def export():
+            markdown = f"```python\n%%calc\n{loop.format('X')}\n```\n"
+            outputs["X"] = DocumentExecutor().execute_results(markdown)[0].output
+
+        with TestClient(app) as client:
+            threads = [threading.Thread(target=request, args=(tag,)) for tag in "ABC"]
+            threads.append(threading.Thread(target=export))
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        for tag in "ABCX":
+            assert outputs[tag] == f"{tag}\n" * 30
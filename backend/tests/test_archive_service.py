@@ -0,0 +1,105 @@
+"""Tests for archive import/export of project folders."""
+
+import io
+import tarfile
+import zipfile
+
+import pytest
+from app.models.document import DocumentMetadata
+from app.services.archive_service import ArchiveService
+from app.services.document_service import DocumentService
+from app.services.export_service import ExportService
+
+
+@pytest.fixture
+def documents(tmp_path):
+    """Document service with a small project tree."""
+    service = DocumentService(documents_dir=tmp_path / "documents", fsync=False)
+    service.save_document("bridge/deck.md", DocumentMetadata(title="Deck"), "Deck calc")
+    service.save_document("bridge/girders/g1.md", DocumentMetadata(title="G1"), "Girder calc")
+    service.save_document("other.md", DocumentMetadata(), "Not in project")
+    return service
+
+
+@pytest.fixture
+def archives(documents, tmp_path):
+    """Archive service over the test documents."""
+    return ArchiveService(documents, ExportService(exports_dir=tmp_path / "exports"))
+
+
+class TestArchiveExport:
+    """Test streaming archive export."""
+
+    def test_zip_export_streams_chunks(self, archives):
+        """Test a folder exports as a zip of its documents, relative to the folder."""
+        chunks = list(archives.iter_archive("bridge", "zip"))
+
+        assert len(chunks) > 1
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+            assert sorted(archive.namelist()) == ["deck.md", "girders/g1.md"]
+            assert "title: Deck" in archive.read("deck.md").decode()
+
+    def test_tar_export_includes_exports(self, archives):
+        """Test tar.gz export can bundle export artifacts named after documents."""
+        (archives.exports.exports_dir / "g1.pdf").write_bytes(b"%PDF-1.4")
+        (archives.exports.exports_dir / "unrelated.pdf").write_bytes(b"%PDF-1.4")
+
+        data = b"".join(archives.iter_archive("bridge", "tar.gz", include_exports=True))
+
+        with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as archive:
+            assert sorted(archive.getnames()) == ["deck.md", "exports/g1.pdf", "girders/g1.md"]
+
+    def test_missing_folder(self, archives):
+        """Test archiving an unknown folder raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            archives.iter_archive("nope")
+
+
+class TestArchiveImport:
+    """Test bulk archive import."""
+
+    def test_round_trip_into_new_folder(self, archives, documents):
+        """Test an exported archive imports into another folder intact."""
+        data = b"".join(archives.iter_archive("bridge", "zip"))
+
+        result = archives.import_archive(io.BytesIO(data), folder="copy")
+
+        assert sorted(result.imported) == ["copy/deck.md", "copy/girders/g1.md"]
+        assert documents.load_document("copy/girders/g1.md").content == "Girder calc"
+        listed = {d["filename"] for d in documents.list_documents("copy", recursive=True)}
+        assert listed == set(result.imported)
+
+    def test_existing_and_unsafe_members(self, archives, documents):
+        """Test existing documents are skipped and unsafe paths rejected."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("bridge/deck.md", "replacement")
+            archive.writestr("../escape.md", "evil")
+            archive.writestr("new.md", "fresh")
+            archive.writestr("image.png", b"\x89PNG")
+
+        result = archives.import_archive(buffer)
+
+        assert result.imported == ["new.md"]
+        assert result.skipped == ["bridge/deck.md"]
+        assert list(result.errors) == ["../escape.md"]
+        assert documents.load_document("bridge/deck.md").content == "Deck calc"
+
+    def test_overwrite(self, archives, documents):
+        """Test overwrite replaces existing documents."""
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            data = b"---\ntitle: New deck\n---\nreplacement"
+            info = tarfile.TarInfo("./bridge/deck.md")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+        result = archives.import_archive(buffer, overwrite=True)
+
+        assert result.imported == ["bridge/deck.md"]
+        assert documents.load_document("bridge/deck.md").metadata.title == "New deck"
+
+    def test_not_an_archive(self, archives):
+        """Test non-archive uploads are rejected."""
+        with pytest.raises(ValueError):
+            archives.import_archive(io.BytesIO(b"just some text"))
@@ -0,0 +1,128 @@
+"""Tests for concurrent batch PDF export (uses a fake pandoc)."""
+
+import asyncio
+
+import pytest
+from app.models.document import DocumentMetadata
+from app.services.batch_export import BatchExportService, demote_headings
+from app.services.document_service import DocumentService
+from app.services.export_jobs import ExportJobManager
+from app.services.export_service import ExportService
+
+
+@pytest.fixture
+def batch(fake_pandoc, tmp_path):
+    """Batch export service over isolated document and export directories."""
+    documents = DocumentService(documents_dir=tmp_path / "documents", fsync=False)
+    documents.save_document("beam.md", DocumentMetadata(title="Beam"), "# Loads\n\nw = 10 kN/m")
+    documents.save_document("project/column.md", DocumentMetadata(), "# Column\n\nP = 200 kN")
+    documents.save_document("broken.md", DocumentMetadata(), "FAIL")
+    documents.flush()
+    exports = ExportService(exports_dir=tmp_path / "exports")
+    return BatchExportService(documents, exports, 2, ExportJobManager(exports, max_concurrency=2))
+
+
+class TestDemoteHeadings:
+    """Test heading demotion for package chapters."""
+
+    def test_demotes_headings_outside_code(self):
+        """Test headings move down a level but code comments don't."""
+        markdown = "# Title\n\n## Part\n\n```python\n# comment\n```\n#hashtag"
+        assert demote_headings(markdown) == (
+            "## Title\n\n### Part\n\n```python\n# comment\n```\n#hashtag"
+        )
+
+
+class TestBatchExport:
+    """Test exporting many documents at once."""
+
+    @pytest.mark.asyncio
+    async def test_exports_each_document(self, batch):
+        """Test every document is rendered and reported in request order."""
+        result = await batch.export_documents(["beam.md", "missing.md", "project/column.md"])
+
+        assert [item.filename for item in result.items] == [
+            "beam.md",
+            "missing.md",
+            "project/column.md",
+        ]
+        assert result.succeeded == 2
+        assert result.failed == 1
+        assert result.items[1].error
+        assert result.items[2].output_filename == "project_column.pdf"
+        assert all(item.seconds > 0 for item in result.items if not item.error)
+        assert (batch.exports.exports_dir / "beam.pdf").exists()
+
+    @pytest.mark.asyncio
+    async def test_render_failure_does_not_stop_batch(self, batch):
+        """Test one failed render is reported without losing the others."""
+        result = await batch.export_documents(["broken.md", "beam.md"])
+
+        assert "Error producing PDF" in result.items[0].error
+        assert result.items[1].output_filename == "beam.pdf"
+
+    @pytest.mark.asyncio
+    async def test_renders_share_the_export_bound(self, batch, monkeypatch):
+        """Test a batch never runs more renders than the job manager allows."""
+        jobs = ExportJobManager(batch.exports, max_concurrency=1)
+        batch = BatchExportService(batch.documents, batch.exports, 4, jobs)
+        running, peak = 0, 0
+        real_export = batch.exports.export_to_pdf_async
+
+        async def export(*args, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            try:
+                return await real_export(*args, **kwargs)
+            finally:
+                running -= 1
+
+        monkeypatch.setattr(batch.exports, "export_to_pdf_async", export)
+        result = await batch.export_documents(["beam.md", "project/column.md"])
+
+        assert result.succeeded == 2
+        assert result.workers == 1
+        assert peak == 1
+
+    @pytest.mark.asyncio
+    async def test_package_with_table_of_contents(self, batch, fake_pandoc):
+        """Test documents are concatenated into one PDF with a TOC."""
+        result = await batch.export_documents(
+            ["beam.md", "project/column.md"], package_filename="package", package_title="Calcs"
+        )
+
+        assert result.package_filename == "package.pdf"
+        assert result.package_seconds is not None
+        package = (batch.exports.exports_dir / "package.pdf").read_text()
+        assert "# Beam\n\n## Loads" in package
+        assert "# column\n\n## Column" in package
+        assert package.index("Loads") < package.index("P = 200 kN")
+        assert any("--toc" in call and "title=Calcs" in call for call in fake_pandoc.calls)
+
+
+class TestBatchRoutes:
+    """Test the batch export and download endpoints."""
+
+    def test_batch_then_download(self, batch, monkeypatch):
+        """Test a batch export's files can be downloaded."""
+        from fastapi.testclient import TestClient
+
+        import app.api.export as export_api
+        from app.main import app
+
+        monkeypatch.setattr(export_api, "batch_export_service", batch)
+        monkeypatch.setattr(export_api, "export_service", batch.exports)
+
+        with TestClient(app) as client:
+            response = client.post("/api/export/batch", json={"filenames": ["beam.md"]})
+            assert response.status_code == 200
+            assert response.json()["succeeded"] == 1
+
+            download = client.get("/api/export/files/beam.pdf")
+            assert download.status_code == 200
+            assert download.content.startswith(b"%PDF")
+
+            assert client.get("/api/export/files/.cache").status_code == 400
+            assert client.get("/api/export/files/missing.pdf").status_code == 404
@@ -321,3 +321,60 @@ average = total / len(data)
 
         assert result.success is True
         assert result.result["average"]["magnitude"] == 49.5
+
+
+class TestCompiledBlocks:
+    """Test the compiled-code cache and static checks."""
+
+    def test_compiled_once(self):
+        """Test executing the same code twice reuses its compiled form."""
+        from app.services.calculation_engine import CalculationEngine
+
+        engine = CalculationEngine(code_cache_size=4)
+        code = "x = 2 * ureg.m\nprint(x)"
+        compiled = engine.compile_block(code)
+
+        result = engine.execute_block(CalculationBlock(code=code), {})
+
+        assert result.success is True
+        assert engine.compile_block(code) is compiled
+        assert compiled.render_source == "x = 2 * ureg.m"
+
+    def test_check_block(self):
+        """Test syntax errors and undefined names are found without running code."""
+        from app.services.calculation_engine import CalculationEngine
+
+        engine = CalculationEngine()
+        known = set()
+
+        assert engine.check_block("L = 6 * ureg.m\nfor i in range(3): pass", known) == []
+        assert {"L", "i"} <= known
+        assert engine.check_block("M = w * L**2 / 8\nf = sqrt(M.magnitude)", known) == [
+            "NameError: name 'w' is not defined (line 1)"
+        ]
+        assert engine.check_block("x = (", known)[0].startswith("SyntaxError")
+
+    def test_concurrent_blocks_capture_their_own_prints(self):
+        """Test blocks run from several threads never see each other's output."""
+        import sys
+        import threading
+
+        from app.services.calculation_engine import CalculationEngine
+
+        engine = CalculationEngine()
+        stdout = sys.stdout
+        outputs = {}
+
+        def run(tag):
+            code = f"import time\nfor i in range(50):\n    print('{tag}')\n    time.sleep(0.0005)"
+            outputs[tag] = engine.execute_block(CalculationBlock(code=code), {}).output
+
+        threads = [threading.Thread(target=run, args=(tag,)) for tag in "ABCD"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for tag in "ABCD":
+            assert outputs[tag] == f"{tag}\n" * 50
+        assert sys.stdout is stdout
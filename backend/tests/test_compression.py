@@ -0,0 +1,95 @@
+"""Tests for response compression and JSON encoding."""
+
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, choose_encoding
+from app.core.responses import FastJSONResponse, dumps
+
+PAYLOAD = {
+    "variables": [{"name": f"M_{n}", "magnitude": 45.0, "units": "kN·m"} for n in range(200)]
+}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/json")
+    async def payload():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/pdf")
+    async def pdf():
+        return Response(b"%PDF-1.4 " + b"x" * 2000, media_type="application/pdf")
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse((f"row,{n}\n" * 100 for n in range(5)), media_type="text/csv")
+
+    return TestClient(app)
+
+
+class TestCompression:
+    """Test negotiated response compression."""
+
+    def test_gzip_when_accepted(self, client):
+        """Test JSON is gzipped and decodes to the same payload."""
+        response = client.get("/json", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(dumps(PAYLOAD)) / 5
+        assert response.json() == PAYLOAD
+
+    def test_identity_when_not_accepted(self, client):
+        """Test clients that don't accept gzip get the plain body."""
+        response = client.get("/json", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.content == dumps(PAYLOAD)
+
+    def test_small_and_compressed_types_passed_through(self, client):
+        """Test tiny bodies and PDFs are not compressed."""
+        headers = {"Accept-Encoding": "gzip"}
+
+        assert "content-encoding" not in client.get("/small", headers=headers).headers
+        assert "content-encoding" not in client.get("/pdf", headers=headers).headers
+
+    def test_streaming_response(self, client):
+        """Test streamed bodies are compressed incrementally into one gzip stream."""
+        with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(raw).decode() == "".join(f"row,{n}\n" * 100 for n in range(5))
+
+    def test_choose_encoding(self):
+        """Test q-values and wildcards in Accept-Encoding."""
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("gzip;q=0, deflate") is None
+        assert choose_encoding("*") in ("br", "gzip")
+        assert choose_encoding("") is None
+
+
+class TestJSONEncoding:
+    """Test the JSON response encoder."""
+
+    def test_matches_standard_json(self):
+        """Test output parses to the same value as the standard library's."""
+        assert json.loads(dumps(PAYLOAD)) == PAYLOAD
+
+    def test_falls_back_for_unsupported_values(self):
+        """Test values orjson rejects are still encoded."""
+        assert json.loads(dumps({"big": 2**70})) == {"big": 2**70}
@@ -0,0 +1,114 @@
+"""Tests for executing calc blocks ahead of export."""
+
+import pytest
+from app.services.calculation_engine import calculation_engine
+from app.services.document_executor import DocumentExecutor, has_calc_blocks
+
+DOCUMENT = """# Beam
+
+```python
+%%calc
+w = 10 * ureg.kN / ureg.m
+L = 6 * ureg.m
+```
+
+Some prose.
+
+```python
+%%calc
+M = w * L**2 / 8
+print(f"M = {M}")
+```
+
+```python
+plain = "not a calc block"
+```
+"""
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    """Executor with a fresh cache that counts block executions."""
+    executor = DocumentExecutor(calculation_engine)
+    executor.calls = []
+    execute_block = calculation_engine.execute_block
+
+    def counting_execute(block, context):
+        executor.calls.append(block.code)
+        return execute_block(block, context)
+
+    monkeypatch.setattr(executor.engine, "execute_block", counting_execute)
+    return executor
+
+
+class TestDocumentExecutor:
+    """Test %%calc blocks are replaced with their results."""
+
+    def test_blocks_replaced_with_results(self, executor):
+        """Test calc blocks become LaTeX and output; other code is untouched."""
+        executed = executor.execute_markdown(DOCUMENT)
+
+        assert "%%calc" not in executed
+        assert "\\begin{aligned}" in executed
+        assert "```text\nM = 45.0 kN·m\n```" in executed
+        assert 'plain = "not a calc block"' in executed
+        assert "Some prose." in executed
+
+    def test_context_flows_between_blocks(self, executor):
+        """Test later blocks see variables from earlier ones."""
+        executed = executor.execute_markdown(DOCUMENT)
+        assert "Calculation error" not in executed
+
+    def test_failed_block_keeps_source_and_error(self, executor):
+        """Test a failing block is shown with its error."""
+        executed = executor.execute_markdown("```python\n%%calc\nx = undefined_name\n```\n")
+
+        assert "x = undefined_name" in executed
+        assert "> **Calculation error:** NameError" in executed
+
+    def test_executed_document_is_cached(self, executor):
+        """Test exporting the same version again doesn't re-run anything."""
+        first = executor.execute_markdown(DOCUMENT)
+        second = executor.execute_markdown(DOCUMENT)
+
+        assert first == second
+        assert len(executor.calls) == 2
+
+    def test_unchanged_blocks_are_reused(self, executor):
+        """Test editing prose or a later block only re-runs what changed."""
+        executor.execute_markdown(DOCUMENT)
+        executor.execute_markdown(DOCUMENT.replace("Some prose.", "Edited prose."))
+        assert len(executor.calls) == 2
+
+        executor.execute_markdown(DOCUMENT.replace("L**2 / 8", "L**2 / 10"))
+        assert executor.calls[-1].startswith("M = w * L**2 / 10")
+        assert len(executor.calls) == 3
+
+    def test_detection(self):
+        """Test only fenced python blocks marked %%calc count."""
+        assert has_calc_blocks(DOCUMENT)
+        assert not has_calc_blocks("Inline %%calc mention\n\n```python\nx = 1\n```\n")
+
+
+class TestExecutedExport:
+    """Test exports contain calc results (uses a fake pandoc)."""
+
+    def test_pdf_export_contains_results(self, fake_pandoc, tmp_path):
+        """Test the Markdown handed to pandoc has results, not %%calc source."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        output = service.export_to_pdf(DOCUMENT, "beam")
+
+        text = output.read_text()
+        assert "%%calc" not in text
+        assert "\\begin{aligned}" in text
+
+    def test_html_export_contains_results(self, tmp_path):
+        """Test HTML exports get the same executed Markdown."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        output = service.export_to_html(DOCUMENT, "beam")
+
+        assert "M = 45.0 kN·m" in output.read_text(encoding="utf-8")
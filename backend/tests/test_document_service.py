@@ -0,0 +1,231 @@
+"""Tests for the document service - storage and retrieval of documents."""
+
+import pytest
+from app.core import storage
+from app.models.document import DocumentMetadata, TextEdit
+from app.services.document_service import DocumentConflictError, DocumentService
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Document service backed by a temporary directory."""
+    return DocumentService(documents_dir=tmp_path / "documents")
+
+
+class TestAsyncDocumentIO:
+    """Test the async variants that run file I/O off the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_save_and_load_async(self, service):
+        """Test a document round-trips through the async API."""
+        metadata = DocumentMetadata(project="Bridge", engineer="A. Engineer")
+        saved = await service.save_document_async("calc", metadata, "# Beam\n\nL = 5 m")
+
+        assert saved.filename == "calc.md"
+        loaded = await service.load_document_async("calc.md")
+        assert loaded.metadata.project == "Bridge"
+        assert "L = 5 m" in loaded.content
+
+    @pytest.mark.asyncio
+    async def test_list_and_delete_async(self, service):
+        """Test listing and deleting documents through the async API."""
+        await service.save_document_async("a.md", DocumentMetadata(), "A")
+        await service.save_document_async("b.md", DocumentMetadata(), "B")
+
+        documents = await service.list_documents_async()
+        assert {d["filename"] for d in documents} == {"a.md", "b.md"}
+
+        assert await service.delete_document_async("a.md") is True
+        assert await service.document_exists_async("a.md") is False
+
+    @pytest.mark.asyncio
+    async def test_missing_document_raises_async(self, service):
+        """Test FileNotFoundError propagates out of the I/O pool."""
+        with pytest.raises(FileNotFoundError):
+            await service.load_document_async("missing.md")
+
+
+class TestDurableWrites:
+    """Test atomic writes and the write-behind coalescer."""
+
+    def test_save_leaves_no_temp_files(self, service):
+        """Test atomic writes rename their temp file into place."""
+        service.save_document("calc.md", DocumentMetadata(), "First")
+        service.save_document("calc.md", DocumentMetadata(), "Second")
+        service.flush()
+
+        assert [p.name for p in service.documents_dir.iterdir() if p.is_file()] == ["calc.md"]
+        assert not list(service.documents_dir.rglob("*.tmp"))
+        assert "Second" in (service.documents_dir / "calc.md").read_text()
+
+    def test_rapid_saves_are_coalesced(self, tmp_path, monkeypatch):
+        """Test a burst of saves to one document produces a single disk write."""
+        service = DocumentService(documents_dir=tmp_path, coalesce_window=60, fsync=False)
+        service.save_document("calc.md", DocumentMetadata(), "v0")
+
+        writes = []
+        real_write = storage.atomic_write_text
+        monkeypatch.setattr(
+            storage,
+            "atomic_write_text",
+            lambda path, text, fsync: (writes.append(text), real_write(path, text, fsync)),
+        )
+
+        for i in range(1, 6):
+            saved = service.save_document("calc.md", DocumentMetadata(), f"v{i}")
+            # Callers always get the up-to-date document back
+            assert saved.content == f"v{i}"
+
+        assert writes == []
+        assert service.load_document("calc.md").content == "v5"
+
+        service.flush()
+        assert len(writes) == 1
+        assert "v5" in (tmp_path / "calc.md").read_text()
+
+    def test_pending_save_keeps_its_modified_time(self, tmp_path):
+        """Test a buffered save reports the time it was made, not the time it is read."""
+        import time
+
+        service = DocumentService(documents_dir=tmp_path, coalesce_window=60, fsync=False)
+        service.save_document("calc.md", DocumentMetadata(), "v0")
+        saved = service.save_document("calc.md", DocumentMetadata(), "v1")
+        time.sleep(0.01)
+
+        assert service.load_document("calc.md").modified == saved.modified
+        assert service.load_document("calc.md").modified == saved.modified
+
+    def test_delete_discards_pending_write(self, tmp_path):
+        """Test deleting a document drops its buffered save."""
+        service = DocumentService(documents_dir=tmp_path, coalesce_window=60, fsync=False)
+        service.save_document("calc.md", DocumentMetadata(), "v0")
+        service.save_document("calc.md", DocumentMetadata(), "v1")
+
+        service.delete_document("calc.md")
+        service.flush()
+
+        assert not (tmp_path / "calc.md").exists()
+
+    def test_delete_waits_for_update_in_progress(self, tmp_path):
+        """Test a delete takes the document's lock, and unused locks are dropped."""
+        import threading
+
+        service = DocumentService(documents_dir=tmp_path, coalesce_window=60, fsync=False)
+        service.save_document("calc.md", DocumentMetadata(), "v0")
+
+        lock = service._document_lock("calc.md")
+        with lock:
+            deleter = threading.Thread(target=service.delete_document, args=("calc.md",))
+            deleter.start()
+            deleter.join(0.1)
+            assert deleter.is_alive()
+            service.save_document("calc.md", DocumentMetadata(), "v1")
+        deleter.join()
+        service.flush()
+
+        assert not (tmp_path / "calc.md").exists()
+        del lock
+        assert len(service._locks) == 0
+
+
+class TestPatchDocument:
+    """Test incremental, version-checked document updates."""
+
+    def test_patch_applies_edits(self, service):
+        """Test insert, replace and delete edits against the base content."""
+        doc = service.save_document("calc.md", DocumentMetadata(), "L = 5 m\nw = 10 kN/m")
+
+        patched = service.patch_document(
+            "calc.md",
+            doc.version,
+            [
+                TextEdit(start=4, end=5, text="6"),  # replace
+                TextEdit(start=0, end=0, text="# Beam\n"),  # insert
+                TextEdit(start=8, end=19, text=""),  # delete
+            ],
+        )
+
+        assert patched.content == "# Beam\nL = 6 m"
+        assert patched.version != doc.version
+        assert service.load_document("calc.md").version == patched.version
+
+    def test_stale_version_is_rejected(self, service):
+        """Test patches against an outdated version raise a conflict."""
+        doc = service.save_document("calc.md", DocumentMetadata(), "original")
+        service.save_document("calc.md", DocumentMetadata(), "changed elsewhere")
+
+        with pytest.raises(DocumentConflictError) as exc_info:
+            service.patch_document("calc.md", doc.version, [TextEdit(start=0, end=0, text="x")])
+
+        assert exc_info.value.current_version == service.load_document("calc.md").version
+
+    def test_invalid_edits_are_rejected(self, service):
+        """Test out-of-range and overlapping edits raise ValueError."""
+        doc = service.save_document("calc.md", DocumentMetadata(), "abcdef")
+
+        with pytest.raises(ValueError):
+            service.patch_document("calc.md", doc.version, [TextEdit(start=3, end=99)])
+        with pytest.raises(ValueError):
+            service.patch_document(
+                "calc.md", doc.version, [TextEdit(start=0, end=3), TextEdit(start=2, end=4)]
+            )
+
+
+class TestHierarchicalStore:
+    """Test nested project folders, path-safe IDs and sharded storage."""
+
+    def test_nested_folders(self, service):
+        """Test documents in nested folders are listed per folder and recursively."""
+        service.save_document("root.md", DocumentMetadata(), "R")
+        service.save_document("bridge-a/girders/beam-1.md", DocumentMetadata(), "B1")
+        service.save_document("bridge-a/deck.md", DocumentMetadata(), "D")
+
+        assert [d["filename"] for d in service.list_documents()] == ["root.md"]
+        assert [d["filename"] for d in service.list_documents("bridge-a")] == ["bridge-a/deck.md"]
+        assert {d["filename"] for d in service.list_documents("bridge-a", recursive=True)} == {
+            "bridge-a/deck.md",
+            "bridge-a/girders/beam-1.md",
+        }
+        assert service.list_folders() == ["bridge-a"]
+        assert service.list_folders("bridge-a") == ["bridge-a/girders"]
+        assert service.load_document("bridge-a/girders/beam-1.md").content == "B1"
+
+    @pytest.mark.parametrize(
+        "doc_id", ["../escape.md", "a/../../b.md", "/etc/passwd", ".hidden.md", "C:/x.md", ""]
+    )
+    def test_unsafe_ids_rejected(self, service, doc_id):
+        """Test IDs that could escape the documents directory are rejected."""
+        with pytest.raises(ValueError):
+            service.load_document(doc_id)
+
+    def test_sharded_storage(self, tmp_path):
+        """Test sharding stores files in hashed buckets but keeps logical IDs."""
+        service = DocumentService(documents_dir=tmp_path, fsync=False, shard_depth=2)
+        service.save_document("proj/calc.md", DocumentMetadata(), "C")
+
+        stored = list((tmp_path / "proj").rglob("calc.md"))
+        assert len(stored) == 1
+        assert len(stored[0].relative_to(tmp_path / "proj").parts) == 3
+        assert service.load_document("proj/calc.md").content == "C"
+        assert [d["filename"] for d in service.list_documents("proj")] == ["proj/calc.md"]
+        assert service.list_folders() == ["proj"]
+
+    def test_listing_reuses_unchanged_entries(self, service, monkeypatch):
+        """Test repeated listings only re-parse documents that changed."""
+        service.save_document("a.md", DocumentMetadata(), "A")
+        service.save_document("b.md", DocumentMetadata(), "B")
+        service.list_documents()
+
+        loads = []
+        real_load = service.load_document
+        monkeypatch.setattr(
+            service, "load_document", lambda doc_id: (loads.append(doc_id), real_load(doc_id))[1]
+        )
+
+        service.list_documents()
+        assert loads == []
+
+        service.delete_document("a.md")
+        (service.documents_dir / "c.md").write_text("C")
+        assert {d["filename"] for d in service.list_documents()} == {"b.md", "c.md"}
+        assert loads == ["c.md"]
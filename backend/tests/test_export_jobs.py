@@ -0,0 +1,187 @@
+"""Tests for the asynchronous export job queue (uses a fake pandoc)."""
+
+import asyncio
+import time
+
+import pytest
+from app.models.export import ExportJobStatus
+from app.services.export_jobs import ExportJobManager, ExportQueueFullError, download_name
+from app.services.export_service import ExportService
+
+
+@pytest.fixture
+def manager(fake_pandoc, tmp_path):
+    """Job manager over an isolated export service, two jobs at a time."""
+    return ExportJobManager(
+        ExportService(exports_dir=tmp_path / "exports"), max_concurrency=2, max_queue=3
+    )
+
+
+class TestExportJobs:
+    """Test submitting, polling and downloading export jobs."""
+
+    @pytest.mark.asyncio
+    async def test_job_succeeds(self, manager):
+        """Test a submitted job runs in the background and yields its artifact."""
+        job = manager.submit("pdf", "# Beam\n\nM = 45 kNm", "beam")
+        assert job.status == ExportJobStatus.QUEUED
+
+        job = await manager.wait(job.id, timeout=30)
+
+        assert job.status == ExportJobStatus.SUCCEEDED
+        assert job.started_at >= job.created_at
+        assert job.finished_at >= job.started_at
+        assert manager.result(job.id).name == f"beam-{job.id}.pdf"
+        assert download_name(job) == "beam.pdf"
+        assert "M = 45 kNm" in manager.result(job.id).read_text()
+
+    @pytest.mark.asyncio
+    async def test_same_name_jobs_keep_their_own_artifacts(self, manager):
+        """Test concurrent jobs for one file name don't overwrite each other's output."""
+        first = manager.submit("pdf", "# Beam\n\nRev A", "beam.pdf")
+        second = manager.submit("pdf", "# Beam\n\nRev B", "beam")
+        await asyncio.gather(
+            manager.wait(first.id, timeout=30), manager.wait(second.id, timeout=30)
+        )
+
+        assert "Rev A" in manager.result(first.id).read_text()
+        assert "Rev B" in manager.result(second.id).read_text()
+        assert download_name(first) == download_name(second) == "beam.pdf"
+
+    @pytest.mark.asyncio
+    async def test_failed_job_reports_error(self, manager):
+        """Test a pandoc failure marks the job failed with its error."""
+        job = manager.submit("pdf", "FAIL", "broken")
+        job = await manager.wait(job.id, timeout=30)
+
+        assert job.status == ExportJobStatus.FAILED
+        assert "Error producing PDF" in job.error
+        assert manager.result(job.id) is None
+
+    @pytest.mark.asyncio
+    async def test_html_job(self, manager):
+        """Test HTML exports run as jobs too."""
+        job = manager.submit("html", "# Notes", "notes")
+        job = await manager.wait(job.id, timeout=30)
+
+        assert job.status == ExportJobStatus.SUCCEEDED
+        assert manager.result(job.id).suffix == ".html"
+
+    @pytest.mark.asyncio
+    async def test_unknown_format_rejected(self, manager):
+        """Test unsupported formats are rejected at submission."""
+        with pytest.raises(ValueError):
+            manager.submit("docx", "# Notes", "notes")
+
+    @pytest.mark.asyncio
+    async def test_watch_yields_status_changes(self, manager):
+        """Test subscribers see each transition through to the final state."""
+        job = manager.submit("pdf", "# Beam", "beam")
+        statuses = [snapshot.status async for snapshot in manager.watch(job.id)]
+
+        assert statuses[0] == ExportJobStatus.QUEUED
+        assert statuses[-1] == ExportJobStatus.SUCCEEDED
+
+
+class TestExportConcurrency:
+    """Test the concurrency bound, queue limit and cancellation."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, manager):
+        """Test no more than max_concurrency jobs run at once."""
+        jobs = [manager.submit("pdf", "SLOW", f"slow{i}") for i in range(3)]
+        await asyncio.sleep(0.5)
+
+        statuses = [manager.get(job.id).status for job in jobs]
+        assert statuses.count(ExportJobStatus.RUNNING) == 2
+        assert statuses.count(ExportJobStatus.QUEUED) == 1
+
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_queue_full(self, manager):
+        """Test submissions are refused once the wait queue is full."""
+        for i in range(2):
+            manager.submit("pdf", "SLOW", f"running{i}")
+        await asyncio.sleep(0.5)
+        for i in range(3):
+            manager.submit("pdf", "SLOW", f"waiting{i}")
+
+        with pytest.raises(ExportQueueFullError):
+            manager.submit("pdf", "SLOW", "one_too_many")
+
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_job_kills_pandoc(self, manager):
+        """Test cancelling a running job stops it promptly."""
+        job = manager.submit("pdf", "SLOW", "slow")
+        await asyncio.sleep(0.5)
+        assert manager.get(job.id).status == ExportJobStatus.RUNNING
+
+        start = time.monotonic()
+        manager.cancel(job.id)
+        job = await manager.wait(job.id, timeout=10)
+
+        assert job.status == ExportJobStatus.CANCELLED
+        assert time.monotonic() - start < 5
+        assert not list(manager.service.exports_dir.glob(".render-*"))
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued_job(self, manager):
+        """Test a job cancelled before it starts never runs."""
+        job = manager.submit("pdf", "# Beam", "beam")
+        manager.cancel(job.id)
+        job = await manager.wait(job.id, timeout=10)
+
+        assert job.status == ExportJobStatus.CANCELLED
+        assert job.started_at is None
+
+    @pytest.mark.asyncio
+    async def test_metrics(self, manager):
+        """Test metrics count outcomes and record timings."""
+        ok = manager.submit("pdf", "# Beam", "beam")
+        bad = manager.submit("pdf", "FAIL", "broken")
+        await manager.wait(ok.id, timeout=30)
+        await manager.wait(bad.id, timeout=30)
+
+        metrics = manager.metrics()
+        assert metrics.succeeded == 1
+        assert metrics.failed == 1
+        assert metrics.queued == 0
+        assert metrics.running == 0
+        assert metrics.max_concurrency == 2
+        assert metrics.avg_run_seconds > 0
+
+
+class TestExportJobRoutes:
+    """Test the export job HTTP endpoints."""
+
+    def test_submit_poll_download(self, manager, monkeypatch):
+        """Test the job lifecycle over HTTP."""
+        from fastapi.testclient import TestClient
+
+        import app.api.export as export_api
+        from app.main import app
+
+        monkeypatch.setattr(export_api, "export_job_manager", manager)
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/api/export/jobs",
+                json={"markdown_content": "# Beam", "output_filename": "beam", "format": "pdf"},
+            )
+            assert response.status_code == 202
+            job_id = response.json()["id"]
+
+            events = client.get(f"/api/export/jobs/{job_id}/events").text
+            assert "event: succeeded" in events
+
+            assert client.get(f"/api/export/jobs/{job_id}").json()["status"] == "succeeded"
+            download = client.get(f"/api/export/jobs/{job_id}/download")
+            assert download.status_code == 200
+            assert download.content.startswith(b"%PDF")
+            assert 'filename="beam.pdf"' in download.headers["content-disposition"]
+
+            assert client.get("/api/export/jobs/missing").status_code == 404
+            assert client.get("/api/export/metrics").json()["succeeded"] == 1
@@ -0,0 +1,152 @@
+"""Tests for exports directory retention."""
+
+import os
+import time
+
+import pytest
+from app.services.export_retention import ExportRetention
+
+
+@pytest.fixture
+def exports_dir(tmp_path):
+    directory = tmp_path / "exports"
+    directory.mkdir()
+    return directory
+
+
+def make_export(directory, name, size=100, age=0.0):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+class TestExportRetention:
+    """Test size, age and orphan cleanup of exported files."""
+
+    def test_expired_exports_removed(self, exports_dir):
+        """Test exports unused for longer than max_age are deleted."""
+        old = make_export(exports_dir, "old.pdf", age=3600)
+        new = make_export(exports_dir, "new.pdf")
+
+        retention = ExportRetention(exports_dir, max_bytes=0, max_age=60)
+
+        assert retention.enforce() == 1
+        assert not old.exists()
+        assert new.exists()
+
+    def test_least_recently_used_evicted_over_budget(self, exports_dir):
+        """Test the oldest exports go first, sparing pinned and kept files."""
+        oldest = make_export(exports_dir, "a.pdf", age=30)
+        pinned = make_export(exports_dir, "b.pdf", age=20)
+        middle = make_export(exports_dir, "c.html", age=10)
+        newest = make_export(exports_dir, "d.pdf")
+
+        retention = ExportRetention(exports_dir, max_bytes=250, max_age=0)
+        retention.pin(pinned)  # Also marks it as recently used
+        os.utime(pinned, (time.time() - 20, time.time() - 20))
+
+        assert retention.enforce(keep=newest) == 2
+        assert not oldest.exists()
+        assert not middle.exists()
+        assert pinned.exists()
+        assert newest.exists()
+
+        retention.release(pinned)
+        assert not retention.is_pinned(pinned)
+
+    def test_cache_and_scratch_not_counted(self, exports_dir):
+        """Test only top-level exported files are subject to retention."""
+        (exports_dir / ".cache").mkdir()
+        cached = make_export(exports_dir / ".cache", "abc.pdf", size=1000, age=3600)
+
+        ExportRetention(exports_dir, max_bytes=10, max_age=60).enforce()
+
+        assert cached.exists()
+
+    def test_sweep_orphans(self, exports_dir):
+        """Test leftovers of interrupted renders are removed at startup."""
+        scratch = exports_dir / ".render-abc123"
+        scratch.mkdir()
+        (scratch / "output.pdf").write_bytes(b"partial")
+        (exports_dir / ".cache").mkdir()
+        partial = make_export(exports_dir / ".cache", ".abc.pdf.0f0f.tmp")
+        legacy = make_export(exports_dir, "temp_1697700000.123456.md")
+        legacy_whole = make_export(exports_dir, "temp_1697700000.md")
+        user_file = make_export(exports_dir, "temp_notes.md")
+        export = make_export(exports_dir, "beam.pdf")
+
+        retention = ExportRetention(exports_dir)
+
+        assert retention.sweep_orphans() == 4
+        assert not scratch.exists()
+        assert not partial.exists()
+        assert not legacy.exists()
+        assert not legacy_whole.exists()
+        assert user_file.exists()
+        assert export.exists()
+        assert retention.metrics().orphans_removed == 4
+
+    def test_metrics(self, exports_dir):
+        """Test disk usage and eviction counts are reported."""
+        make_export(exports_dir, "a.pdf", size=300, age=100)
+        make_export(exports_dir, "b.pdf", size=200)
+        (exports_dir / ".cache").mkdir()
+        make_export(exports_dir / ".cache", "key.pdf", size=50)
+
+        retention = ExportRetention(exports_dir, max_bytes=250, max_age=0)
+        retention.enforce()
+        metrics = retention.metrics()
+
+        assert metrics.files == 1
+        assert metrics.bytes == 200
+        assert metrics.cache_bytes == 50
+        assert metrics.evicted_files == 1
+        assert metrics.evicted_bytes == 300
+        assert metrics.pinned == 0
+
+    def test_export_applies_retention(self, fake_pandoc, tmp_path):
+        """Test publishing an export trims older ones past the budget."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        service.retention.max_bytes = 1
+        first = service.export_to_pdf("# Beam", "beam")
+        second = service.export_to_pdf("# Column", "column")
+
+        assert not first.exists()
+        assert second.exists()
+
+
+class TestExportStorageRoutes:
+    """Test retention around the download and storage endpoints."""
+
+    def test_download_pins_until_sent(self, fake_pandoc, tmp_path, monkeypatch):
+        """Test a download is pinned while streaming and released afterwards."""
+        from fastapi.testclient import TestClient
+
+        import app.api.export as export_api
+        from app.main import app
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        monkeypatch.setattr(export_api, "export_service", service)
+        path = service.export_to_pdf("# Beam", "beam")
+
+        pins = []
+        release = service.retention.release
+        monkeypatch.setattr(
+            service.retention,
+            "release",
+            lambda p: (pins.append(service.retention.is_pinned(p)), release(p)),
+        )
+
+        with TestClient(app) as client:
+            assert client.get("/api/export/files/beam.pdf").status_code == 200
+            storage = client.get("/api/export/storage").json()
+
+        assert pins == [True]
+        assert not service.retention.is_pinned(path)
+        assert storage["files"] == 1
+        assert storage["pinned"] == 0
@@ -279,19 +279,23 @@ class TestHTMLExport:
         print(f"✓ HTML generated: {output_path}")
 
     def test_html_with_math(self):
-        """Test HTML export includes KaTeX for math rendering."""
+        """Test HTML export renders math on the server, without a CDN."""
         markdown_content = """
 <h1>Math Test</h1>
-<p>Inline math: $E = mc^2$</p>
-<p>Display math: $$\\frac{wL^2}{8}$$</p>
+
+Inline math: $E = mc^2$
+
+$$\\frac{wL^2}{8}$$
 """
         output_path = export_service.export_to_html(markdown_content, "test_html_math")
 
         assert output_path.exists()
 
-        # Verify KaTeX is included
+        # Verify math is pre-rendered and nothing is loaded from the network
         content = output_path.read_text()
-        assert "katex" in content.lower()
+        assert "$E = mc^2$" not in content
+        assert "<script" not in content
+        assert "http" not in content
         assert "Math Test" in content
         print(f"✓ HTML with math support generated: {output_path}")
 
@@ -360,3 +364,310 @@ class TestExportIntegration:
         assert "First document" in path1.read_text()
         assert "Second document" in path2.read_text()
         print("✓ Multiple exports work independently")
+
+
+class TestExportCache:
+    """Test the content-addressed PDF export cache (uses a fake pandoc)."""
+
+    def test_repeat_export_is_served_from_cache(self, fake_pandoc, tmp_path):
+        """Test identical exports run pandoc once."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        first = service.export_to_pdf("# Beam\n\nM = 45 kNm", "beam")
+        second = service.export_to_pdf("# Beam\n\nM = 45 kNm", "beam_copy")
+
+        assert len(fake_pandoc.calls) == 1
+        assert second.name == "beam_copy.pdf"
+        assert second.read_bytes() == first.read_bytes()
+
+    def test_cache_key_covers_content_and_metadata(self, fake_pandoc, tmp_path):
+        """Test changed content or metadata re-renders."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        service.export_to_pdf("# Beam", "beam")
+        service.export_to_pdf("# Beam v2", "beam")
+        service.export_to_pdf("# Beam v2", "beam", metadata={"title": "Rev B"})
+
+        assert len(fake_pandoc.calls) == 3
+        assert "Beam v2" in (tmp_path / "exports" / "beam.pdf").read_text()
+
+    def test_cache_key_covers_calc_execution(self, fake_pandoc, tmp_path, monkeypatch):
+        """Test turning calc execution on or off re-renders instead of serving stale output."""
+        from app.core.config import settings
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        markdown = "# Beam\n\n```python\n%%calc\nM = 45 * ureg.kN * ureg.m\n```\n"
+        monkeypatch.setattr(settings, "EXPORT_EXECUTE_CALCS", True)
+        assert "%%calc" not in service.export_to_pdf(markdown, "beam").read_text()
+        assert "%%calc" not in service.export_to_html(markdown, "beam").read_text()
+
+        monkeypatch.setattr(settings, "EXPORT_EXECUTE_CALCS", False)
+        assert "%%calc" in service.export_to_pdf(markdown, "beam").read_text()
+        assert "%%calc" in service.export_to_html(markdown, "beam").read_text()
+
+    def test_lru_eviction(self, tmp_path):
+        """Test least recently used artifacts are evicted past the size budget."""
+        import os
+
+        from app.services.export_cache import ExportCache
+
+        cache = ExportCache(tmp_path / "cache", max_bytes=250)
+        source = tmp_path / "artifact.pdf"
+        source.write_bytes(b"x" * 100)
+
+        cache.put("a", ".pdf", source)
+        cache.put("b", ".pdf", source)
+        os.utime(cache.cache_dir / "a.pdf", (1, 1))
+        os.utime(cache.cache_dir / "b.pdf", (2, 2))
+        assert cache.get("a", ".pdf") is not None  # "b" is now least recently used
+
+        cache.put("c", ".pdf", source)
+
+        assert cache.get("b", ".pdf") is None
+        assert cache.get("a", ".pdf") is not None
+        assert cache.get("c", ".pdf") is not None
+
+
+class TestPrecompiledLatexFormat:
+    """Test PDF exports against a dumped LaTeX preamble (fake pandoc and pdflatex)."""
+
+    def test_split_preamble_stops_before_document_specific_lines(self):
+        """Test the title and PDF info are left out of the dumped preamble."""
+        from app.services.latex_format import split_preamble
+
+        latex = (
+            "\\documentclass{article}\n\\usepackage{amsmath}\n"
+            "\\hypersetup{pdftitle={Beam}}\n\\title{Beam}\n"
+            "\\begin{document}\nBody\n\\end{document}\n"
+        )
+        preamble, rest = split_preamble(latex)
+
+        assert preamble == "\\documentclass{article}\n\\usepackage{amsmath}\n"
+        assert rest.startswith("\\hypersetup")
+        assert split_preamble("no document here") is None
+
+    def test_format_built_once_and_reused(self, fake_latex, tmp_path):
+        """Test documents sharing a preamble reuse one format."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        first = service.export_to_pdf("# Beam", "beam", metadata={"title": "Beam"})
+        second = service.export_to_pdf("# Column", "column", metadata={"title": "Column"})
+
+        runs = fake_latex.read_text().splitlines()
+        assert sum("-ini" in run for run in runs) == 1
+        assert sum("-fmt=" in run for run in runs) == 2
+        assert len(list(service.latex_formats.formats_dir.glob("*.fmt"))) == 1
+
+        assert first.read_bytes().startswith(b"%PDF-1.4 latex")
+        assert "\\title{Column}" in second.read_text()
+        assert "# Column" in second.read_text()
+        assert not list(service.exports_dir.glob(".render-*"))
+
+    def test_falls_back_to_pandoc_when_latex_fails(self, fake_latex, fake_pandoc, tmp_path):
+        """Test a failed precompiled run is retried through pandoc's own PDF path."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        output = service.export_to_pdf("# BADTEX", "broken")
+
+        assert output.read_bytes().startswith(b"%PDF-1.4 fake")
+        assert any("-o " in call for call in fake_pandoc.calls)
+
+    def test_eviction_keeps_formats_in_use(self, tmp_path, monkeypatch):
+        """Test formats being compiled against, or that can't be deleted, survive eviction."""
+        import os
+
+        from app.services.latex_format import LatexFormatCache
+
+        cache = LatexFormatCache(tmp_path, max_formats=1)
+        for age, name in enumerate(["busy", "locked", "old", "new"]):
+            path = tmp_path / f"{name}.fmt"
+            path.write_bytes(b"fmt")
+            os.utime(path, (age, age))
+        cache._in_use["busy"] = 1
+
+        real_unlink = Path.unlink
+
+        def unlink(path, missing_ok=False):
+            if path.name == "locked.fmt":
+                raise PermissionError("in use by another process")
+            real_unlink(path, missing_ok=missing_ok)
+
+        monkeypatch.setattr(Path, "unlink", unlink)
+
+        assert cache.evict() == 1
+        assert sorted(p.name for p in tmp_path.glob("*.fmt")) == [
+            "busy.fmt",
+            "locked.fmt",
+            "new.fmt",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_async_export_uses_format(self, fake_latex, tmp_path):
+        """Test the async export path renders through the format too."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        output = await service.export_to_pdf_async("# Beam", "beam")
+
+        assert output.read_bytes().startswith(b"%PDF-1.4 latex")
+        assert "-ini" in fake_latex.read_text()
+
+    @pytest.mark.asyncio
+    async def test_version_checks_run_off_event_loop(self, fake_latex, tmp_path, monkeypatch):
+        """Test the first async export runs the pandoc/LaTeX version checks in a worker thread."""
+        import subprocess
+        import threading
+
+        from app.services.export_service import ExportService
+
+        loop_thread = threading.current_thread()
+        checks = []
+        real_run = subprocess.run
+
+        def run(*args, **kwargs):
+            checks.append(threading.current_thread())
+            return real_run(*args, **kwargs)
+
+        monkeypatch.setattr(subprocess, "run", run)
+        service = ExportService(exports_dir=tmp_path / "exports")
+        await service.export_to_pdf_async("# Beam", "beam")
+
+        assert checks
+        assert loop_thread not in checks
+
+
+class TestLatexFragments:
+    """Test per-section LaTeX conversion caching (fake pandoc and pdflatex)."""
+
+    DOCUMENT = (
+        "# Beam\n\nSpan [L][span] = 6 m\n\n"
+        "## Loads\n\n```python\n# not a heading\n```\n\n"
+        "## Checks\n\nM = 45 kNm\n\n[span]: #span\n"
+    )
+
+    def test_split_sections(self):
+        """Test documents split at level 1-2 headings, outside code blocks."""
+        from app.services.latex_fragments import definitions, split_sections
+
+        sections = split_sections(self.DOCUMENT)
+
+        assert [section.split("\n")[0] for section in sections] == [
+            "# Beam",
+            "## Loads",
+            "## Checks",
+        ]
+        assert "\n".join(sections) == self.DOCUMENT
+        assert definitions(self.DOCUMENT) == "[span]: #span"
+
+    def test_definitions_keep_continuation_lines(self):
+        """Test multi-line footnotes and link titles are copied whole, and nothing after them."""
+        from app.services.latex_fragments import definitions
+
+        markdown = (
+            "# Beam\n\nSee[^code] and [EC2].\n\n"
+            "[^code]: Loads per EN 1991,\nfactored to ULS.\n\n    Deflection per SLS.\n"
+            '[EC2]: https://example.com/ec2\n    "Eurocode 2"\n\n'
+            "Closing remarks.\n\n    indented code\n"
+        )
+
+        assert definitions(markdown) == (
+            "[^code]: Loads per EN 1991,\nfactored to ULS.\n\n    Deflection per SLS.\n\n"
+            '[EC2]: https://example.com/ec2\n    "Eurocode 2"'
+        )
+
+    def test_only_changed_sections_reconverted(self, fake_latex, fake_pandoc, tmp_path):
+        """Test an edit reconverts just its section, and the PDF has every section."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        service.export_to_pdf(self.DOCUMENT, "beam", metadata={"title": "Beam"})
+        edited = self.DOCUMENT.replace("M = 45 kNm", "M = 50 kNm")
+        output = service.export_to_pdf(edited, "beam", metadata={"title": "Beam"})
+
+        latex_inputs = [
+            source
+            for call, source in zip(fake_pandoc.calls, fake_pandoc.inputs)
+            if "-t latex" in call
+        ]
+        assert len(latex_inputs) == 2
+        assert "## Loads" in latex_inputs[0]
+        assert "## Loads" not in latex_inputs[1]
+        assert "M = 50 kNm" in latex_inputs[1]
+        assert "[span]: #span" in latex_inputs[1]  # Definitions travel with every section
+
+        pdf = output.read_text()
+        assert pdf.index("# Beam") < pdf.index("## Loads") < pdf.index("M = 50 kNm")
+        assert "EngiCalcFragment" not in pdf
+        assert "struck" not in pdf  # The feature sampler stays out of the body
+
+    def test_fully_cached_document_skips_pandoc(self, fake_latex, fake_pandoc, tmp_path):
+        """Test a document whose sections are all cached needs no conversion."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        service.cache.max_bytes = 0  # Bypass the whole-artifact cache
+        service.export_to_pdf(self.DOCUMENT, "beam")
+        output = service.export_to_pdf(self.DOCUMENT, "beam_again")
+
+        assert sum("-t latex" in call for call in fake_pandoc.calls) == 1
+        assert "M = 45 kNm" in output.read_text()
+
+    def test_title_change_keeps_sections(self, fake_latex, fake_pandoc, tmp_path):
+        """Test template variables reconvert the wrapper but reuse the sections."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        service.export_to_pdf(self.DOCUMENT, "beam", metadata={"title": "Rev A"})
+        output = service.export_to_pdf(self.DOCUMENT, "beam", metadata={"title": "Rev B"})
+
+        assert "## Loads" not in fake_pandoc.inputs[-1]
+        assert "\\title{Rev B}" in output.read_text()
+        assert "## Checks" in output.read_text()
+
+
+class TestPandocPipe:
+    """Test PDF exports feed pandoc through stdin (uses a fake pandoc)."""
+
+    def test_no_intermediate_markdown_file(self, fake_pandoc, tmp_path):
+        """Test Markdown is piped to pandoc instead of written to the exports dir."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        output = service.export_to_pdf("# Beam\n\nM = 45 kNm", "beam")
+
+        assert "M = 45 kNm" in output.read_text()
+        assert not any(".md" in call for call in fake_pandoc.calls)
+        visible = [p.name for p in service.exports_dir.iterdir() if not p.name.startswith(".")]
+        assert visible == ["beam.pdf"]
+        assert not list(service.exports_dir.glob(".render-*"))
+
+    def test_failed_export_leaves_no_partial_output(self, fake_pandoc, tmp_path):
+        """Test a failed render doesn't leave a PDF or scratch dir behind."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        with pytest.raises(RuntimeError, match="Error producing PDF"):
+            service.export_to_pdf("FAIL", "broken")
+
+        assert not (service.exports_dir / "broken.pdf").exists()
+        assert not list(service.exports_dir.glob(".render-*"))
+
+    @pytest.mark.asyncio
+    async def test_concurrent_exports_use_separate_scratch_dirs(self, fake_pandoc, tmp_path):
+        """Test simultaneous async exports don't collide."""
+        import asyncio
+
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        outputs = await asyncio.gather(
+            *(service.export_to_pdf_async(f"# Sheet {i}", f"sheet{i}") for i in range(4))
+        )
+
+        for i, output in enumerate(outputs):
+            assert f"# Sheet {i}" in output.read_text()
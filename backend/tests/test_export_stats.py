@@ -0,0 +1,105 @@
+"""Tests for export stage timings."""
+
+import pytest
+from app.services.export_service import ExportService
+from app.services.export_stats import ExportTimer, server_timing
+
+
+@pytest.fixture
+def service(tmp_path):
+    return ExportService(exports_dir=tmp_path / "exports")
+
+
+class TestExportStats:
+    """Test stage timings, sizes and cache status of exports."""
+
+    def test_pdf_stages_attributed(self, fake_latex, service):
+        """Test pandoc and LaTeX runs are timed separately."""
+        timer = ExportTimer("pdf")
+        path = service.export_to_pdf("# Beam", "beam", timer=timer)
+        stats = timer.stats
+
+        assert stats.cache == "miss"
+        assert stats.processes == 3  # Pandoc, format dump, compile
+        assert stats.pandoc_seconds > 0
+        assert stats.engine_seconds > 0
+        assert stats.size_bytes == path.stat().st_size
+        stages = (
+            stats.prepare_seconds
+            + stats.pandoc_seconds
+            + stats.engine_seconds
+            + stats.write_seconds
+        )
+        assert stages <= stats.total_seconds
+
+    def test_cache_hit_runs_nothing(self, fake_pandoc, service):
+        """Test a cached export reports a hit with no process time."""
+        service.export_to_pdf("# Beam", "beam")
+        timer = ExportTimer("pdf")
+        service.export_to_pdf("# Beam", "beam", timer=timer)
+
+        assert timer.stats.cache == "hit"
+        assert timer.stats.processes == 0
+        assert timer.stats.pandoc_seconds == 0
+
+    def test_cache_disabled(self, fake_pandoc, service):
+        """Test exports report when the artifact cache is off."""
+        service.cache.max_bytes = 0
+        timer = ExportTimer("pdf")
+        service.export_to_pdf("# Beam", "beam", timer=timer)
+
+        assert timer.stats.cache == "disabled"
+
+    @pytest.mark.asyncio
+    async def test_async_export_and_summary(self, fake_pandoc, service):
+        """Test async exports are timed and every export lands in the summary."""
+        timer = ExportTimer("pdf")
+        await service.export_to_pdf_async("# Beam", "beam", timer=timer)
+        await service.export_to_pdf_async("# Beam", "beam")
+        service.export_to_html("# Beam", "beam")
+
+        summary = service.stats.summary()
+
+        assert timer.stats.pandoc_seconds > 0
+        assert summary.exports == 3
+        assert summary.cache_hits == 1
+        assert summary.recent[0].format == "html"
+        assert summary.avg_total_seconds > 0
+
+    def test_server_timing_header(self):
+        """Test stats format as a Server-Timing header in milliseconds."""
+        from app.models.export import ExportStats
+
+        stats = ExportStats(format="pdf", pandoc_seconds=0.25, total_seconds=0.5)
+
+        assert server_timing(stats) == (
+            "prepare;dur=0.0, pandoc;dur=250.0, engine;dur=0.0, write;dur=0.0, total;dur=500.0"
+        )
+
+
+class TestExportStatsRoutes:
+    """Test timings are exposed over HTTP."""
+
+    def test_headers_and_stats_endpoint(self, fake_pandoc, service, monkeypatch):
+        """Test export responses carry timings and the stats endpoint aggregates them."""
+        from fastapi.testclient import TestClient
+
+        import app.api.export as export_api
+        from app.main import app
+        from app.services.export_jobs import ExportJobManager
+
+        monkeypatch.setattr(export_api, "export_service", service)
+        monkeypatch.setattr(export_api, "export_job_manager", ExportJobManager(service))
+
+        with TestClient(app) as client:
+            request = {"markdown_content": "# Beam", "output_filename": "beam"}
+            pdf = client.post("/api/export/pdf", json=request)
+            html = client.post("/api/export/html", json=request)
+            stats = client.get("/api/export/stats").json()
+
+        assert pdf.status_code == 200
+        assert "pandoc;dur=" in pdf.headers["server-timing"]
+        assert pdf.headers["x-export-cache"] == "miss"
+        assert "total;dur=" in html.headers["server-timing"]
+        assert stats["exports"] == 2
+        assert {export["format"] for export in stats["recent"]} == {"pdf", "html"}
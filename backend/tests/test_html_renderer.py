@@ -0,0 +1,79 @@
+"""Tests for server-side HTML rendering of exports."""
+
+from app.services.html_renderer import HtmlRenderer, MathRenderer
+
+
+class TestHtmlRenderer:
+    """Test Markdown rendering to a self-contained page."""
+
+    def test_renders_markdown_without_external_resources(self, monkeypatch):
+        """Test headings, tables and code render with nothing loaded from the network."""
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "PANDOC_PATH", "/nonexistent/pandoc")
+        page = HtmlRenderer(MathRenderer()).render_document(
+            "# Beam\n\n| Load | kN |\n|------|----|\n| w | 10 |\n\n"
+            "```python\nM = w * L**2 / 8\n```\n"
+        )
+
+        assert page.startswith("<!DOCTYPE html>")
+        assert "<h1>Beam</h1>" in page
+        assert "<table>" in page
+        assert "<style>" in page
+        assert "<script" not in page
+        assert "http" not in page
+
+    def test_math_delimiters(self, monkeypatch):
+        """Test $ and $$ are math, except in code or when used as currency."""
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "PANDOC_PATH", "/nonexistent/pandoc")
+        body = HtmlRenderer(MathRenderer()).render_body(
+            "Load $w = 10$ kN/m costs $5 or $6.\n\n`echo $HOME$`\n\n$$\nM = \\frac{wL^2}{8}\n$$\n"
+        )
+
+        assert body.count('display="inline"') == 1
+        assert "costs $5 or $6." in body
+        assert "<code>echo $HOME$</code>" in body
+        assert body.count('display="block"') == 1
+
+    def test_math_without_pandoc_is_mathml(self, monkeypatch):
+        """Test math is still converted to MathML when pandoc is unavailable."""
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "PANDOC_PATH", "/nonexistent/pandoc")
+        page = HtmlRenderer(MathRenderer()).render_document(
+            "Stress $\\sigma = M / W$\n\n$$\n\\frac{M}{W} \\le f_y\n$$\n"
+        )
+
+        assert '<math display="inline">' in page
+        assert "<mi>&#x003C3;</mi>" in page
+        assert '<math display="block">' in page
+        assert "<mfrac>" in page
+        assert "\\frac" not in page
+        assert "http" not in page
+
+    def test_math_rendered_once_per_expression(self, fake_pandoc):
+        """Test expressions are batch-converted to MathML and cached by hash."""
+        renderer = HtmlRenderer(MathRenderer())
+
+        first = renderer.render_body("$a^2$ and $b^2$\n\n$$c^2$$\n")
+        second = renderer.render_body("Again: $b^2$ then $a^2$\n")
+
+        assert len(fake_pandoc.calls) == 1
+        assert "--mathml" in fake_pandoc.calls[0]
+        assert "<math>a^2</math>" in first
+        assert '<math display="block">c^2</math>' in first
+        assert "<math>b^2</math>" in second
+
+    def test_html_export_served_from_cache(self, fake_pandoc, tmp_path):
+        """Test an identical HTML export reuses the cached artifact."""
+        from app.services.export_service import ExportService
+
+        service = ExportService(exports_dir=tmp_path / "exports")
+        first = service.export_to_html("# Beam\n\n$M = 45$ kNm", "beam")
+        second = service.export_to_html("# Beam\n\n$M = 45$ kNm", "beam_copy")
+
+        assert second.name == "beam_copy.html"
+        assert second.read_text() == first.read_text()
+        assert list(service.cache.cache_dir.glob("*.html"))
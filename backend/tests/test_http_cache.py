@@ -0,0 +1,69 @@
+"""Tests for conditional GET on document and template endpoints."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import document as document_api
+from app.api import template as template_api
+from app.main import app
+from app.models.document import DocumentMetadata
+from app.services.document_service import DocumentService
+from app.services.template_service import TemplateService
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Test client with services backed by temporary directories."""
+    documents = DocumentService(documents_dir=tmp_path / "documents", fsync=False)
+    documents.save_document("calc.md", DocumentMetadata(title="Beam"), "L = 5 m")
+    templates = TemplateService(templates_dir=tmp_path / "templates")
+    (tmp_path / "templates" / "beam.md").write_text("---\nname: Beam\n---\nL = {{L}}")
+
+    monkeypatch.setattr(document_api, "document_service", documents)
+    monkeypatch.setattr(template_api, "template_service", templates)
+    return TestClient(app)
+
+
+class TestConditionalGet:
+    """Test ETag / Last-Modified validation."""
+
+    @pytest.mark.parametrize("path", ["/api/document/calc.md", "/api/template/beam.md"])
+    def test_validators_present(self, client, path):
+        """Test responses carry a strong ETag and Last-Modified."""
+        response = client.get(path)
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["etag"].strip('"') == response.json()["version"]
+        assert "last-modified" in response.headers
+
+    @pytest.mark.parametrize("path", ["/api/document/calc.md", "/api/template/beam.md"])
+    def test_if_none_match_returns_304(self, client, path):
+        """Test a matching ETag yields 304 with no body."""
+        etag = client.get(path).headers["etag"]
+
+        response = client.get(path, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_changed_document_returns_200(self, client):
+        """Test a stale ETag gets the new content."""
+        etag = client.get("/api/document/calc.md").headers["etag"]
+        client.put("/api/document/calc.md", json={"content": "L = 6 m"})
+
+        response = client.get("/api/document/calc.md", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["content"] == "L = 6 m"
+
+    def test_if_modified_since_returns_304(self, client):
+        """Test If-Modified-Since at or after Last-Modified yields 304."""
+        last_modified = client.get("/api/template/beam.md").headers["last-modified"]
+
+        response = client.get(
+            "/api/template/beam.md", headers={"If-Modified-Since": last_modified}
+        )
+
+        assert response.status_code == 304
@@ -23,6 +23,17 @@ c = a + b
         # For simple assignments, handcalcs might not generate LaTeX
         # This is expected behavior
 
+    def test_latex_rendered_from_source(self):
+        """Test handcalcs LaTeX is produced, skipping print statements."""
+        code = "a = 2\nprint(a)\nb = a * 3"
+        block = CalculationBlock(code=code)
+        result = calculation_engine.execute_block(block, {})
+
+        assert result.latex.startswith("\\begin{aligned}")
+        assert "b &= a \\cdot 3" in result.latex
+        assert "print" not in result.latex
+        assert result.output == "2\n"
+
     def test_latex_generation_with_units(self):
         """Test LaTeX generation with Pint units."""
         code = """
@@ -0,0 +1,182 @@
+"""Tests for content-addressed document revision history."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import document as document_api
+from app.main import app
+from app.models.document import DocumentMetadata
+from app.services.document_service import DocumentService
+from app.services.revision_store import RevisionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Revision store in a temporary directory."""
+    return RevisionStore(tmp_path / "history", fsync=False)
+
+
+def _calc(lines: int, changed: int = -1) -> str:
+    """Build a long calculation document, optionally changing one line."""
+    return "".join(
+        f"M_{i} = {i * 2 if i == changed else i} * ureg.kN * ureg.m\n" for i in range(lines)
+    )
+
+
+class TestRevisionStore:
+    """Test object storage, deduplication and deltas."""
+
+    def test_record_and_rebuild(self, store):
+        """Test every recorded revision can be rebuilt exactly."""
+        texts = [_calc(200), _calc(200, changed=50), _calc(200, changed=120), _calc(10)]
+        for text in texts:
+            store.record("calc.md", text)
+
+        revisions = store.list_revisions("calc.md")
+        assert [r.number for r in revisions] == [1, 2, 3, 4]
+        for revision, text in zip(revisions, texts):
+            store._cached_text.cache_clear()
+            assert store.get_text(revision.version) == text
+
+    def test_identical_saves_are_deduplicated(self, store):
+        """Test unchanged saves add no revision and shared content one object."""
+        store.record("a.md", "same")
+        store.record("a.md", "same")
+        store.record("b.md", "same")
+
+        assert len(store.list_revisions("a.md")) == 1
+        assert len(list(store.objects_dir.rglob("*"))) == 2  # one bucket dir + one object
+
+    def test_small_edits_store_small_deltas(self, store):
+        """Test storage grows with the size of the change, not the document."""
+        store.record("calc.md", _calc(2000))
+        full_size = sum(p.stat().st_size for p in store.objects_dir.rglob("*") if p.is_file())
+
+        store.record("calc.md", _calc(2000, changed=1000))
+        total = sum(p.stat().st_size for p in store.objects_dir.rglob("*") if p.is_file())
+
+        assert total - full_size < full_size / 10
+
+    def test_delta_chain_is_bounded(self, tmp_path):
+        """Test a full snapshot is stored once the delta chain limit is reached."""
+        store = RevisionStore(tmp_path, max_delta_chain=2, fsync=False)
+        for i in range(4):
+            store.record("calc.md", _calc(200, changed=i))
+
+        kinds = [store._read_object(r.version)["type"] for r in store.list_revisions("calc.md")]
+        assert kinds == ["full", "delta", "delta", "full"]
+
+    def test_find_revision(self, store):
+        """Test versions are looked up in the in-memory log, which matches the one on disk."""
+        versions = [store.record("calc.md", f"L = {i}").version for i in range(5)]
+        store.record("calc.md", "L = 0")  # saved again as the first version
+
+        assert store.find_revision("calc.md", versions[0]).number == 1
+        assert store.find_revision("calc.md", versions[3]).number == 4
+        assert store.find_revision("calc.md", "0" * 64) is None
+
+        reopened = RevisionStore(store.root, fsync=False)
+        assert reopened.list_revisions("calc.md") == store.list_revisions("calc.md")
+
+    def test_log_cache_is_bounded(self, tmp_path):
+        """Test least recently used logs are dropped and reloaded from disk."""
+        store = RevisionStore(tmp_path, log_cache_size=2, fsync=False)
+        for name in ("a.md", "b.md", "c.md"):
+            store.record(name, name)
+
+        assert list(store._logs) == ["b.md", "c.md"]
+        assert store.find_revision("a.md", store.list_revisions("a.md")[0].version).number == 1
+
+    def test_diff(self, store):
+        """Test unified diffs between versions."""
+        old = store.record("calc.md", "L = 5\nw = 10\n")
+        new = store.record("calc.md", "L = 6\nw = 10\n")
+
+        diff = store.diff(old.version, new.version, "calc.md")
+
+        assert "-L = 5" in diff
+        assert "+L = 6" in diff
+        assert "w = 10" in diff
+
+
+class TestDocumentHistory:
+    """Test revision history through the document service."""
+
+    def test_saves_are_recorded(self, tmp_path):
+        """Test each save is retrievable as a past revision."""
+        service = DocumentService(documents_dir=tmp_path, fsync=False)
+        first = service.save_document("calc.md", DocumentMetadata(revision="A"), "L = 5")
+        service.save_document("calc.md", DocumentMetadata(revision="B"), "L = 6")
+
+        revisions = service.list_revisions("calc.md")
+        assert len(revisions) == 2
+        assert revisions[0].version == first.version
+
+        old = service.load_revision("calc.md", first.version)
+        assert old.content == "L = 5"
+        assert old.metadata.revision == "A"
+
+        diff = service.diff_revisions("calc.md", revisions[0].version, revisions[1].version)
+        assert "+L = 6" in diff.diff
+
+        with pytest.raises(FileNotFoundError):
+            service.load_revision("calc.md", "0" * 64)
+
+    def test_coalesced_saves_are_one_revision(self, tmp_path):
+        """Test a burst of autosaves is recorded once, when it is written."""
+        service = DocumentService(documents_dir=tmp_path, coalesce_window=60, fsync=False)
+        service.save_document("calc.md", DocumentMetadata(), "L = 5")
+        for i in range(6, 10):
+            service.save_document("calc.md", DocumentMetadata(), f"L = {i}")
+
+        assert len(service.revisions.list_revisions("calc.md")) == 1
+
+        revisions = service.list_revisions("calc.md")
+        assert len(revisions) == 2
+        assert service.load_revision("calc.md", revisions[-1].version).content == "L = 9"
+
+    def test_history_is_not_listed(self, tmp_path):
+        """Test the history directory never shows up as a project folder."""
+        service = DocumentService(documents_dir=tmp_path, fsync=False)
+        service.save_document("calc.md", DocumentMetadata(), "L = 5")
+
+        assert service.list_folders() == []
+        assert [d["filename"] for d in service.list_documents(recursive=True)] == ["calc.md"]
+
+
+class TestRevisionEndpoints:
+    """Test the history routes."""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        """Test client with a document saved twice."""
+        service = DocumentService(documents_dir=tmp_path, fsync=False)
+        service.save_document("calc.md", DocumentMetadata(), "L = 5")
+        service.save_document("calc.md", DocumentMetadata(), "L = 6")
+        monkeypatch.setattr(document_api, "document_service", service)
+        return TestClient(app)
+
+    def test_history_routes(self, client):
+        """Test listing, loading and diffing revisions."""
+        revisions = client.get("/api/document/calc.md/revisions").json()["revisions"]
+        first, second = (r["version"] for r in revisions)
+
+        old = client.get("/api/document/calc.md/revision", params={"version": first})
+        assert old.json()["content"] == "L = 5"
+
+        diff = client.get(
+            "/api/document/calc.md/diff", params={"from_version": first, "to_version": second}
+        )
+        assert "+L = 6" in diff.json()["diff"]
+
+    def test_documents_in_history_named_folders(self, client):
+        """Test documents in folders named like history routes are served as documents."""
+        client.post(
+            "/api/document/create",
+            json={"filename": "proj/revisions/calc.md", "metadata": {}, "content": "L = 7"},
+        )
+
+        response = client.get("/api/document/proj/revisions/calc.md")
+
+        assert response.status_code == 200
+        assert response.json()["content"] == "L = 7"
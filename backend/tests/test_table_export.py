@@ -0,0 +1,129 @@
+"""Tests for exporting calc variables as tables."""
+
+import csv
+import io
+
+import pytest
+from app.services.calculation_engine import calculation_engine
+from app.services.document_executor import DocumentExecutor
+from app.services.table_export import TableCase, TableExportService, TableSource
+
+BEAM = """# Beam
+
+```python
+%%calc
+L = 6 * ureg.m
+M = w * L**2 / 8
+label = "simply supported"
+```
+"""
+
+SWEEP = """# Sweep
+
+```python
+%%calc
+spans = [4 * ureg.m, 5 * ureg.m, 6000 * ureg.mm]
+w = 10 * ureg.kN / ureg.m
+```
+"""
+
+
+@pytest.fixture
+def service():
+    return TableExportService(
+        DocumentExecutor(calculation_engine), calculation_engine, batch_rows=2
+    )
+
+
+def read_csv(chunks):
+    return list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+
+
+def load(magnitude, units):
+    return {"magnitude": magnitude, "units": units}
+
+
+class TestTableExport:
+    """Test calc variables streamed as rows."""
+
+    def test_one_row_per_case_with_units_in_headers(self, service):
+        """Test each case runs the document and columns carry units."""
+        cases = [
+            TableCase("light", {"w": load(10, "kilonewton / meter")}),
+            TableCase("heavy", {"w": load(20000, "newton / meter")}),
+        ]
+        rows = read_csv(service.iter_csv([TableSource("beam.md", BEAM)], cases))
+
+        assert rows[0] == ["document", "case", "w [kN/m]", "L [m]", "M [kN·m]", "label"]
+        assert rows[1] == ["beam.md", "light", "10.0", "6.0", "45.0", "simply supported"]
+        # Converted to the units of the column
+        assert rows[2][:3] == ["beam.md", "heavy", "20.0"]
+        assert float(rows[2][4]) == pytest.approx(90.0)
+
+    def test_lists_expand_into_rows(self, service):
+        """Test a sweep variable gives a row per element, scalars repeated."""
+        rows = read_csv(service.iter_csv([TableSource("sweep.md", SWEEP)]))
+
+        assert rows[0] == ["document", "case", "spans [m]", "w [kN/m]"]
+        assert [row[2:] for row in rows[1:]] == [["4.0", "10.0"], ["5.0", "10.0"], ["6.0", "10.0"]]
+
+    def test_requested_columns_and_many_documents(self, service):
+        """Test explicit columns apply to every document, blank where undefined."""
+        sources = [TableSource("sweep.md", SWEEP), TableSource("beam.md", BEAM)]
+        cases = [TableCase("", {"w": load(10, "kilonewton / meter")})]
+        rows = read_csv(service.iter_csv(sources, cases, variables=["w", "M"]))
+
+        assert rows[0] == ["document", "case", "w [kN/m]", "M"]
+        assert rows[1] == ["sweep.md", "", "10.0", ""]
+        assert rows[2][0] == "beam.md"
+        assert rows[2][3] == "45.0 kN·m"  # No units known for M from the first case
+
+    def test_streamed_in_batches(self, service):
+        """Test rows are written incrementally rather than all at once."""
+        chunks = list(service.iter_csv([TableSource("sweep.md", SWEEP)]))
+        assert len(chunks) == 2  # Header and 2 rows, then the last row
+
+    def test_columnar_formats(self, service):
+        """Test Parquet and Arrow IPC round-trip when pyarrow is installed."""
+        pyarrow = pytest.importorskip("pyarrow")
+        ipc = pytest.importorskip("pyarrow.ipc")
+        parquet_io = pytest.importorskip("pyarrow.parquet")
+
+        source = [TableSource("sweep.md", SWEEP)]
+        parquet = b"".join(service.iter_columnar("parquet", source))
+        arrow = b"".join(service.iter_columnar("arrow", source))
+
+        table = parquet_io.read_table(pyarrow.BufferReader(parquet))
+        assert table.column_names == ["document", "case", "spans [m]", "w [kN/m]"]
+        assert table.column("spans [m]").to_pylist() == [4.0, 5.0, 6.0]
+        assert ipc.open_stream(arrow).read_all().equals(table)
+
+
+class TestTableExportRoute:
+    """Test the table export endpoint."""
+
+    def test_export_csv(self, tmp_path, monkeypatch):
+        """Test documents are loaded and streamed as a CSV download."""
+        from fastapi.testclient import TestClient
+
+        import app.api.export as export_api
+        from app.main import app
+        from app.models.document import DocumentMetadata
+        from app.services.document_service import DocumentService
+
+        documents = DocumentService(documents_dir=tmp_path / "documents", fsync=False)
+        documents.save_document("sweep.md", DocumentMetadata(), SWEEP)
+        documents.flush()
+        monkeypatch.setattr(export_api, "document_service", documents)
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/api/export/table", json={"filenames": ["sweep.md"], "output_filename": "spans"}
+            )
+            missing = client.post("/api/export/table", json={"filenames": ["missing.md"]})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert 'filename="spans.csv"' in response.headers["content-disposition"]
+        assert response.text.splitlines()[0] == "document,case,spans [m],w [kN/m]"
+        assert missing.status_code == 404
@@ -0,0 +1,297 @@
+"""Tests for the template service."""
+
+import os
+
+import pytest
+from app.services.template_service import TemplateService
+
+BEAM = """---
+name: "Beam"
+variables: ["project_name"]
+---
+
+# {{project_name}}
+
+Span: {{span}}
+"""
+
+
+@pytest.fixture
+def service(tmp_path):
+    (tmp_path / "beam.md").write_text(BEAM, encoding="utf-8")
+    return TemplateService(templates_dir=tmp_path)
+
+
+class TestRenderTemplate:
+    """Test rendering through the shared Jinja2 environment."""
+
+    def test_renders_body_without_frontmatter(self, service):
+        """Test variables are substituted and the frontmatter is left out."""
+        rendered = service.render_template("beam.md", {"project_name": "Bridge", "span": "6 m"})
+
+        assert rendered == "# Bridge\n\nSpan: 6 m"
+
+    def test_compiled_template_reused(self, service):
+        """Test an unchanged template is compiled once."""
+        service.render_template("beam.md", {})
+        compiled = service.environment.get_template("beam.md")
+        service.render_template("beam.md", {"project_name": "Bridge"})
+
+        assert service.environment.get_template("beam.md") is compiled
+
+    def test_edited_template_recompiled(self, service, tmp_path):
+        """Test a changed file is picked up by its mtime."""
+        service.render_template("beam.md", {})
+        path = tmp_path / "beam.md"
+        path.write_text("Edited {{span}}", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert service.render_template("beam.md", {"span": "6 m"}) == "Edited 6 m"
+
+    def test_bytecode_persisted(self, service, tmp_path):
+        """Test a new service loads compiled bytecode written by an earlier one."""
+        service.render_template("beam.md", {})
+
+        assert list((tmp_path / ".cache").glob("__jinja2_*.cache"))
+        fresh = TemplateService(templates_dir=tmp_path)
+        assert fresh.render_template("beam.md", {"project_name": "Bridge"}).startswith("# Bridge")
+
+    def test_missing_template(self, service):
+        """Test unknown or escaping template names raise FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            service.render_template("missing.md", {})
+        with pytest.raises(FileNotFoundError):
+            service.render_template("../beam.md", {})
+
+
+class TestTemplateCatalog:
+    """Test listing and loading from the mtime-validated catalog."""
+
+    def test_unchanged_templates_not_reread(self, service, monkeypatch):
+        """Test a second listing and a load reuse the parsed templates."""
+        first = service.list_templates()
+        monkeypatch.setattr(service, "_read_template", lambda filename: pytest.fail(filename))
+
+        assert service.list_templates() == first
+        assert service.load_template("beam.md") is first[0]
+
+    def test_changes_picked_up(self, service, tmp_path):
+        """Test edited, added and deleted templates are reflected."""
+        service.list_templates()
+        (tmp_path / "beam.md").write_text("---\nname: Beam v2\n---\n\nSpan", encoding="utf-8")
+        (tmp_path / "column.md").write_text("# {{height}}", encoding="utf-8")
+
+        templates = service.list_templates()
+        assert [t.metadata.name for t in templates] == ["Beam v2", "column"]
+        assert templates[1].metadata.variables == ["height"]
+
+        (tmp_path / "column.md").unlink()
+        assert [t.filename for t in service.list_templates()] == ["beam.md"]
+        with pytest.raises(FileNotFoundError):
+            service.load_template("column.md")
+
+    def test_variables_from_ast(self, service, tmp_path):
+        """Test filters, whitespace and loops are understood, declared order kept first."""
+        (tmp_path / "schedule.md").write_text(
+            "---\nvariables: [project_name]\n---\n\n"
+            "{{ date }} {{ engineer | upper }} {{project_name}}\n"
+            "{% for member in members %}{{ member.name }} {{ loop.index }}{% endfor %}\n"
+            "{% set total = 1 %}{{ total }} {{ range(3) | list }}",
+            encoding="utf-8",
+        )
+
+        template = service.load_template("schedule.md")
+
+        assert template.metadata.variables == ["project_name", "date", "engineer", "members"]
+
+    def test_variables_cached_per_version(self, service, tmp_path, monkeypatch):
+        """Test an mtime change without a content change doesn't re-analyse the template."""
+        service.load_template("beam.md")
+        monkeypatch.setattr(service, "_extract_variables", lambda content: pytest.fail(content))
+        path = tmp_path / "beam.md"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert service.load_template("beam.md").metadata.variables == ["project_name", "span"]
+
+    def test_unparseable_template_falls_back(self, service, tmp_path):
+        """Test a template with a syntax error still lists its placeholders."""
+        (tmp_path / "broken.md").write_text("{{span}} {% if %}", encoding="utf-8")
+
+        assert service.load_template("broken.md").metadata.variables == ["span"]
+
+    def test_calc_blocks_precompiled_and_checked(self, tmp_path):
+        """Test static calc blocks seed the engine and broken blocks are flagged."""
+        from app.services.calculation_engine import CalculationEngine
+
+        engine = CalculationEngine()
+        (tmp_path / "calc.md").write_text(
+            "```python\n%%calc\nL = 6 * ureg.m\n```\n\n"
+            "```python\n%%calc\nw = {{ load }} * ureg.kN / ureg.m\nM = w * L**2 / 8 * k\n```\n\n"
+            "```python\n%%calc\nif M >\n```\n",
+            encoding="utf-8",
+        )
+        service = TemplateService(templates_dir=tmp_path, engine=engine)
+
+        template = service.load_template("calc.md")
+
+        assert template.calc_blocks == 3
+        assert template.calc_errors == [
+            "Calc block 2: NameError: name 'k' is not defined (line 2)",
+            "Calc block 3: SyntaxError: invalid syntax (line 1)",
+        ]
+        # Only the block without template markup is compiled ahead
+        assert list(engine._compiled) == ["L = 6 * ureg.m\n"]
+
+    def test_list_endpoint_revalidates(self, service, monkeypatch):
+        """Test the listing carries an ETag and answers 304 while unchanged."""
+        from fastapi.testclient import TestClient
+
+        import app.api.template as template_api
+        from app.main import app
+
+        monkeypatch.setattr(template_api, "template_service", service)
+
+        with TestClient(app) as client:
+            response = client.get("/api/template/list")
+            etag = response.headers["etag"]
+            again = client.get("/api/template/list", headers={"If-None-Match": etag})
+
+        assert response.json()["count"] == 1
+        assert again.status_code == 304
+
+
+CALC_TEMPLATE = """---
+name: "Member check"
+---
+
+# {{ member }}
+
+```python
+%%calc
+L = {{ span }} * ureg.m
+```
+"""
+
+
+@pytest.fixture
+def batch(tmp_path):
+    from app.services.document_executor import DocumentExecutor
+    from app.services.document_service import DocumentService
+    from app.services.template_batch import TemplateBatchService
+
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "member.md").write_text(CALC_TEMPLATE, encoding="utf-8")
+    documents = DocumentService(documents_dir=tmp_path / "documents", fsync=False)
+    service = TemplateBatchService(
+        TemplateService(templates_dir=templates_dir), documents, DocumentExecutor(), max_workers=1
+    )
+    yield service
+    service.shutdown()
+
+
+class TestTemplateBatch:
+    """Test instantiating a template once per row of variables."""
+
+    def test_rows_become_documents(self, batch):
+        """Test each row is rendered into its own document in one import."""
+        from app.models.document import DocumentMetadata
+
+        result = batch.instantiate(
+            "member.md",
+            [{"member": "B1", "span": "6"}, {"member": "B2", "span": "4.5"}],
+            filename_pattern="{{ member | lower }}",
+            folder="schedule",
+            metadata=DocumentMetadata(project="Depot"),
+        )
+
+        assert (result.created, result.failed) == (2, 0)
+        assert [item.filename for item in result.items] == ["schedule/b1.md", "schedule/b2.md"]
+        doc = batch.documents.load_document("schedule/b2.md")
+        assert doc.metadata.project == "Depot"
+        assert "# B2" in doc.content
+        assert "L = 4.5 * ureg.m" in doc.content
+
+    def test_failures_summarized(self, batch):
+        """Test duplicate names, failing calcs and existing documents are reported per row."""
+        batch.instantiate(
+            "member.md", [{"member": "B1", "span": "6"}], filename_pattern="{{ member }}"
+        )
+
+        result = batch.instantiate(
+            "member.md",
+            [
+                {"member": "B1", "span": "6"},
+                {"member": "B2", "span": "oops"},
+                {"member": "B3", "span": "5"},
+                {"member": "B3", "span": "7"},
+            ],
+            filename_pattern="{{ member }}",
+            execute=True,
+        )
+
+        assert [item.status for item in result.items] == ["skipped", "failed", "created", "failed"]
+        assert "Calc block 1 failed" in result.items[1].error
+        assert "row 3" in result.items[3].error
+        assert (result.created, result.skipped, result.failed) == (1, 1, 2)
+        assert result.executed == 3  # B1, B2 and B3 (the duplicate never rendered)
+        assert not batch.documents.document_exists("B2.md")
+
+    def test_filename_pattern_is_sandboxed(self, batch):
+        """Test patterns can't reach Python internals or escape the documents folder."""
+        result = batch.instantiate(
+            "member.md",
+            [{"member": "B1", "span": "6"}, {"member": "../B2", "span": "6"}],
+            filename_pattern="{{ member }}{{ ''.__class__.__mro__ if row == 1 else '' }}",
+        )
+
+        assert [item.status for item in result.items] == ["failed", "failed"]
+        assert "unsafe" in result.items[0].error
+        assert "Invalid document path" in result.items[1].error
+        assert result.created == 0
+
+    def test_calcs_checked_in_process_pool(self, batch):
+        """Test distinct documents are executed across worker processes."""
+        batch.max_workers = 2
+        rows = [{"member": f"B{n}", "span": str(n % 2 + 1)} for n in range(4)]
+
+        result = batch.instantiate("member.md", rows, execute=True)
+
+        assert result.created == 4
+        assert result.workers == 2
+        assert result.executed == 4
+
+        pool = batch._pool
+        rows = [{"member": f"C{n}", "span": str(n + 3)} for n in range(2)]
+        second = batch.instantiate("member.md", rows, filename_pattern="{{ member }}", execute=True)
+        assert second.created == 2
+        assert batch._pool is pool  # Reused, not respawned per batch
+
+    def test_csv_rows_through_endpoint(self, batch, monkeypatch):
+        """Test the batch endpoint accepts CSV text and rejects unknown templates."""
+        from fastapi.testclient import TestClient
+
+        import app.api.template as template_api
+        from app.main import app
+
+        monkeypatch.setattr(template_api, "template_batch_service", batch)
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/api/template/batch",
+                json={"template_filename": "member.md", "csv": "member,span\nB1,6\nB2,4\n"},
+            )
+            missing = client.post(
+                "/api/template/batch", json={"template_filename": "missing.md", "rows": [{}]}
+            )
+            empty = client.post("/api/template/batch", json={"template_filename": "member.md"})
+
+        assert response.status_code == 200
+        assert [item["filename"] for item in response.json()["items"]] == [
+            "member-1.md",
+            "member-2.md",
+        ]
+        assert missing.status_code == 404
+        assert empty.status_code == 400
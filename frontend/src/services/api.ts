@@ -10,7 +10,13 @@ import type {
   CalculationRequest,
   CalculationResponse,
   Template,
+  TemplateBatchRequest,
+  TemplateBatchResult,
   ExportRequest,
+  ExportJob,
+  BatchExportResult,
+  TableExportRequest,
+  TextEdit,
 } from '../types'
 
 const API_BASE = '/api'
@@ -24,11 +30,16 @@ const api = axios.create({
 
 // Document API
 export const documentApi = {
-  list: async (): Promise<DocumentListItem[]> => {
-    const response = await api.get('/document/list')
+  list: async (folder: string = '', recursive: boolean = false): Promise<DocumentListItem[]> => {
+    const response = await api.get('/document/list', { params: { folder, recursive } })
     return response.data.documents
   },
 
+  folders: async (parent: string = ''): Promise<string[]> => {
+    const response = await api.get('/document/folders', { params: { parent } })
+    return response.data.folders
+  },
+
   get: async (filename: string): Promise<Document> => {
     const response = await api.get(`/document/${filename}`)
     return response.data
@@ -59,6 +70,20 @@ export const documentApi = {
     return response.data
   },
 
+  patch: async (
+    filename: string,
+    baseVersion: string,
+    edits: TextEdit[],
+    metadata?: DocumentMetadata
+  ): Promise<string> => {
+    const response = await api.patch(`/document/${filename}`, {
+      base_version: baseVersion,
+      edits,
+      metadata,
+    })
+    return response.data.version
+  },
+
   delete: async (filename: string): Promise<void> => {
     await api.delete(`/document/${filename}`)
   },
@@ -99,6 +124,11 @@ export const templateApi = {
     })
     return response.data.content
   },
+
+  batch: async (request: TemplateBatchRequest): Promise<TemplateBatchResult> => {
+    const response = await api.post('/template/batch', request)
+    return response.data
+  },
 }
 
 // Export API
@@ -121,6 +151,55 @@ export const exportApi = {
     const response = await api.get('/export/check-pandoc')
     return response.data
   },
+
+  submitJob: async (request: ExportRequest, format: 'pdf' | 'html' = 'pdf'): Promise<ExportJob> => {
+    const response = await api.post('/export/jobs', { ...request, format })
+    return response.data
+  },
+
+  getJob: async (jobId: string): Promise<ExportJob> => {
+    const response = await api.get(`/export/jobs/${jobId}`)
+    return response.data
+  },
+
+  downloadJob: async (jobId: string): Promise<Blob> => {
+    const response = await api.get(`/export/jobs/${jobId}/download`, {
+      responseType: 'blob',
+    })
+    return response.data
+  },
+
+  batch: async (
+    filenames: string[],
+    packageFilename?: string,
+    packageTitle?: string
+  ): Promise<BatchExportResult> => {
+    const response = await api.post('/export/batch', {
+      filenames,
+      package_filename: packageFilename,
+      package_title: packageTitle,
+    })
+    return response.data
+  },
+
+  downloadFile: async (filename: string): Promise<Blob> => {
+    const response = await api.get(`/export/files/${encodeURIComponent(filename)}`, {
+      responseType: 'blob',
+    })
+    return response.data
+  },
+
+  table: async (request: TableExportRequest): Promise<Blob> => {
+    const response = await api.post('/export/table', request, {
+      responseType: 'blob',
+    })
+    return response.data
+  },
+
+  cancelJob: async (jobId: string): Promise<ExportJob> => {
+    const response = await api.delete(`/export/jobs/${jobId}`)
+    return response.data
+  },
 }
 
 export default api
@@ -17,10 +17,18 @@ export interface Document {
   metadata: DocumentMetadata
   content: string
   raw_content: string
+  version: string
+}
+
+export interface TextEdit {
+  start: number
+  end: number
+  text: string
 }
 
 export interface DocumentListItem {
   filename: string
+  folder: string
   metadata: DocumentMetadata
   modified: number
   size: number
@@ -60,6 +68,36 @@ export interface Template {
     variables: string[]
   }
   content: string
+  calc_blocks?: number
+  calc_errors?: string[]
+}
+
+export interface TemplateBatchRequest {
+  template_filename: string
+  rows?: Record<string, string>[]
+  csv?: string
+  filename_pattern?: string
+  folder?: string
+  metadata?: DocumentMetadata
+  execute?: boolean
+  overwrite?: boolean
+}
+
+export interface TemplateBatchItem {
+  row: number
+  filename?: string
+  status: 'created' | 'skipped' | 'failed'
+  error?: string
+}
+
+export interface TemplateBatchResult {
+  items: TemplateBatchItem[]
+  created: number
+  skipped: number
+  failed: number
+  executed: number
+  workers: number
+  total_seconds: number
 }
 
 export interface ExportRequest {
@@ -67,3 +105,60 @@ export interface ExportRequest {
   output_filename: string
   metadata?: Record<string, any>
 }
+
+export interface BatchExportItem {
+  filename: string
+  output_filename?: string | null
+  seconds: number
+  error?: string | null
+}
+
+export interface BatchExportResult {
+  items: BatchExportItem[]
+  succeeded: number
+  failed: number
+  workers: number
+  package_filename?: string | null
+  package_seconds?: number | null
+  package_error?: string | null
+  total_seconds: number
+}
+
+export type ExportJobStatus = 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled'
+
+export interface TableCase {
+  name?: string
+  inputs: Record<string, any>
+}
+
+export interface TableExportRequest {
+  filenames: string[]
+  cases?: TableCase[]
+  variables?: string[]
+  format?: 'csv' | 'parquet' | 'arrow'
+  output_filename?: string
+}
+
+export interface ExportStats {
+  format: 'pdf' | 'html'
+  cache: 'hit' | 'miss' | 'disabled'
+  prepare_seconds: number
+  pandoc_seconds: number
+  engine_seconds: number
+  write_seconds: number
+  total_seconds: number
+  size_bytes: number
+  processes: number
+}
+
+export interface ExportJob {
+  id: string
+  format: 'pdf' | 'html'
+  output_filename: string
+  status: ExportJobStatus
+  error?: string | null
+  created_at: number
+  started_at?: number | null
+  finished_at?: number | null
+  stats?: ExportStats | null
+}